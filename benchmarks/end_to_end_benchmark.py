@@ -0,0 +1,277 @@
+"""Reproducible end-to-end benchmarks of `baet`, run against synthetic media.
+
+Fixtures are generated locally with FFmpeg's `lavfi` sources (see `synthetic_media.py`): multi-track MKV and MP4
+files of varying lengths, track counts and codecs, and a directory tree of many tiny clips. They are cached in the
+fixtures directory and only generated again when their specs change.
+
+The benchmarks time:
+- `startup`: `baet --help` and `baet probe --help`.
+- `probe`: `baet probe` of a multi-track file, without the probe cache.
+- `extract_file`: `baet extract file` of each multi-track file.
+- `extract_dir`: `baet extract dir` of the clip library, with one FFmpeg process per clip and with `--pack`.
+- `filter`: discovering and filtering the clip library, as `baet extract dir` does before probing.
+- `build_job`: probing and building the jobs of every multi-track file, in process.
+- `run_synchronously`: running the built jobs of every multi-track file, in process.
+
+Commands run with an isolated cache directory, `--no-probe-cache` and `--overwrite`, so every run does the same work.
+Each benchmark is repeated, and its median is compared with a baseline results file, if given. A benchmark regresses
+when its median exceeds the baseline median by more than its threshold in `thresholds.json`. The script exits with
+status 1 if any benchmark regresses.
+
+Run with `python benchmarks/end_to_end_benchmark.py [--scale quick|full] [--out results.json] [--baseline old.json]`.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable, Mapping, Sequence
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any, Final
+
+from synthetic_media import (
+    ClipLibrarySpec,
+    MultiTrackSpec,
+    ffmpeg_version,
+    generate_clip_library,
+    generate_multitrack,
+)
+
+RESULTS_VERSION: Final = 1
+THRESHOLDS_FILE: Final = Path(__file__).with_name("thresholds.json")
+
+MULTITRACK_SPECS: Final[Mapping[str, Sequence[MultiTrackSpec]]] = {
+    "quick": [
+        MultiTrackSpec("short_2x_aac.mkv", 30, ("aac", "aac")),
+        MultiTrackSpec("medium_6x_flac.mkv", 120, ("flac",) * 6),
+        MultiTrackSpec("medium_4x_mixed.mp4", 120, ("aac", "ac3", "libmp3lame", "aac"), sample_rate=44_100),
+    ],
+    "full": [
+        MultiTrackSpec("short_2x_aac.mkv", 30, ("aac", "aac")),
+        MultiTrackSpec("long_8x_flac.mkv", 1_800, ("flac",) * 8),
+        MultiTrackSpec("long_4x_mixed.mp4", 1_800, ("aac", "ac3", "libmp3lame", "aac"), sample_rate=44_100),
+        MultiTrackSpec("surround_2x_ac3.mkv", 600, ("ac3", "ac3"), channels=6),
+    ],
+}
+
+CLIP_LIBRARY_SPECS: Final[Mapping[str, ClipLibrarySpec]] = {
+    "quick": ClipLibrarySpec("clips", 200),
+    "full": ClipLibrarySpec("clips", 5_000),
+}
+
+
+@dataclass(frozen=True)
+class Fixtures:
+    """The generated fixtures."""
+
+    multitrack: list[Path]
+    clips: Path
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    """A timed operation. `setup` runs before each repetition, outside of the timing."""
+
+    name: str
+    run: Callable[[], object]
+    setup: Callable[[], object] | None = None
+
+
+def baet(*args: str | Path, env: Mapping[str, str]) -> Callable[[], object]:
+    """Create a callable that runs `baet` with arguments, in a new interpreter."""
+    command = [sys.executable, "-m", "BAET", *map(str, args)]
+    return lambda: subprocess.run(command, env=env, capture_output=True, check=True)  # noqa: S603
+
+
+def clear(directory: Path) -> Callable[[], None]:
+    """Create a callable that removes a directory, so outputs of a previous repetition are not reused."""
+    return lambda: shutil.rmtree(directory, ignore_errors=True)
+
+
+def filter_stage(clips: Path) -> Callable[[], int]:
+    """Create a callable that discovers and filters the clip library, returning the number of inputs."""
+    from BAET.cli.commands.extract import DirectoryInput, discover_inputs
+    from BAET.constants import VIDEO_EXTENSIONS_NO_DOT
+    from BAET.helpers.name_filter import NameFilter
+
+    include_file = NameFilter(extensions=[(extension, False) for extension in VIDEO_EXTENSIONS_NO_DOT])
+    directory = DirectoryInput(clips, clips, ".wav", recursive=True)
+    return lambda: sum(1 for _ in discover_inputs(directory, include_file, NameFilter()))
+
+
+def build_jobs(files: Sequence[Path], out_dir: Path) -> Callable[[], list[Any]]:
+    """Create a callable that probes files and builds their extraction jobs, in process."""
+    from BAET.FFmpeg.job_builder import build_job
+
+    return lambda: [build_job(file, out_dir / file.with_suffix(".wav").name) for file in files]
+
+
+def run_jobs(files: Sequence[Path], out_dir: Path) -> tuple[Callable[[], None], Callable[[], None]]:
+    """Create callables that build extraction jobs outside of the timing, and run them synchronously, in process."""
+    from BAET.cli.commands.extract import run_synchronously
+    from BAET.Display.reporting import NullBatchReporter
+
+    build = build_jobs(files, out_dir)
+    jobs: list[Any] = []
+
+    def setup() -> None:
+        shutil.rmtree(out_dir, ignore_errors=True)
+        jobs[:] = build()
+
+    return setup, lambda: run_synchronously(jobs, NullBatchReporter())
+
+
+def define_benchmarks(fixtures: Fixtures, work_dir: Path) -> list[Benchmark]:
+    """Define the benchmarks over the fixtures, writing outputs to the work directory."""
+    env = {**os.environ, "BAET_CACHE_DIR": str(work_dir / "cache")}
+    extract = ("extract", "--progress", "none", "--no-probe-cache", "--overwrite")
+    out_dir = work_dir / "out"
+
+    benchmarks = [
+        Benchmark("startup_help", baet("--help", env=env)),
+        Benchmark("startup_probe_help", baet("probe", "--help", env=env)),
+        Benchmark("probe", baet("probe", "--no-probe-cache", fixtures.multitrack[-1], env=env)),
+    ]
+
+    for file in fixtures.multitrack:
+        benchmarks.append(
+            Benchmark(
+                f"extract_file_{file.stem}",
+                baet(*extract, "file", "-i", file, "-o", out_dir, "-f", "wav", env=env),
+                setup=lambda: out_dir.mkdir(parents=True, exist_ok=True),
+            )
+        )
+
+    run_setup, run = run_jobs(fixtures.multitrack, out_dir / "in_process")
+    benchmarks += [
+        Benchmark(
+            "extract_dir_clips",
+            baet(*extract, "dir", "-i", fixtures.clips, "-o", out_dir / "clips", "-r", "-f", "wav", env=env),
+            setup=clear(out_dir / "clips"),
+        ),
+        Benchmark(
+            "extract_dir_clips_packed",
+            baet(*extract, "dir", "-i", fixtures.clips, "-o", out_dir / "clips", "-r", "-f", "wav", "--pack", env=env),
+            setup=clear(out_dir / "clips"),
+        ),
+        Benchmark("filter_clips", filter_stage(fixtures.clips)),
+        Benchmark("build_job", build_jobs(fixtures.multitrack, out_dir / "in_process")),
+        Benchmark("run_synchronously", run, setup=run_setup),
+    ]
+    return benchmarks
+
+
+def measure(benchmark: Benchmark, repeat: int) -> dict[str, Any]:
+    """Time a benchmark, returning its timings in seconds."""
+    runs = []
+    for _ in range(repeat):
+        if benchmark.setup is not None:
+            benchmark.setup()
+
+        start = time.perf_counter()
+        benchmark.run()
+        runs.append(time.perf_counter() - start)
+
+    return {"median": statistics.median(runs), "min": min(runs), "runs": runs}
+
+
+def compare(
+    results: Mapping[str, Mapping[str, Any]],
+    baseline: Mapping[str, Mapping[str, Any]],
+    thresholds: Mapping[str, float],
+) -> list[str]:
+    """Compare results with a baseline, returning a description of each regression."""
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+
+        ratio = result["median"] / baseline[name]["median"]
+        threshold = thresholds.get(name, thresholds["default"])
+        status = "REGRESSED" if ratio > threshold else "ok"
+        print(f"{name:<40} {ratio:6.2f}x baseline (threshold {threshold:.2f}x) {status}")
+
+        if ratio > threshold:
+            regressions.append(f"{name} took {ratio:.2f}x the baseline, above the {threshold:.2f}x threshold")
+
+    return regressions
+
+
+def main() -> None:
+    """Run the benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=["quick", "full"], default="quick", help="The size of the fixtures.")
+    parser.add_argument("--repeat", type=int, default=5, help="The number of times to run each benchmark.")
+    parser.add_argument(
+        "--fixtures",
+        type=Path,
+        default=Path(tempfile.gettempdir()) / "baet-benchmark-fixtures",
+        help="The directory to generate and reuse fixtures in.",
+    )
+    parser.add_argument("--only", nargs="*", default=None, help="Only run benchmarks whose names start with these.")
+    parser.add_argument("--out", type=Path, default=None, help="The file to write results to as JSON.")
+    parser.add_argument("--baseline", type=Path, default=None, help="A results file to compare with.")
+    args = parser.parse_args()
+
+    # Quieten in-process benchmarks, as `baet` is without `--logging`
+    from BAET._config.logging import configure_logging
+
+    configure_logging(enable_logging=False)
+
+    fixtures_dir: Path = args.fixtures / args.scale
+    print(f"Generating fixtures in {fixtures_dir}")
+    fixtures = Fixtures(
+        multitrack=[generate_multitrack(fixtures_dir, spec) for spec in MULTITRACK_SPECS[args.scale]],
+        clips=generate_clip_library(fixtures_dir, CLIP_LIBRARY_SPECS[args.scale]),
+    )
+
+    results: dict[str, dict[str, Any]] = {}
+    with tempfile.TemporaryDirectory(prefix="baet-benchmark-") as work_dir:
+        for benchmark in define_benchmarks(fixtures, Path(work_dir)):
+            if args.only is not None and not benchmark.name.startswith(tuple(args.only)):
+                continue
+
+            results[benchmark.name] = measure(benchmark, args.repeat)
+            print(f"{benchmark.name:<40} {results[benchmark.name]['median']:8.3f} s")
+
+    report = {
+        "version": RESULTS_VERSION,
+        "created": datetime.now(UTC).isoformat(),
+        "scale": args.scale,
+        "repeat": args.repeat,
+        "host": {
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "python": platform.python_version(),
+        },
+        "ffmpeg": ffmpeg_version(),
+        "results": results,
+    }
+
+    if args.out is not None:
+        args.out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Wrote results to {args.out}")
+
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        if baseline["scale"] != args.scale:
+            sys.exit(f"Cannot compare {args.scale} results with a {baseline['scale']} baseline")
+
+        thresholds = json.loads(THRESHOLDS_FILE.read_text(encoding="utf-8"))
+        regressions = compare(results, baseline["results"], thresholds)
+        if regressions:
+            print("\n".join(["Regressions:", *regressions]))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
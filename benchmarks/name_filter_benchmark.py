@@ -0,0 +1,107 @@
+"""Micro-benchmark of file name filtering for `baet extract filter`.
+
+Compares the compiled `NameFilter` against matching every pattern separately, as `baet extract` did before
+it was introduced, over synthetic file names and patterns.
+
+Run with `python benchmarks/name_filter_benchmark.py [--paths N] [--patterns N]`.
+"""
+
+import argparse
+import random
+import re
+import string
+import time
+from collections.abc import Callable, Sequence
+from pathlib import Path
+from re import Pattern
+
+from BAET.constants import VIDEO_EXTENSIONS_NO_DOT
+from BAET.helpers.name_filter import NameFilter
+
+EXTENSIONS = [*VIDEO_EXTENSIONS_NO_DOT, "srt", "nfo", "jpg"]
+
+
+def synthetic_names(count: int, rng: random.Random) -> list[str]:
+    """Generate file names made of random words, a number and a video or other extension."""
+    words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 8))) for _ in range(2_000)]
+    return [
+        f"{'_'.join(rng.choices(words, k=rng.randint(1, 4)))}_{rng.randint(0, 9999):04d}.{rng.choice(EXTENSIONS)}"
+        for _ in range(count)
+    ]
+
+
+def synthetic_patterns(count: int, rng: random.Random) -> list[Pattern[str]]:
+    """Generate case insensitive patterns matching names containing a random trigram and number."""
+    return [
+        re.compile(f".*{''.join(rng.choices(string.ascii_lowercase, k=3))}.*_{rng.randint(0, 99):02d}", re.IGNORECASE)
+        for _ in range(count)
+    ]
+
+
+def per_pattern_filter(
+    names: Sequence[str],
+    includes: Sequence[Pattern[str]],
+    excludes: Sequence[Pattern[str]],
+    extensions: Sequence[str],
+) -> list[str]:
+    """Filter names by matching each pattern separately, as `baet extract` did before `NameFilter`."""
+    extension_patterns = [re.compile(rf".*\.{re.escape(e)}$", re.IGNORECASE) for e in extensions]
+    paths = [Path(name) for name in names]
+
+    for include in includes:
+        paths = [path for path in paths if include.match(path.name)]
+
+    for exclude in excludes:
+        paths = [path for path in paths if not exclude.match(path.name)]
+
+    paths = [path for path in paths if any(ext.match(path.name) for ext in extension_patterns)]
+    return [path.name for path in paths]
+
+
+def compiled_filter(
+    names: Sequence[str],
+    includes: Sequence[Pattern[str]],
+    excludes: Sequence[Pattern[str]],
+    extensions: Sequence[str],
+) -> list[str]:
+    """Filter names with a compiled `NameFilter`."""
+    name_filter = NameFilter(includes, excludes, [(e, False) for e in extensions])
+    return [name for name in names if name_filter(name)]
+
+
+def timed(func: Callable[[], list[str]]) -> tuple[float, list[str]]:
+    """Time a call, returning the elapsed seconds and its result."""
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--paths", type=int, default=1_000_000, help="The number of file names to filter.")
+    parser.add_argument("--patterns", type=int, default=100, help="The number of exclude patterns.")
+    parser.add_argument("--seed", type=int, default=0, help="The random seed for synthetic data.")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)  # noqa: S311
+    names = synthetic_names(args.paths, rng)
+    includes = [re.compile(r".*_\d{4}\.", re.IGNORECASE)]
+    excludes = synthetic_patterns(args.patterns, rng)
+    extensions = list(VIDEO_EXTENSIONS_NO_DOT)
+
+    print(f"Filtering {len(names):,} names with {len(includes)} include and {len(excludes)} exclude patterns")
+
+    per_pattern_time, expected = timed(lambda: per_pattern_filter(names, includes, excludes, extensions))
+    compiled_time, actual = timed(lambda: compiled_filter(names, includes, excludes, extensions))
+
+    if actual != expected:
+        raise AssertionError("The compiled filter selected different names to the per-pattern filter")
+
+    print(f"Selected {len(actual):,} names")
+    print(f"Per-pattern filter: {per_pattern_time:8.3f} s")
+    print(f"Compiled filter:    {compiled_time:8.3f} s ({per_pattern_time / compiled_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""Synthetic media fixtures for the benchmarks, generated locally with FFmpeg's `lavfi` sources.
+
+Fixtures are described by specs, and are only generated again when their spec changes, so repeated benchmark runs
+reuse the same files. Every audio track is a sine tone of a distinct frequency, so tracks are distinguishable.
+"""
+
+import json
+import subprocess
+from collections.abc import Sequence
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Final
+
+# The tiny video track every fixture has, so inputs are probed and demuxed like real videos
+VIDEO_SOURCE: Final = "color=c=black:s=64x36:r=10"
+VIDEO_OPTIONS: Final = ("-c:v", "mpeg4", "-g", "10")
+
+SPEC_FILENAME: Final = ".spec.json"
+
+
+@dataclass(frozen=True)
+class MultiTrackSpec:
+    """A video file with several audio tracks.
+
+    Attributes
+    ----------
+    name : str
+        The file name, whose extension selects the container.
+    duration : float
+        The duration in seconds.
+    codecs : tuple[str, ...]
+        The encoder of each audio track.
+    sample_rate : int
+        The sample rate of every audio track.
+    channels : int
+        The channel count of every audio track.
+    """
+
+    name: str
+    duration: float
+    codecs: tuple[str, ...]
+    sample_rate: int = 48_000
+    channels: int = 2
+
+
+@dataclass(frozen=True)
+class ClipLibrarySpec:
+    """A directory tree of many short video clips, each with one audio track.
+
+    Attributes
+    ----------
+    name : str
+        The directory name.
+    clips : int
+        The number of clips.
+    clip_duration : int
+        The duration of each clip in seconds.
+    clips_per_dir : int
+        The number of clips in each subdirectory.
+    codec : str
+        The encoder of the audio tracks.
+    """
+
+    name: str
+    clips: int
+    clip_duration: int = 2
+    clips_per_dir: int = 250
+    codec: str = "aac"
+
+
+def _run(args: Sequence[str | Path]) -> None:
+    subprocess.run(["ffmpeg", "-hide_banner", "-v", "error", "-y", *args], check=True)  # noqa: S603, S607
+
+
+def _is_current(spec_file: Path, spec: MultiTrackSpec | ClipLibrarySpec) -> bool:
+    try:
+        return bool(json.loads(spec_file.read_text(encoding="utf-8")) == asdict(spec))
+    except (OSError, ValueError):
+        return False
+
+
+def generate_multitrack(directory: Path, spec: MultiTrackSpec) -> Path:
+    """Generate a multi-track video file, unless it was already generated from the same spec.
+
+    Parameters
+    ----------
+    directory : Path
+        The directory to generate the file in.
+    spec : MultiTrackSpec
+        The file to generate.
+
+    Returns
+    -------
+    Path
+        The generated file.
+    """
+    path = directory / spec.name
+    spec_file = directory / f"{spec.name}{SPEC_FILENAME}"
+    if path.exists() and _is_current(spec_file, spec):
+        return path
+
+    directory.mkdir(parents=True, exist_ok=True)
+    args: list[str | Path] = ["-f", "lavfi", "-i", f"{VIDEO_SOURCE}:d={spec.duration}"]
+    for track in range(len(spec.codecs)):
+        args += ["-f", "lavfi", "-i", f"sine=f={220 * (track + 1)}:r={spec.sample_rate}:d={spec.duration}"]
+
+    args += ["-map", "0:v", *VIDEO_OPTIONS]
+    for track, codec in enumerate(spec.codecs):
+        args += ["-map", f"{track + 1}:a", f"-c:a:{track}", codec]
+    args += ["-ac", str(spec.channels), path]
+
+    _run(args)
+    spec_file.write_text(json.dumps(asdict(spec)), encoding="utf-8")
+    return path
+
+
+def generate_clip_library(directory: Path, spec: ClipLibrarySpec) -> Path:
+    """Generate a directory tree of short clips, unless it was already generated from the same spec.
+
+    The clips are cut from one long generated stream with the segment muxer, so a single FFmpeg process
+    generates each subdirectory, rather than one process per clip.
+
+    Parameters
+    ----------
+    directory : Path
+        The directory to generate the library in.
+    spec : ClipLibrarySpec
+        The library to generate.
+
+    Returns
+    -------
+    Path
+        The root directory of the library.
+    """
+    root = directory / spec.name
+    spec_file = directory / f"{spec.name}{SPEC_FILENAME}"
+    if root.exists() and _is_current(spec_file, spec):
+        return root
+
+    for subdirectory in range(0, spec.clips, spec.clips_per_dir):
+        clips = min(spec.clips_per_dir, spec.clips - subdirectory)
+        duration = clips * spec.clip_duration
+        out_dir = root / f"part{subdirectory // spec.clips_per_dir:03d}"
+        out_dir.mkdir(parents=True, exist_ok=True)
+
+        _run(
+            [
+                *("-f", "lavfi", "-i", f"{VIDEO_SOURCE}:d={duration}"),
+                *("-f", "lavfi", "-i", f"sine=f=440:d={duration}"),
+                *VIDEO_OPTIONS,
+                *("-c:a", spec.codec),
+                *("-f", "segment", "-segment_time", str(spec.clip_duration), "-reset_timestamps", "1"),
+                out_dir / "clip_%05d.mkv",
+            ]
+        )
+
+    spec_file.write_text(json.dumps(asdict(spec)), encoding="utf-8")
+    return root
+
+
+def ffmpeg_version() -> str:
+    """Get the version of the FFmpeg on the PATH, which generates the fixtures and runs the benchmarks."""
+    proc = subprocess.run(["ffmpeg", "-version"], capture_output=True, text=True, check=True)  # noqa: S607
+    return proc.stdout[len("ffmpeg version") : proc.stdout.find("Copyright")].strip()
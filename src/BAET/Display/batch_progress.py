@@ -0,0 +1,141 @@
+"""Display progress for a batch of FFmpeg audio extraction jobs."""
+
+from collections import deque
+from threading import Lock
+
+from rich.console import Console, ConsoleOptions, ConsoleRenderable, Group, RenderResult
+from rich.live import Live
+from rich.padding import Padding
+from rich.progress import BarColumn, MofNCompleteColumn, Progress, TextColumn, TimeElapsedColumn, TimeRemainingColumn
+from rich.text import Text
+
+from BAET._config.console import app_console
+from BAET.Display.job_progress import FFmpegJobProgress
+from BAET.FFmpeg.jobs import AudioExtractJob
+from BAET.FFmpeg.metrics import ExtractionMetrics, timed_phase
+
+DEFAULT_MAX_RECENT = 5
+
+
+class BatchProgress(ConsoleRenderable):
+    """Progress display for a batch of jobs, which grows as jobs are queued.
+
+    Only running jobs are displayed in full, along with a bar for the whole batch and a bounded tail of
+    recently finished jobs. Finished jobs are then forgotten, so rendering and memory scale with the number
+    of running jobs rather than the size of the batch.
+
+    Jobs may be added from any thread while the display is being rendered.
+    """
+
+    def __init__(self, max_recent: int = DEFAULT_MAX_RECENT, metrics: ExtractionMetrics | None = None) -> None:
+        """Create a batch progress display.
+
+        Parameters
+        ----------
+        max_recent : int, optional
+            The number of recently finished jobs to display, by default `DEFAULT_MAX_RECENT`.
+        metrics : ExtractionMetrics | None, optional
+            The metrics to record the time spent rendering to, as the `render` phase, by default None.
+        """
+        self._metrics = metrics
+        self._lock = Lock()
+        self._running: dict[int, FFmpegJobProgress] = {}
+        self._recent: deque[Text] = deque(maxlen=max_recent)
+        self._queued_jobs = 0
+        self._failed_jobs = 0
+
+        self._batch_progress = Progress(
+            TextColumn("Extracting files"),
+            BarColumn(finished_style="green"),
+            MofNCompleteColumn(),
+            TextColumn("{task.fields[failed]}"),
+            TimeElapsedColumn(),
+            TimeRemainingColumn(),
+            console=app_console,
+        )
+        self._batch_task = self._batch_progress.add_task("Batch", total=0, failed="")
+
+    def add(self, job: AudioExtractJob) -> FFmpegJobProgress:
+        """Add a job to the display.
+
+        The job is counted towards the batch, and is displayed once it starts running.
+
+        Parameters
+        ----------
+        job : AudioExtractJob
+            The job to display.
+
+        Returns
+        -------
+        FFmpegJobProgress
+            The progress display for the job, used to report its progress as it is run.
+        """
+        progress = FFmpegJobProgress(job)
+        progress.on_start = lambda: self._job_started(progress)
+        progress.on_finish = lambda: self._job_finished(progress)
+
+        with self._lock:
+            self._queued_jobs += 1
+            self._batch_progress.update(self._batch_task, total=self._queued_jobs)
+        return progress
+
+    def live(self) -> Live:
+        """Get a live display of the batch, refreshed while the batch is run.
+
+        Returns
+        -------
+        Live
+            The live display.
+        """
+        return Live(self, console=app_console)
+
+    def _job_started(self, progress: FFmpegJobProgress) -> None:
+        with self._lock:
+            self._running[id(progress)] = progress
+
+    def _job_finished(self, progress: FFmpegJobProgress) -> None:
+        streams = len(progress.job.audio_streams)
+        if progress.failed_streams:
+            summary = Text.assemble(
+                ("✗ ", "bold red"),
+                progress.job.input_file.name,
+                (f" {progress.failed_streams} of {streams} audio streams failed", "red"),
+            )
+        else:
+            summary = Text.assemble(
+                ("✓ ", "bold green"),
+                progress.job.input_file.name,
+                (f" {streams} audio streams extracted", "green"),
+            )
+
+        with self._lock:
+            del self._running[id(progress)]
+            self._recent.append(summary)
+
+            if progress.failed_streams:
+                self._failed_jobs += 1
+            failed = f"[bold red]{self._failed_jobs} failed[/]" if self._failed_jobs else ""
+            self._batch_progress.update(self._batch_task, advance=1, failed=failed)
+
+    def __rich_console__(self, console: Console, options: ConsoleOptions) -> RenderResult:
+        """Render the batch progress display.
+
+        Parameters
+        ----------
+        console : Console
+            The console to render to.
+        options : ConsoleOptions
+            The console options.
+
+        Returns
+        -------
+        RenderResult
+            The render result.
+        """
+        # The console renders what is yielded before resuming, so the render is timed too
+        with timed_phase(self._metrics, "render"):
+            with self._lock:
+                running = list(self._running.values())
+                recent = list(self._recent)
+
+            yield Padding(Group(*recent, *running, self._batch_progress), pad=(1, 2))
@@ -1,31 +1,55 @@
 """Display job progress for FFmpeg audio extraction."""
 
+from collections.abc import Callable, Sequence
+
 from bidict import MutableBidirectionalMapping, bidict
 from rich.console import Console, ConsoleOptions, ConsoleRenderable, Group, RenderResult
 from rich.highlighter import ReprHighlighter
 from rich.padding import Padding
 from rich.progress import BarColumn, Progress, TaskID, TextColumn, TimeElapsedColumn, TimeRemainingColumn
 
-import ffmpeg
 from BAET._config.console import app_console
 from BAET._config.logging import create_logger
-from BAET.FFmpeg.jobs import AudioExtractJob, stream_duration_ms
-from BAET.typing import StreamTaskBiMap
+from BAET.FFmpeg.jobs import AudioExtractJob
+from BAET.FFmpeg.progress import FFmpegProgress
+from BAET.typing import StreamIndex, StreamTaskBiMap
 
 logger = create_logger()
 
+# The minimum number of seconds between updates of a job's progress display
+PROGRESS_UPDATE_INTERVAL_SECONDS = 0.25
+
+_WORKING_STATUS = "[italic cornflower_blue]Working[/]"
+
 
 class FFmpegJobProgress(ConsoleRenderable):
-    """Job progress display for FFmpeg audio extraction.
+    """Job progress display for FFmpeg audio extraction, reporting the progress of a job as it is run.
 
     Attributes
     ----------
     job : AudioExtractJob
+    progress_interval : float
+        The minimum number of seconds between progress updates.
+    on_start : Callable[[], None] | None
+        Called when the job starts running.
+    on_finish : Callable[[], None] | None
+        Called when the job has finished running, whether or not its streams were extracted successfully.
+    failed_streams : int
+        The number of streams that failed to extract.
     """
 
     # TODO: Need mediator to consumer/producer printing
-    def __init__(self, job: AudioExtractJob) -> None:
+    def __init__(
+        self,
+        job: AudioExtractJob,
+        on_start: Callable[[], None] | None = None,
+        on_finish: Callable[[], None] | None = None,
+    ) -> None:
         self.job = job
+        self.progress_interval = PROGRESS_UPDATE_INTERVAL_SECONDS
+        self.on_start = on_start
+        self.on_finish = on_finish
+        self.failed_streams = 0
 
         bar_blue = "#5079AF"
         bar_yellow = "#CAAF39"
@@ -67,12 +91,12 @@ class FFmpegJobProgress(ConsoleRenderable):
 
         stream_task_bimap: MutableBidirectionalMapping[int, TaskID] = bidict()
         for stream in self.job.audio_streams:
-            stream_index = stream["index"]
+            stream_index = stream.index
 
             task = self._stream_task_progress.add_task(
                 "Waiting...",
                 start=False,
-                total=stream_duration_ms(stream),
+                total=stream.duration_ms,
                 stream_index=stream_index,
                 status="[plum4]Waiting[/]",
             )
@@ -101,62 +125,87 @@ class FFmpegJobProgress(ConsoleRenderable):
             Padding(self._stream_task_progress, (1, 0, 1, 5)),
         )
 
-    def _run_task(self, task: TaskID) -> None:
-        stream_index: int = self._stream_task_bimap.inverse[task]
-
-        logger.info("Extracting audio stream %d of %r", stream_index, self.job.input_file.name)
-
-        output = self.job.stream_indexed_outputs[stream_index]
-
-        logger.debug("Running: %s", " ".join(ffmpeg.compile(output)))
+    def _tasks(self, streams: Sequence[StreamIndex]) -> list[TaskID]:
+        return [self._stream_task_bimap[stream_index] for stream_index in streams]
 
-        proc = ffmpeg.run_async(
-            output,
-            pipe_stdout=True,
-            pipe_stderr=True,
-        )
+    def job_started(self) -> None:
+        """Start the progress display of the job."""
+        if self.on_start is not None:
+            self.on_start()
 
-        try:
-            with proc as p:
-                if p is None:
-                    raise ValueError("FFmpeg process failed to start")
-
-                if p.stdout is None:
-                    raise ValueError("FFmpeg process stdout is None")
-
-                for line in p.stdout:
-                    decoded = line.decode("utf-8").strip()
-                    if "out_time_ms" in decoded:
-                        val = decoded.split("=", 1)[1]
-                        self._stream_task_progress.update(
-                            task,
-                            completed=float(val),
-                        )
-
-                err = p.stderr.read().strip() if p.stderr is not None else b"No stderr output was captured."
-            if proc.wait() != 0:
-                raise RuntimeError(err.decode("utf-8"))
-        except (RuntimeError, ValueError) as e:
-            logger.critical("%s: %s", type(e).__name__, e)
-            raise e
-
-    def start(self) -> None:
-        """Start the job and render the progress display."""
         self._overall_progress.start_task(self._overall_progress_task)
         logger.info("Stream index to job task ID bimap: %r", self._stream_task_bimap)
-        for task in self._stream_task_bimap.values():
+
+    def streams_started(self, streams: Sequence[StreamIndex]) -> None:
+        """Start the progress bars of streams being extracted.
+
+        Parameters
+        ----------
+        streams : Sequence[StreamIndex]
+            The indexes of the streams.
+        """
+        for stream_index, task in zip(streams, self._tasks(streams), strict=True):
+            logger.info("Extracting audio stream %d of %r", stream_index, self.job.input_file.name)
             self._stream_task_progress.start_task(task)
+            self._stream_task_progress.update(task, status=_WORKING_STATUS)
 
-            self._stream_task_progress.update(task, status="[italic cornflower_blue]Working[/]")
+    def streams_progressed(self, streams: Sequence[StreamIndex], progress: FFmpegProgress) -> None:
+        """Update the progress bars of streams being extracted.
 
-            try:
-                self._run_task(task)
-                self._stream_task_progress.update(task, completed=self._stream_task_progress.tasks[task].total)
-                self._stream_task_progress.update(task, status="[bold green]Complete[/]")
-            except (RuntimeError, ValueError):
-                self._stream_task_progress.update(task, status="[bold red]ERROR[/]")
-            finally:
-                self._stream_task_progress.stop_task(task)
-                self._overall_progress.advance(self._overall_progress_task, advance=1)
+        Parameters
+        ----------
+        streams : Sequence[StreamIndex]
+            The indexes of the streams.
+        progress : FFmpegProgress
+            The progress reported by FFmpeg.
+        """
+        status = _WORKING_STATUS if progress.speed is None else f"{_WORKING_STATUS} {progress.speed:.1f}x"
+        for stream_index, task in zip(streams, self._tasks(streams), strict=True):
+            if progress.out_time_us is None:
+                self._stream_task_progress.update(task, status=status)
+            else:
+                # Each stream only lasts as long as its own duration, so clamp the shared position
+                completed = min(progress.out_time_us, self.job.stream(stream_index).duration_ms)
+                self._stream_task_progress.update(task, completed=completed, status=status)
+
+    def streams_completed(self, streams: Sequence[StreamIndex]) -> None:
+        """Mark streams as extracted successfully.
+
+        Parameters
+        ----------
+        streams : Sequence[StreamIndex]
+            The indexes of the streams.
+        """
+        tasks = self._tasks(streams)
+        for task in tasks:
+            self._stream_task_progress.update(task, completed=self._stream_task_progress.tasks[task].total)
+            self._stream_task_progress.update(task, status="[bold green]Complete[/]")
+        self._end_tasks(tasks)
+
+    def streams_failed(self, streams: Sequence[StreamIndex], error: Exception) -> None:
+        """Mark streams as failed to extract.
 
+        Parameters
+        ----------
+        streams : Sequence[StreamIndex]
+            The indexes of the streams.
+        error : Exception
+            The error the streams failed with.
+        """
+        self.failed_streams += len(streams)
+        tasks = self._tasks(streams)
+        for task in tasks:
+            self._stream_task_progress.update(task, status="[bold red]ERROR[/]")
+        self._end_tasks(tasks)
+
+    def _end_tasks(self, tasks: Sequence[TaskID]) -> None:
+        for task in tasks:
+            self._stream_task_progress.stop_task(task)
+        self._overall_progress.advance(self._overall_progress_task, advance=len(tasks))
+
+    def job_finished(self) -> None:
+        """Stop the progress display of the job."""
         self._overall_progress.stop_task(self._overall_progress_task)
+
+        if self.on_finish is not None:
+            self.on_finish()
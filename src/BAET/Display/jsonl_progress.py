@@ -0,0 +1,184 @@
+"""Report the progress of FFmpeg audio extraction jobs as JSON lines, for machines rather than terminals."""
+
+import contextlib
+import json
+import sys
+import time
+from collections.abc import Sequence
+from contextlib import AbstractContextManager
+from threading import Lock
+from typing import Any, TextIO
+
+from BAET.Display.reporting import JobReporter
+from BAET.FFmpeg.jobs import AudioExtractJob
+from BAET.FFmpeg.progress import FFmpegProgress
+from BAET.typing import StreamIndex
+
+# The minimum number of seconds between progress events for the same streams
+PROGRESS_EVENT_INTERVAL_SECONDS = 1.0
+
+
+class JsonlBatchReporter:
+    """Reports the progress of a batch of jobs as one JSON object per line.
+
+    Every event has an `event` name, a `time` as seconds since the epoch and the `input` file of its job.
+    The events are:
+
+    - `job_queued`, with the `streams` to extract.
+    - `job_started`.
+    - `stream_progress`, at most once per `PROGRESS_EVENT_INTERVAL_SECONDS` for each stream, with the `stream_index`,
+      the `out_time_us` reached in the stream, the `speed` relative to real time and the `total_size` bytes written.
+    - `stream_completed`, with the `stream_index` and its `output` file.
+    - `stream_failed`, with the `stream_index`, its `output` file and the `error`.
+    - `job_finished`, with the number of `failed_streams`.
+
+    Values that FFmpeg has not reported are null. Events may be reported from any thread.
+    """
+
+    def __init__(self, stream: TextIO | None = None) -> None:
+        """Create a JSON lines reporter.
+
+        Parameters
+        ----------
+        stream : TextIO | None, optional
+            The stream to write events to, by default standard output.
+        """
+        self._stream = stream if stream is not None else sys.stdout
+        self._lock = Lock()
+
+    def emit(self, event: str, job: AudioExtractJob, **fields: Any) -> None:
+        """Write an event.
+
+        Parameters
+        ----------
+        event : str
+            The name of the event.
+        job : AudioExtractJob
+            The job the event is for.
+        **fields : Any
+            The JSON serialisable fields of the event.
+        """
+        line = json.dumps(
+            {"event": event, "time": round(time.time(), 3), "input": str(job.input_file), **fields},
+            separators=(",", ":"),
+        )
+
+        with self._lock:
+            self._stream.write(line + "\n")
+            self._stream.flush()
+
+    def add(self, job: AudioExtractJob) -> JobReporter:
+        """Report that a job was queued.
+
+        Parameters
+        ----------
+        job : AudioExtractJob
+            The job.
+
+        Returns
+        -------
+        JobReporter
+            The reporter to run the job with.
+        """
+        self.emit("job_queued", job, streams=job.stream_indexes)
+        return JsonlJobReporter(self, job)
+
+    def live(self) -> AbstractContextManager[None]:
+        """Get a context in which the batch is run. Events are written as they occur, so this does nothing.
+
+        Returns
+        -------
+        AbstractContextManager[None]
+            The context.
+        """
+        return contextlib.nullcontext()
+
+
+class JsonlJobReporter:
+    """Reports the progress of a single job as JSON lines.
+
+    Attributes
+    ----------
+    job : AudioExtractJob
+    progress_interval : float
+        The minimum number of seconds between progress events.
+    failed_streams : int
+        The number of streams that failed to extract.
+    """
+
+    def __init__(self, batch: JsonlBatchReporter, job: AudioExtractJob) -> None:
+        self.job = job
+        self.progress_interval = PROGRESS_EVENT_INTERVAL_SECONDS
+        self.failed_streams = 0
+        self._batch = batch
+
+    def _output(self, stream_index: StreamIndex) -> str | None:
+        output = self.job.output_paths.get(stream_index)
+        return str(output) if output is not None else None
+
+    def job_started(self) -> None:
+        """Report that the job has started."""
+        self._batch.emit("job_started", self.job)
+
+    def streams_started(self, streams: Sequence[StreamIndex]) -> None:
+        """Do nothing, as streams start with the job or follow the previous stream."""
+
+    def streams_progressed(self, streams: Sequence[StreamIndex], progress: FFmpegProgress) -> None:
+        """Report the progress of streams being extracted.
+
+        Parameters
+        ----------
+        streams : Sequence[StreamIndex]
+            The indexes of the streams.
+        progress : FFmpegProgress
+            The progress reported by FFmpeg.
+        """
+        for stream_index in streams:
+            out_time_us = progress.out_time_us
+            if out_time_us is not None:
+                # Each stream only lasts as long as its own duration, so clamp the shared position
+                out_time_us = min(out_time_us, int(self.job.stream(stream_index).duration_ms))
+
+            self._batch.emit(
+                "stream_progress",
+                self.job,
+                stream_index=stream_index,
+                out_time_us=out_time_us,
+                speed=progress.speed,
+                total_size=progress.total_size,
+            )
+
+    def streams_completed(self, streams: Sequence[StreamIndex]) -> None:
+        """Report that streams were extracted successfully.
+
+        Parameters
+        ----------
+        streams : Sequence[StreamIndex]
+            The indexes of the streams.
+        """
+        for stream_index in streams:
+            self._batch.emit("stream_completed", self.job, stream_index=stream_index, output=self._output(stream_index))
+
+    def streams_failed(self, streams: Sequence[StreamIndex], error: Exception) -> None:
+        """Report that streams failed to extract.
+
+        Parameters
+        ----------
+        streams : Sequence[StreamIndex]
+            The indexes of the streams.
+        error : Exception
+            The error the streams failed with.
+        """
+        self.failed_streams += len(streams)
+        for stream_index in streams:
+            self._batch.emit(
+                "stream_failed",
+                self.job,
+                stream_index=stream_index,
+                output=self._output(stream_index),
+                error=str(error),
+            )
+
+    def job_finished(self) -> None:
+        """Report that the job has finished."""
+        self._batch.emit("job_finished", self.job, failed_streams=self.failed_streams)
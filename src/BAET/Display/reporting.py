@@ -0,0 +1,144 @@
+"""Interfaces for reporting the progress of FFmpeg audio extraction jobs."""
+
+import contextlib
+import math
+from collections.abc import Sequence
+from contextlib import AbstractContextManager
+from typing import Any, Protocol
+
+from BAET.FFmpeg.jobs import AudioExtractJob
+from BAET.FFmpeg.metrics import ExtractionMetrics
+from BAET.FFmpeg.progress import FFmpegProgress
+from BAET.typing import StreamIndex
+
+
+class JobReporter(Protocol):
+    """Reports the progress of a single job as it is run.
+
+    Attributes
+    ----------
+    progress_interval : float
+        The minimum number of seconds between progress reports for the same streams.
+    """
+
+    progress_interval: float
+
+    def job_started(self) -> None:
+        """Report that the job has started."""
+
+    def streams_started(self, streams: Sequence[StreamIndex]) -> None:
+        """Report that FFmpeg has started extracting streams."""
+
+    def streams_progressed(self, streams: Sequence[StreamIndex], progress: FFmpegProgress) -> None:
+        """Report the progress of FFmpeg extracting streams."""
+
+    def streams_completed(self, streams: Sequence[StreamIndex]) -> None:
+        """Report that streams were extracted successfully."""
+
+    def streams_failed(self, streams: Sequence[StreamIndex], error: Exception) -> None:
+        """Report that streams failed to extract."""
+
+    def job_finished(self) -> None:
+        """Report that the job has finished, whether or not its streams were extracted successfully."""
+
+
+class BatchReporter(Protocol):
+    """Reports the progress of a batch of jobs, which grows as jobs are queued."""
+
+    def add(self, job: AudioExtractJob) -> JobReporter:
+        """Report that a job was queued, returning the reporter to run it with."""
+
+    def live(self) -> AbstractContextManager[Any]:
+        """Get a context in which the batch is run and its progress is reported."""
+
+
+class NullJobReporter:
+    """A job reporter that reports nothing."""
+
+    progress_interval = math.inf
+
+    def job_started(self) -> None:
+        """Do nothing."""
+
+    def streams_started(self, streams: Sequence[StreamIndex]) -> None:
+        """Do nothing."""
+
+    def streams_progressed(self, streams: Sequence[StreamIndex], progress: FFmpegProgress) -> None:
+        """Do nothing."""
+
+    def streams_completed(self, streams: Sequence[StreamIndex]) -> None:
+        """Do nothing."""
+
+    def streams_failed(self, streams: Sequence[StreamIndex], error: Exception) -> None:
+        """Do nothing."""
+
+    def job_finished(self) -> None:
+        """Do nothing."""
+
+
+class NullBatchReporter:
+    """A batch reporter that reports nothing."""
+
+    def add(self, job: AudioExtractJob) -> JobReporter:
+        """Return a job reporter that reports nothing."""
+        return NullJobReporter()
+
+    def live(self) -> AbstractContextManager[Any]:
+        """Return a context that does nothing."""
+        return contextlib.nullcontext()
+
+
+class TimedJobReporter:
+    """A job reporter that records the time spent reporting as the `report` phase of an extraction run."""
+
+    def __init__(self, reporter: JobReporter, metrics: ExtractionMetrics) -> None:
+        self._reporter = reporter
+        self._metrics = metrics
+        self.progress_interval = reporter.progress_interval
+
+    def job_started(self) -> None:
+        """Report that the job has started."""
+        with self._metrics.phase("report"):
+            self._reporter.job_started()
+
+    def streams_started(self, streams: Sequence[StreamIndex]) -> None:
+        """Report that FFmpeg has started extracting streams."""
+        with self._metrics.phase("report"):
+            self._reporter.streams_started(streams)
+
+    def streams_progressed(self, streams: Sequence[StreamIndex], progress: FFmpegProgress) -> None:
+        """Report the progress of FFmpeg extracting streams."""
+        with self._metrics.phase("report"):
+            self._reporter.streams_progressed(streams, progress)
+
+    def streams_completed(self, streams: Sequence[StreamIndex]) -> None:
+        """Report that streams were extracted successfully."""
+        with self._metrics.phase("report"):
+            self._reporter.streams_completed(streams)
+
+    def streams_failed(self, streams: Sequence[StreamIndex], error: Exception) -> None:
+        """Report that streams failed to extract."""
+        with self._metrics.phase("report"):
+            self._reporter.streams_failed(streams, error)
+
+    def job_finished(self) -> None:
+        """Report that the job has finished, whether or not its streams were extracted successfully."""
+        with self._metrics.phase("report"):
+            self._reporter.job_finished()
+
+
+class TimedBatchReporter:
+    """A batch reporter that records the time spent reporting as the `report` phase of an extraction run."""
+
+    def __init__(self, reporter: BatchReporter, metrics: ExtractionMetrics) -> None:
+        self._reporter = reporter
+        self._metrics = metrics
+
+    def add(self, job: AudioExtractJob) -> JobReporter:
+        """Report that a job was queued, returning the timed reporter to run it with."""
+        with self._metrics.phase("report"):
+            return TimedJobReporter(self._reporter.add(job), self._metrics)
+
+    def live(self) -> AbstractContextManager[Any]:
+        """Get a context in which the batch is run and its progress is reported."""
+        return self._reporter.live()
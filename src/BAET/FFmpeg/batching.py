@@ -0,0 +1,137 @@
+"""Packing of many small jobs into batches, each extracted by a single FFmpeg process with several inputs."""
+
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import dataclass
+
+import rich.repr
+
+import ffmpeg
+from BAET._config.logging import create_logger
+from BAET.FFmpeg.jobs import AudioExtractJob, with_progress_args
+from BAET.typing import FFmpegOutput
+from ffmpeg.nodes import GlobalNode
+
+logger = create_logger()
+
+DEFAULT_PACK_SECONDS = 120.0
+DEFAULT_PACK_MEGABYTES = 256
+DEFAULT_PACK_INPUTS = 32
+
+
+@rich.repr.auto()
+@dataclass(frozen=True)
+class BatchBudget:
+    """The most work to pack into a single FFmpeg process.
+
+    Attributes
+    ----------
+    max_seconds : float
+        The most media, in seconds of the longest stream of each input, to extract in one process.
+    max_bytes : int
+        The largest total size of the inputs of one process.
+    max_inputs : int
+        The most inputs one process opens.
+    """
+
+    max_seconds: float = DEFAULT_PACK_SECONDS
+    max_bytes: int = DEFAULT_PACK_MEGABYTES * 1024 * 1024
+    max_inputs: int = DEFAULT_PACK_INPUTS
+
+
+def job_seconds(job: AudioExtractJob) -> float:
+    """Get the media duration of a job, in seconds of its longest stream.
+
+    Parameters
+    ----------
+    job : AudioExtractJob
+        The job.
+
+    Returns
+    -------
+    float
+        The duration in seconds.
+    """
+    return job.duration_ms / 1_000_000
+
+
+def _job_bytes(job: AudioExtractJob) -> int:
+    if job.input_identity is not None:
+        return job.input_identity.size
+
+    try:
+        return job.input_file.stat().st_size
+    except OSError:
+        return 0
+
+
+def pack_jobs(jobs: Iterable[AudioExtractJob], budget: BatchBudget | None) -> Iterator[list[AudioExtractJob]]:
+    """Lazily pack consecutive jobs into batches within a budget.
+
+    Jobs that exceed the budget on their own, or are extracted in segments, are yielded alone,
+    without ending the batch being packed.
+
+    Parameters
+    ----------
+    jobs : Iterable[AudioExtractJob]
+        The jobs to pack.
+    budget : BatchBudget | None
+        The budget of each batch, or None to yield every job alone.
+
+    Returns
+    -------
+    Iterator[list[AudioExtractJob]]
+        The batches.
+    """
+    if budget is None:
+        yield from ([job] for job in jobs)
+        return
+
+    batch: list[AudioExtractJob] = []
+    batch_seconds = 0.0
+    batch_bytes = 0
+    for job in jobs:
+        seconds, size = job_seconds(job), _job_bytes(job)
+        if seconds > budget.max_seconds or size > budget.max_bytes or job.segment_plan is not None:
+            yield [job]
+            continue
+
+        if batch_seconds + seconds > budget.max_seconds or batch_bytes + size > budget.max_bytes:
+            yield batch
+            batch, batch_seconds, batch_bytes = [], 0.0, 0
+
+        batch.append(job)
+        batch_seconds += seconds
+        batch_bytes += size
+
+        if len(batch) >= budget.max_inputs:
+            yield batch
+            batch, batch_seconds, batch_bytes = [], 0.0, 0
+
+    if batch:
+        yield batch
+
+
+def _without_global_args(output: FFmpegOutput) -> FFmpegOutput:
+    while isinstance(output.node, GlobalNode):
+        output = output.node.incoming_edges[0].upstream_node.stream()
+
+    return output
+
+
+def merge_job_outputs(jobs: Sequence[AudioExtractJob]) -> FFmpegOutput:
+    """Merge the outputs of every stream of several jobs, so a single FFmpeg process extracts them all.
+
+    Each input is opened once, and each output is mapped from its own input.
+
+    Parameters
+    ----------
+    jobs : Sequence[AudioExtractJob]
+        The jobs.
+
+    Returns
+    -------
+    FFmpegOutput
+        The merged output, reporting progress to stdout.
+    """
+    outputs = [_without_global_args(output) for job in jobs for output in job.stream_indexed_outputs.values()]
+    return with_progress_args(ffmpeg.merge_outputs(*outputs))
@@ -0,0 +1,231 @@
+"""Audio codecs and the containers they can be written to."""
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Final
+
+import rich.repr
+
+if TYPE_CHECKING:
+    from BAET._config.ffmpeg_capabilities import FFmpegCapabilities
+
+COPY_CODEC: Final = "copy"
+AUTO_CODEC: Final = "auto"
+
+# Raw PCM codecs that can be stored in a WAV file as they are
+_WAV_PCM_CODECS: Final = frozenset(
+    {
+        "pcm_u8",
+        "pcm_s16le",
+        "pcm_s24le",
+        "pcm_s32le",
+        "pcm_s64le",
+        "pcm_f32le",
+        "pcm_f64le",
+        "pcm_alaw",
+        "pcm_mulaw",
+    }
+)
+
+
+@rich.repr.auto()
+@dataclass(frozen=True)
+class Container:
+    """An output container, and the audio codecs it holds.
+
+    Attributes
+    ----------
+    muxer : str
+        The FFmpeg muxer that writes the container.
+    encoder : str
+        The FFmpeg encoder used when a stream cannot be copied into the container.
+        It is the encoder FFmpeg builds most commonly have, and is used when FFmpeg's capabilities are unknown.
+    copyable_codecs : frozenset[str] | None
+        The codecs, as named by FFprobe, that can be copied into the container without re-encoding,
+        or None if any audio codec can be.
+    faster_encoders : tuple[str, ...]
+        Encoders of comparable quality that are faster than `encoder`, in order of preference.
+        They are used instead of `encoder` when FFmpeg has them.
+    fallback_encoders : tuple[str, ...]
+        Encoders used when FFmpeg has neither `encoder` nor any of `faster_encoders`, in order of preference.
+    """
+
+    muxer: str
+    encoder: str
+    copyable_codecs: frozenset[str] | None
+    faster_encoders: tuple[str, ...] = ()
+    fallback_encoders: tuple[str, ...] = ()
+
+    @property
+    def encoders(self) -> tuple[str, ...]:
+        """The encoders of the container, in order of preference."""
+        return (*self.faster_encoders, self.encoder, *self.fallback_encoders)
+
+    def select_encoder(self, capabilities: "FFmpegCapabilities | None" = None) -> str:
+        """Select the most preferred encoder that FFmpeg has.
+
+        Parameters
+        ----------
+        capabilities : FFmpegCapabilities | None, optional
+            The capabilities of FFmpeg, by default None, in which case `encoder` is used.
+
+        Returns
+        -------
+        str
+            The encoder.
+
+        Raises
+        ------
+        ValueError
+            If FFmpeg has none of the container's encoders.
+        """
+        if capabilities is None:
+            return self.encoder
+
+        for encoder in self.encoders:
+            if encoder in capabilities.audio_encoders:
+                return encoder
+
+        raise ValueError(f"FFmpeg has none of the encoders for {self.muxer} files: {', '.join(self.encoders)}")
+
+    def can_copy(self, codec_name: str | None) -> bool:
+        """Check whether a stream can be copied into the container without re-encoding.
+
+        Parameters
+        ----------
+        codec_name : str | None
+            The codec of the stream, as named by FFprobe.
+
+        Returns
+        -------
+        bool
+            True if the stream can be remuxed into the container, False otherwise.
+        """
+        if codec_name is None or codec_name == "none":
+            return False
+
+        return self.copyable_codecs is None or codec_name in self.copyable_codecs
+
+
+CONTAINERS: Final[Mapping[str, Container]] = {
+    "wav": Container("wav", "pcm_s16le", _WAV_PCM_CODECS),
+    "flac": Container("flac", "flac", frozenset({"flac"})),
+    "mp3": Container("mp3", "libmp3lame", frozenset({"mp3"}), fallback_encoders=("libshine",)),
+    "ogg": Container(
+        "ogg", "libvorbis", frozenset({"vorbis", "opus", "flac"}), fallback_encoders=("libopus", "vorbis")
+    ),
+    "opus": Container("opus", "libopus", frozenset({"opus"}), fallback_encoders=("opus",)),
+    "m4a": Container("ipod", "aac", frozenset({"aac", "alac"}), faster_encoders=("aac_at", "libfdk_aac")),
+    "mka": Container("matroska", "flac", None),
+}
+
+
+def container_for(path: Path) -> Container:
+    """Get the container of an output file from its extension.
+
+    Parameters
+    ----------
+    path : Path
+        The output file.
+
+    Returns
+    -------
+    Container
+        The container to write.
+
+    Raises
+    ------
+    ValueError
+        If the extension is not a supported audio container.
+    """
+    return container_for_filetype(path.suffix)
+
+
+def container_for_filetype(filetype: str) -> Container:
+    """Get the container of a file extension.
+
+    Parameters
+    ----------
+    filetype : str
+        The file extension, with or without the leading dot.
+
+    Returns
+    -------
+    Container
+        The container to write.
+
+    Raises
+    ------
+    ValueError
+        If the extension is not a supported audio container.
+    """
+    extension = filetype.lstrip(".").lower()
+    if extension not in CONTAINERS:
+        raise ValueError(f"Unsupported output file type {filetype!r}")
+
+    return CONTAINERS[extension]
+
+
+def check_plan(codec: str, container: Container, capabilities: "FFmpegCapabilities") -> None:
+    """Check that FFmpeg can write a container with the requested codec, before any streams are extracted.
+
+    Parameters
+    ----------
+    codec : str
+        The requested codec. See `select_codec`.
+    container : Container
+        The container streams are written to.
+    capabilities : FFmpegCapabilities
+        The capabilities of FFmpeg.
+
+    Raises
+    ------
+    ValueError
+        If FFmpeg cannot write the container, or does not have the requested encoder.
+    """
+    if container.muxer not in capabilities.muxers:
+        raise ValueError(f"FFmpeg {capabilities.version} cannot write {container.muxer} files")
+
+    if codec not in {AUTO_CODEC, COPY_CODEC} and codec not in capabilities.audio_encoders:
+        raise ValueError(f"FFmpeg {capabilities.version} does not have the {codec} audio encoder")
+
+
+def select_codec(
+    codec: str,
+    codec_name: str | None,
+    container: Container,
+    capabilities: "FFmpegCapabilities | None" = None,
+) -> str:
+    """Select the codec to write a stream with.
+
+    Parameters
+    ----------
+    codec : str
+        The requested codec. Either `COPY_CODEC` to copy the stream, `AUTO_CODEC` to copy the stream
+        if the container can hold it and otherwise encode it with the container's encoder, or the name of an encoder.
+    codec_name : str | None
+        The codec of the stream, as named by FFprobe.
+    container : Container
+        The container the stream is written to.
+    capabilities : FFmpegCapabilities | None, optional
+        The capabilities of FFmpeg, used to select the container's encoder, by default None.
+
+    Returns
+    -------
+    str
+        `COPY_CODEC` if the stream is copied, otherwise the encoder to encode the stream with.
+
+    Raises
+    ------
+    ValueError
+        If the stream must be copied, but the container cannot hold it,
+        or must be encoded, but FFmpeg supports none of the container's encoders.
+    """
+    if codec == AUTO_CODEC:
+        return COPY_CODEC if container.can_copy(codec_name) else container.select_encoder(capabilities)
+
+    if codec == COPY_CODEC and not container.can_copy(codec_name):
+        raise ValueError(f"Cannot copy a {codec_name or 'unknown'} stream into a {container.muxer} container")
+
+    return codec
@@ -0,0 +1,186 @@
+"""Engines to run FFmpeg processes and monitor their progress, from a thread or an event loop."""
+
+import asyncio
+import os
+import subprocess
+import time
+from asyncio.subprocess import DEVNULL, PIPE, Process
+from concurrent.futures import ThreadPoolExecutor
+
+import ffmpeg
+from BAET._config.logging import create_logger
+from BAET.FFmpeg.metrics import ProcessUsage
+from BAET.FFmpeg.progress import READ_SIZE, STDERR_TAIL_BYTES, ProgressParser, read_progress, read_tail
+from BAET.typing import FFmpegOutput, ProgressCallback
+
+logger = create_logger()
+
+TERMINATE_TIMEOUT_SECONDS = 5.0
+
+
+def _terminate_sync(proc: subprocess.Popen[bytes]) -> None:
+    if proc.poll() is not None:
+        return
+
+    # FFmpeg finalises its outputs on SIGTERM, so only kill it if it does not exit in time
+    proc.terminate()
+    try:
+        proc.wait(TERMINATE_TIMEOUT_SECONDS)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+def _wait_with_usage(proc: subprocess.Popen[bytes], started: float) -> ProcessUsage:
+    # `os.wait4` reaps the child and returns its resource usage, where `Popen.wait` would discard it
+    if hasattr(os, "wait4"):
+        try:
+            _, status, rusage = os.wait4(proc.pid, 0)
+        except ChildProcessError:
+            # Already reaped, so only the wall time is known
+            proc.wait()
+        else:
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            return ProcessUsage.from_rusage(time.perf_counter() - started, rusage)
+
+    proc.wait()
+    return ProcessUsage(time.perf_counter() - started)
+
+
+def run_ffmpeg(output: FFmpegOutput, on_progress: ProgressCallback) -> ProcessUsage:
+    """Run FFmpeg for an output, blocking the calling thread until it exits.
+
+    Progress reported by FFmpeg via `-progress` is parsed on the calling thread, while stderr
+    is drained concurrently on a helper thread so the child never stalls on a full pipe.
+
+    Parameters
+    ----------
+    output : FFmpegOutput
+        The FFmpeg output to run. It must report progress to stdout.
+    on_progress : ProgressCallback
+        Called with each progress report from FFmpeg.
+
+    Returns
+    -------
+    ProcessUsage
+        The resources FFmpeg used. CPU time and peak memory are only known on platforms with `os.wait4`.
+
+    Raises
+    ------
+    RuntimeError
+        If FFmpeg exits with a non-zero exit code.
+    ValueError
+        If the FFmpeg process pipes could not be opened.
+    """
+    args = ffmpeg.compile(output)
+    logger.debug("Running: %s", " ".join(args))
+
+    started = time.perf_counter()
+    with subprocess.Popen(  # noqa: S603
+        args,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    ) as proc:
+        stderr_reader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="baet-stderr")
+        try:
+            if proc.stdout is None or proc.stderr is None:
+                raise ValueError("FFmpeg process pipes are None")
+
+            err = stderr_reader.submit(read_tail, proc.stderr)
+            read_progress(proc.stdout, on_progress)
+
+            usage = _wait_with_usage(proc, started)
+            if proc.returncode != 0:
+                raise RuntimeError(err.result().decode("utf-8", errors="replace").strip())
+
+            return usage
+        except (RuntimeError, ValueError) as e:
+            logger.critical("%s: %s", type(e).__name__, e)
+            raise
+        finally:
+            # Terminating FFmpeg closes stderr, so the reader always finishes
+            _terminate_sync(proc)
+            stderr_reader.shutdown()
+
+
+async def _read_progress(stdout: asyncio.StreamReader, on_progress: ProgressCallback) -> None:
+    parser = ProgressParser(on_progress)
+    while data := await stdout.read(READ_SIZE):
+        parser.feed(data)
+
+
+async def _read_tail(stream: asyncio.StreamReader) -> bytes:
+    tail = bytearray()
+    while data := await stream.read(READ_SIZE):
+        tail += data
+        if len(tail) > 2 * STDERR_TAIL_BYTES:
+            del tail[:-STDERR_TAIL_BYTES]
+
+    return bytes(tail[-STDERR_TAIL_BYTES:])
+
+
+async def _terminate(proc: Process) -> None:
+    if proc.returncode is not None:
+        return
+
+    # FFmpeg finalises its outputs on SIGTERM, so only kill it if it does not exit in time
+    proc.terminate()
+    try:
+        await asyncio.wait_for(proc.wait(), TERMINATE_TIMEOUT_SECONDS)
+    except TimeoutError:
+        proc.kill()
+        await proc.wait()
+
+
+async def run_ffmpeg_async(output: FFmpegOutput, on_progress: ProgressCallback) -> ProcessUsage:
+    """Run FFmpeg for an output as a child process of the running event loop.
+
+    Progress reported by FFmpeg via `-progress` is parsed without blocking the loop,
+    while stderr is drained concurrently so the child never stalls on a full pipe.
+
+    Parameters
+    ----------
+    output : FFmpegOutput
+        The FFmpeg output to run. It must report progress to stdout.
+    on_progress : ProgressCallback
+        Called with each progress report from FFmpeg.
+
+    Returns
+    -------
+    ProcessUsage
+        The resources FFmpeg used. Only the wall time is known, as the event loop reaps the process.
+
+    Raises
+    ------
+    RuntimeError
+        If FFmpeg exits with a non-zero exit code.
+    ValueError
+        If the FFmpeg process pipes could not be opened.
+    asyncio.CancelledError
+        If the task is cancelled. The FFmpeg process is terminated before this is re-raised.
+    """
+    args = ffmpeg.compile(output)
+    logger.debug("Running: %s", " ".join(args))
+
+    started = time.perf_counter()
+    proc = await asyncio.create_subprocess_exec(*args, stdin=DEVNULL, stdout=PIPE, stderr=PIPE)
+
+    try:
+        if proc.stdout is None or proc.stderr is None:
+            raise ValueError("FFmpeg process pipes are None")
+
+        _, err = await asyncio.gather(
+            _read_progress(proc.stdout, on_progress),
+            _read_tail(proc.stderr),
+        )
+
+        if await proc.wait() != 0:
+            raise RuntimeError(err.decode("utf-8", errors="replace").strip())
+
+        return ProcessUsage(time.perf_counter() - started)
+    except (RuntimeError, ValueError) as e:
+        logger.critical("%s: %s", type(e).__name__, e)
+        raise
+    finally:
+        await _terminate(proc)
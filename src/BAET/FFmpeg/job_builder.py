@@ -0,0 +1,194 @@
+"""Build audio extraction jobs from probed input files."""
+
+from collections.abc import MutableMapping
+from contextlib import ExitStack
+from pathlib import Path
+
+import ffmpeg
+from BAET._config.ffmpeg_capabilities import FFmpegCapabilities
+from BAET._config.logging import create_logger
+from BAET.constants import EncoderPreset
+from BAET.FFmpeg.codecs import AUTO_CODEC, COPY_CODEC, container_for, select_codec
+from BAET.FFmpeg.jobs import AudioExtractJob, StreamRecord, with_progress_args
+from BAET.FFmpeg.manifest import ExtractionManifest, OutputEncoding
+from BAET.FFmpeg.metrics import ExtractionMetrics, timed_phase
+from BAET.FFmpeg.probe import probe_audio_streams
+from BAET.FFmpeg.probe_cache import ProbeCache
+from BAET.FFmpeg.profiles import DEFAULT_PRESET, encoder_options
+from BAET.FFmpeg.segmenting import SegmentedStream, SegmentPlan, can_stitch, split_timeline
+from BAET.FFmpeg.track_selection import TrackSelector
+from BAET.helpers.file_identity import file_identity
+from BAET.typing import EncoderOptions, StreamIndex
+from ffmpeg import Stream
+
+logger = create_logger()
+
+
+def build_job(
+    file: Path,
+    out_path: Path,
+    *,
+    single_pass: bool = True,
+    codec: str = AUTO_CODEC,
+    preset: EncoderPreset = DEFAULT_PRESET,
+    capabilities: FFmpegCapabilities | None = None,
+    probe_cache: ProbeCache | None = None,
+    manifest: ExtractionManifest | None = None,
+    overwrite: bool = False,
+    metrics: ExtractionMetrics | None = None,
+    segments: int = 1,
+    tracks: TrackSelector | None = None,
+) -> AudioExtractJob:
+    """Build an audio extraction job.
+
+    Parameters
+    ----------
+    file : Path
+        The file to extract audio from.
+
+    out_path : Path
+        The output path to extract to.
+
+    single_pass : bool, optional
+        Whether to extract all audio streams with a single FFmpeg process, by default True.
+        The input is then demuxed and read from disk once, rather than once per stream.
+
+    codec : str, optional
+        The codec to write streams with, by default `AUTO_CODEC`, which copies streams the output container
+        can hold without re-encoding them. See `select_codec`.
+
+    preset : EncoderPreset, optional
+        The encoder preset to encode streams with, by default `DEFAULT_PRESET`. See `encoder_options`.
+
+    capabilities : FFmpegCapabilities | None, optional
+        The capabilities of FFmpeg, used to select the fastest encoder FFmpeg supports, by default None.
+
+    probe_cache : ProbeCache | None, optional
+        The cache of previous probe results to use, by default None.
+
+    manifest : ExtractionManifest | None, optional
+        The manifest of completed extractions, by default None.
+        Streams the manifest records as completely extracted from the unchanged input, with the same codec,
+        encoder options and output container, are skipped.
+
+    overwrite : bool, optional
+        Whether to extract every stream, even if the manifest records it as completely extracted, by default False.
+
+    metrics : ExtractionMetrics | None, optional
+        The metrics to record the time spent probing to, by default None.
+
+    segments : int, optional
+        The most segments to split the timeline of the file into, by default 1.
+        Streams that can be joined sample for sample, see `can_stitch`, are extracted in concurrent segments,
+        if the file is long enough to split. See `split_timeline`.
+
+    tracks : TrackSelector | None, optional
+        The audio streams to extract, by default None, which extracts every audio stream.
+        Streams that are not selected are left out of every FFmpeg output, so they are never decoded or written.
+
+    Returns
+    -------
+    AudioExtractJob
+        The audio extraction job.
+    """
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+
+    audio_streams: list[StreamRecord] = []
+    stream_outputs: MutableMapping[int, Stream] = {}
+    output_paths: dict[StreamIndex, Path] = {}
+    output_encodings: dict[StreamIndex, OutputEncoding] = {}
+    segmentable: list[SegmentedStream] = []
+
+    file = file.expanduser()
+    container = container_for(out_path)
+    input_identity = file_identity(file) if manifest is not None else None
+    ffmpeg_input = ffmpeg.input(str(file))
+    with ExitStack() as stack:
+        with timed_phase(metrics, "probe"):
+            streams = stack.enter_context(probe_audio_streams(file, probe_cache))
+
+        for idx, stream in enumerate(streams):
+            stream_index = stream["index"]
+            if tracks is not None and not tracks.matches(stream):
+                logger.info("Skipping stream %d of %r, not selected by %r", stream_index, file, tracks)
+                continue
+
+            output_path = out_path.with_stem(f"{out_path.stem}_track{stream_index}")
+
+            try:
+                stream_codec = select_codec(codec, stream.get("codec_name"), container, capabilities)
+            except ValueError as e:
+                logger.error("Skipping stream %d of %r. %s", stream_index, file, e)
+                continue
+
+            if stream_codec == COPY_CODEC:
+                output_kwargs: EncoderOptions = {"acodec": COPY_CODEC}
+            else:
+                output_kwargs = {"acodec": stream_codec, **encoder_options(stream_codec, preset)}
+                if capabilities is not None and stream_codec in capabilities.experimental_encoders:
+                    output_kwargs = {**output_kwargs, "strict": "experimental"}
+
+            encoding = OutputEncoding.create(stream_index, stream_codec, container.muxer, output_kwargs)
+            if (
+                not overwrite
+                and manifest is not None
+                and input_identity is not None
+                and manifest.is_complete(input_identity, output_path, encoding)
+            ):
+                logger.info("Skipping stream %d of %r, already extracted to %r", stream_index, file, output_path)
+                continue
+
+            if stream_codec == COPY_CODEC:
+                logger.info("Copying %s stream %d of %r", stream.get("codec_name"), stream_index, file)
+
+            audio_streams.append(StreamRecord.from_probe(stream))
+            output_paths[stream_index] = output_path
+            output_encodings[stream_index] = encoding
+
+            if segments > 1 and can_stitch(stream.get("codec_name"), stream_codec, container.muxer):
+                segmentable.append(
+                    SegmentedStream(stream_index, f"a:{idx}", output_path, container.muxer, output_kwargs)
+                )
+                continue
+
+            stream_outputs[stream_index] = ffmpeg.output(
+                ffmpeg_input[f"a:{idx}"],
+                f"{output_path.resolve().as_posix()}",  # .replace(" ", r"\ ")}",
+                format=container.muxer,
+                **output_kwargs,
+            )
+
+    segment_plan = None
+    if segmentable:
+        durations = {record.index: record.duration_ms for record in audio_streams}
+        timeline = split_timeline(max(durations[segmented.index] for segmented in segmentable), segments)
+        if len(timeline) > 1:
+            logger.info("Extracting %d audio streams of %r in %d segments", len(segmentable), file, len(timeline))
+            segment_plan = SegmentPlan(timeline, tuple(segmentable))
+        else:
+            # Too short to split, so extracted like any other stream
+            for segmented in segmentable:
+                stream_outputs[segmented.index] = ffmpeg.output(
+                    ffmpeg_input[segmented.selector],
+                    f"{segmented.output_path.resolve().as_posix()}",
+                    format=segmented.muxer,
+                    **segmented.output_options,
+                )
+            stream_outputs = dict(sorted(stream_outputs.items()))
+
+    indexed_outputs = {index: with_progress_args(output) for index, output in stream_outputs.items()}
+
+    merged_output = None
+    if single_pass and stream_outputs:
+        merged_output = with_progress_args(ffmpeg.merge_outputs(*stream_outputs.values()))
+
+    return AudioExtractJob(
+        file,
+        audio_streams,
+        indexed_outputs,
+        merged_output,
+        output_paths,
+        input_identity,
+        segment_plan,
+        output_encodings,
+    )
@@ -1,11 +1,12 @@
 """Jobs that encapsulate work to be done by FFmpeg."""
 
 import re
-from collections.abc import Sequence
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass
 from fractions import Fraction
 from logging import Logger
 from pathlib import Path
-from typing import Any, overload
+from typing import TYPE_CHECKING, Any, overload
 
 import rich.repr
 from more_itertools import first_true
@@ -13,9 +14,21 @@ from more_itertools import first_true
 import ffmpeg
 from BAET._config.logging import create_logger
 from BAET.cli.types import FFmpegArgsRepr
+from BAET.FFmpeg.manifest import OutputEncoding
+from BAET.helpers.file_identity import FileIdentity
 from BAET.helpers.string_helpers import pretty_join
 from BAET.helpers.time_conversion import micro_to_hhmmss
-from BAET.typing import AudioStream, FFmpegOutput, IndexedAudioStream, IndexedOutputs, Millisecond, StreamIndex
+from BAET.typing import (
+    AudioStream,
+    FFmpegOutput,
+    IndexedOutputs,
+    IndexedPaths,
+    Millisecond,
+    StreamIndex,
+)
+
+if TYPE_CHECKING:
+    from BAET.FFmpeg.segmenting import SegmentPlan
 
 logger: Logger = create_logger()
 
@@ -108,6 +121,22 @@ class JobMetadata:
         )
 
 
+def with_progress_args(output: FFmpegOutput) -> FFmpegOutput:
+    """Apply the global arguments required to run and monitor an FFmpeg output.
+
+    Parameters
+    ----------
+    output : FFmpegOutput
+        The output, or merged outputs, to run
+
+    Returns
+    -------
+    FFmpegOutput
+        The output with overwriting enabled and progress reported to stdout
+    """
+    return output.overwrite_output().global_args("-progress", "-", "-nostats")
+
+
 def stream_duration_ms(stream: AudioStream) -> Millisecond:
     """Get the duration of the audio stream in milliseconds.
 
@@ -146,6 +175,49 @@ def stream_duration_ms(stream: AudioStream) -> Millisecond:
     raise ValueError(f"Could not find duration in {stream!r}")
 
 
+@rich.repr.auto()
+@dataclass(frozen=True, slots=True)
+class StreamRecord:
+    """The fields of a probed audio stream needed to extract it and report its progress.
+
+    Jobs keep these compact records rather than the probe results, as every queued job is held for the whole run.
+
+    Attributes
+    ----------
+    index : StreamIndex
+        The index of the stream in its file.
+    codec_name : str | None
+        The codec of the stream, if known.
+    duration_ms : Millisecond
+        The duration of the stream, as given by `stream_duration_ms`.
+    """
+
+    index: StreamIndex
+    codec_name: str | None
+    duration_ms: Millisecond
+
+    @classmethod
+    def from_probe(cls, stream: AudioStream) -> "StreamRecord":
+        """Create the record of an audio stream probed by FFprobe.
+
+        Parameters
+        ----------
+        stream : AudioStream
+            The probed audio stream.
+
+        Returns
+        -------
+        StreamRecord
+            The record of the stream.
+
+        Raises
+        ------
+        ValueError
+            If the duration of the stream cannot be found.
+        """
+        return cls(stream["index"], stream.get("codec_name"), stream_duration_ms(stream))
+
+
 class AudioExtractJob:
     """An FFmpeg job to extract audio from a video file.
 
@@ -153,36 +225,62 @@ class AudioExtractJob:
     ----------
     input_file : Path
     stream_indexed_outputs : IndexedOutputs
-    audio_streams : Sequence[AudioStream]
-    indexed_audio_streams : IndexedAudioStream
-    durations_ms_dict : dict[StreamIndex, Millisecond]
+    merged_output : FFmpegOutput | None
+        A single FFmpeg invocation extracting every stream, if the job runs in a single pass.
+    output_paths : IndexedPaths
+        The file each stream is extracted to.
+    input_identity : FileIdentity | None
+        The identity of the input file when the job was built, if known.
+    output_encodings : Mapping[StreamIndex, OutputEncoding]
+        How each stream is extracted, as recorded in the manifest of completed extractions.
+    audio_streams : tuple[StreamRecord, ...]
+        The streams to extract, in index order.
+    indexed_audio_streams : dict[StreamIndex, StreamRecord]
+    segment_plan : SegmentPlan | None
+        The streams extracted in concurrent segments of the timeline, if any.
+        They have no output in `stream_indexed_outputs` or `merged_output`.
     """
 
+    __slots__ = (
+        "audio_streams",
+        "indexed_audio_streams",
+        "input_file",
+        "input_identity",
+        "merged_output",
+        "output_encodings",
+        "output_paths",
+        "segment_plan",
+        "stream_indexed_outputs",
+    )
+
     def __init__(
         self,
         input_file: Path,
-        audio_streams: Sequence[AudioStream],
+        audio_streams: Iterable[StreamRecord],
         indexed_outputs: IndexedOutputs,
+        merged_output: FFmpegOutput | None = None,
+        output_paths: IndexedPaths | None = None,
+        input_identity: FileIdentity | None = None,
+        segment_plan: "SegmentPlan | None" = None,
+        output_encodings: Mapping[StreamIndex, OutputEncoding] | None = None,
     ) -> None:
         self.input_file: Path = input_file
         self.stream_indexed_outputs: IndexedOutputs = indexed_outputs
-        self.audio_streams = audio_streams
-
-        indexed_audio_streams = {}
-        for stream in audio_streams:
-            indexed_audio_streams[stream["index"]] = stream
-        self.indexed_audio_streams: IndexedAudioStream = indexed_audio_streams
-
-        # TODO: Do we need this?
-        self.durations_ms_dict: dict[StreamIndex, Millisecond] = {
-            stream["index"]: stream_duration_ms(stream) for stream in audio_streams
+        self.merged_output: FFmpegOutput | None = merged_output
+        self.output_paths: IndexedPaths = output_paths or {}
+        self.input_identity: FileIdentity | None = input_identity
+        self.segment_plan: SegmentPlan | None = segment_plan
+        self.output_encodings: Mapping[StreamIndex, OutputEncoding] = output_encodings or {}
+        self.audio_streams: tuple[StreamRecord, ...] = tuple(audio_streams)
+        self.indexed_audio_streams: dict[StreamIndex, StreamRecord] = {
+            stream.index: stream for stream in self.audio_streams
         }
 
         logger.info(
             pretty_join(
-                list(self.durations_ms_dict.items()),
+                self.audio_streams,
                 "Parsed duration for %r",
-                formatter=lambda kvp: f"Stream index {kvp[0]}: {kvp[1]} ({micro_to_hhmmss(kvp[1])})",
+                formatter=lambda st: f"Stream index {st.index}: {st.duration_ms} ({micro_to_hhmmss(st.duration_ms)})",
                 force_newline=True,
             ),
             self.input_file,
@@ -197,14 +295,27 @@ class AudioExtractJob:
             The rich representation.
         """
         yield "input_file", self.input_file
-        yield "indexed_audio_streams", self.indexed_audio_streams
-        yield "durations_ms_dict", self.durations_ms_dict
+        yield "audio_streams", self.audio_streams
         yield (
             "stream_indexed_outputs",
             {k: FFmpegArgsRepr(ffmpeg.get_args(v)) for k, v in self.stream_indexed_outputs.items()},
         )
-
-    def stream(self, index: StreamIndex) -> AudioStream:
+        if self.merged_output is not None:
+            yield "merged_output", FFmpegArgsRepr(ffmpeg.get_args(self.merged_output))
+        if self.segment_plan is not None:
+            yield "segment_plan", self.segment_plan
+
+    @property
+    def stream_indexes(self) -> list[StreamIndex]:
+        """The indexes of the streams to extract, in index order."""
+        return [stream.index for stream in self.audio_streams]
+
+    @property
+    def duration_ms(self) -> Millisecond:
+        """The duration of the longest stream to extract, as given by `stream_duration_ms`."""
+        return max((stream.duration_ms for stream in self.audio_streams), default=0)
+
+    def stream(self, index: StreamIndex) -> StreamRecord:
         """Get the audio stream with the given index.
 
         Parameters
@@ -214,19 +325,13 @@ class AudioExtractJob:
 
         Returns
         -------
-        AudioStream
+        StreamRecord
             The audio stream with the given index
         """
-        stream: AudioStream | None = first_true(
-            self.audio_streams,
-            default=None,
-            pred=lambda st: st["index"] == index if st is not None else None,
-        )
-
-        if stream is None:
-            raise IndexError(f'Stream with index "{index}" not found')
-
-        return stream
+        try:
+            return self.indexed_audio_streams[index]
+        except KeyError:
+            raise IndexError(f'Stream with index "{index}" not found') from None
 
 
 if __name__ == "__main__":
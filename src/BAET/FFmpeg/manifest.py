@@ -0,0 +1,285 @@
+"""Manifest of completed extractions, used to resume and incrementally update outputs."""
+
+import json
+import os
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Lock
+from typing import Any
+
+import rich.repr
+
+from BAET._config.logging import create_logger
+from BAET.helpers.file_identity import FileIdentity
+from BAET.typing import EncoderOptions, Millisecond, StreamIndex
+
+logger = create_logger()
+
+MANIFEST_FILENAME = ".baet-manifest.jsonl"
+MANIFEST_VERSION = 2
+DEFAULT_MAX_DIRECTORIES = 64
+
+# Superseded records are only compacted away once they outnumber the live entries by this factor
+_COMPACTION_FACTOR = 2
+
+
+@rich.repr.auto()
+@dataclass(frozen=True, slots=True)
+class OutputEncoding:
+    """How an output is extracted from its input. An output extracted differently is stale.
+
+    Attributes
+    ----------
+    stream_index : StreamIndex
+        The index of the extracted stream in its input.
+    codec : str
+        The encoder the stream is written with, or `copy`.
+    muxer : str
+        The FFmpeg muxer of the output file.
+    options : tuple[tuple[str, str | int], ...]
+        The FFmpeg output options the stream is encoded with, sorted by name.
+    """
+
+    stream_index: StreamIndex
+    codec: str
+    muxer: str
+    options: tuple[tuple[str, str | int], ...]
+
+    @classmethod
+    def create(cls, stream_index: StreamIndex, codec: str, muxer: str, options: EncoderOptions) -> "OutputEncoding":
+        """Create the encoding of an output from its FFmpeg output options.
+
+        Parameters
+        ----------
+        stream_index : StreamIndex
+            The index of the extracted stream in its input.
+        codec : str
+            The encoder the stream is written with, or `copy`.
+        muxer : str
+            The FFmpeg muxer of the output file.
+        options : EncoderOptions
+            The FFmpeg output options the stream is encoded with.
+
+        Returns
+        -------
+        OutputEncoding
+            The encoding.
+        """
+        return cls(stream_index, codec, muxer, tuple(sorted(options.items())))
+
+    def to_json(self) -> dict[str, Any]:
+        """Get the JSON representation of the encoding, as recorded in a manifest."""
+        return {
+            "stream_index": self.stream_index,
+            "codec": self.codec,
+            "muxer": self.muxer,
+            "options": dict(self.options),
+        }
+
+
+@rich.repr.auto()
+@dataclass(frozen=True, slots=True)
+class _ManifestEntry:
+    input_identity: FileIdentity
+    size: int
+    encoding: Mapping[str, Any]
+
+    @classmethod
+    def parse(cls, record: Any) -> "_ManifestEntry":
+        # A record is validated when it is used, so one bad record only invalidates its own output
+        if not isinstance(record, dict) or not isinstance(record.get("input"), dict):
+            raise TypeError(f"Malformed record {record!r}")
+
+        input_identity = FileIdentity(**record["input"])
+        size, encoding = record["size"], record["encoding"]
+        if not isinstance(size, int) or not isinstance(encoding, dict):
+            raise TypeError(f"Malformed record {record!r}")
+
+        return cls(input_identity, size, encoding)
+
+
+class ExtractionManifest:
+    """A record of completed extractions, stored as a JSON lines file in each output directory.
+
+    An output is recorded once FFmpeg has finished writing it, along with the identity of its input,
+    how it was encoded, its size and its duration. An output is complete if it still has its recorded size,
+    its input is unchanged and it would be encoded the same way again. Outputs left behind by an interrupted run
+    have no matching record, so are redone.
+
+    Each record is appended to the manifest as its own line, so recording an output does not rewrite the records
+    of every other output. The latest record of an output supersedes earlier ones, and superseded records are
+    compacted away when the manifest is next read. Records that cannot be read are ignored, so their outputs are
+    redone.
+
+    Only the records of the most recently used output directories are kept in memory, so memory does not grow
+    with the number of directories in a batch. Every record is written as soon as it is made, so the records of
+    a directory that is evicted are simply read again if it is used again.
+
+    The manifest is safe to use from multiple threads.
+    """
+
+    def __init__(self, *, max_directories: int = DEFAULT_MAX_DIRECTORIES) -> None:
+        """Create an empty manifest, which reads the manifest file of each output directory as it is used.
+
+        Parameters
+        ----------
+        max_directories : int, optional
+            The maximum number of output directories to keep the records of in memory,
+            by default `DEFAULT_MAX_DIRECTORIES`.
+        """
+        self.max_directories = max_directories
+
+        self._lock = Lock()
+        self._manifests: OrderedDict[Path, dict[str, Any]] = OrderedDict()
+
+    def _records(self, directory: Path) -> dict[str, Any]:
+        if directory in self._manifests:
+            self._manifests.move_to_end(directory)
+            return self._manifests[directory]
+
+        records: dict[str, Any] = {}
+        lines = 0
+        # A damaged manifest is rewritten, so records are not appended to the end of an unterminated line
+        damaged = False
+        manifest_file = directory / MANIFEST_FILENAME
+        try:
+            with manifest_file.open(encoding="utf-8") as f:
+                for lines, line in enumerate(f, start=1):
+                    damaged = damaged or not line.endswith("\n")
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # e.g. the last line of a run that was killed while recording
+                        logger.warning("Ignoring unreadable line %d of manifest %r", lines, manifest_file)
+                        damaged = True
+                        continue
+
+                    if isinstance(record, dict) and record.get("version") == MANIFEST_VERSION:
+                        records[str(record.get("output", ""))] = record
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable manifest %r. %s: %s", manifest_file, type(e).__name__, e)
+            damaged = True
+
+        self._manifests[directory] = records
+        if damaged or lines > _COMPACTION_FACTOR * max(1, len(records)):
+            self._compact(directory)
+
+        while len(self._manifests) > self.max_directories:
+            self._manifests.popitem(last=False)
+
+        return records
+
+    def _compact(self, directory: Path) -> None:
+        manifest_file = directory / MANIFEST_FILENAME
+        temp_file = manifest_file.with_name(f"{manifest_file.name}.{os.getpid()}.tmp")
+
+        try:
+            with temp_file.open("w", encoding="utf-8") as f:
+                f.writelines(_line(record) for record in self._manifests[directory].values())
+            os.replace(temp_file, manifest_file)
+        except OSError as e:
+            logger.warning("Could not compact manifest %r. %s: %s", manifest_file, type(e).__name__, e)
+
+    def _append(self, directory: Path, record: dict[str, Any]) -> None:
+        manifest_file = directory / MANIFEST_FILENAME
+        try:
+            with manifest_file.open("a", encoding="utf-8") as f:
+                f.write(_line(record))
+        except OSError as e:
+            logger.warning("Could not write manifest %r. %s: %s", manifest_file, type(e).__name__, e)
+
+    def is_complete(self, input_identity: FileIdentity, output: Path, encoding: OutputEncoding) -> bool:
+        """Check whether an output was completely extracted from its unchanged input, in the same way.
+
+        Parameters
+        ----------
+        input_identity : FileIdentity
+            The identity of the input file as it is now.
+        output : Path
+            The output file.
+        encoding : OutputEncoding
+            How the output would be extracted now.
+
+        Returns
+        -------
+        bool
+            True if the output does not need to be extracted again, False otherwise.
+        """
+        with self._lock:
+            record = self._records(output.parent).get(output.name)
+
+        if record is None:
+            return False
+
+        try:
+            entry = _ManifestEntry.parse(record)
+        except (TypeError, KeyError, ValueError) as e:
+            logger.warning("Ignoring malformed manifest record of %r. %s: %s", output, type(e).__name__, e)
+            return False
+
+        if entry.input_identity != input_identity:
+            logger.info("Input of %r has changed since it was extracted", output)
+            return False
+
+        if entry.encoding != encoding.to_json():
+            logger.info("Previously extracted output %r was encoded differently", output)
+            return False
+
+        try:
+            output_size = output.stat().st_size
+        except OSError:
+            logger.info("Previously extracted output %r is missing", output)
+            return False
+
+        if output_size != entry.size:
+            logger.info("Previously extracted output %r is incomplete or was modified", output)
+            return False
+
+        return True
+
+    def record(
+        self,
+        input_identity: FileIdentity,
+        output: Path,
+        duration: Millisecond,
+        encoding: OutputEncoding,
+    ) -> None:
+        """Record that an output was completely extracted.
+
+        Parameters
+        ----------
+        input_identity : FileIdentity
+            The identity of the input file when the output was extracted.
+        output : Path
+            The output file.
+        duration : Millisecond
+            The duration of the extracted stream.
+        encoding : OutputEncoding
+            How the output was extracted.
+        """
+        try:
+            output_size = output.stat().st_size
+        except OSError as e:
+            logger.warning("Could not record output %r. %s: %s", output, type(e).__name__, e)
+            return
+
+        record = {
+            "version": MANIFEST_VERSION,
+            "output": output.name,
+            "input": input_identity._asdict(),
+            "encoding": encoding.to_json(),
+            "size": output_size,
+            "duration": duration,
+        }
+
+        with self._lock:
+            self._records(output.parent)[output.name] = record
+            self._append(output.parent, record)
+
+
+def _line(record: dict[str, Any]) -> str:
+    return json.dumps(record, separators=(",", ":")) + "\n"
@@ -0,0 +1,376 @@
+"""Timing and resource usage metrics of an extraction run, written as a JSON report with `--metrics-out`."""
+
+import contextlib
+import json
+import sys
+import time
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from contextlib import AbstractContextManager
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Lock, local
+from typing import Any
+
+import rich.repr
+
+from BAET._config.logging import create_logger
+from BAET.FFmpeg.jobs import AudioExtractJob
+from BAET.typing import StreamIndex
+
+logger = create_logger()
+
+METRICS_VERSION = 1
+
+# `ru_maxrss` is in kilobytes, except on macOS where it is in bytes
+_MAX_RSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+
+@rich.repr.auto()
+@dataclass(frozen=True, slots=True)
+class ProcessUsage:
+    """The resources used by an FFmpeg process.
+
+    Attributes
+    ----------
+    wall_seconds : float
+        The time from starting the process until it exited.
+    user_seconds : float | None
+        The CPU time spent in user mode, if known.
+    system_seconds : float | None
+        The CPU time spent in the kernel, if known.
+    max_rss_bytes : int | None
+        The peak resident set size, if known.
+    """
+
+    wall_seconds: float
+    user_seconds: float | None = None
+    system_seconds: float | None = None
+    max_rss_bytes: int | None = None
+
+    @classmethod
+    def from_rusage(cls, wall_seconds: float, rusage: Any) -> "ProcessUsage":
+        """Create the usage of a process from the `resource.struct_rusage` returned by `os.wait4`.
+
+        Parameters
+        ----------
+        wall_seconds : float
+            The time from starting the process until it exited.
+        rusage : resource.struct_rusage
+            The resource usage of the process.
+
+        Returns
+        -------
+        ProcessUsage
+            The usage of the process.
+        """
+        return cls(wall_seconds, rusage.ru_utime, rusage.ru_stime, rusage.ru_maxrss * _MAX_RSS_UNIT)
+
+    def share(self, fraction: float) -> "ProcessUsage":
+        """Get a share of the usage, for a process that did work for several jobs.
+
+        Parameters
+        ----------
+        fraction : float
+            The fraction of the process's work done for one job.
+
+        Returns
+        -------
+        ProcessUsage
+            The share of the wall and CPU time. The peak memory is shared by every job, so is kept as it is.
+        """
+        return ProcessUsage(
+            self.wall_seconds * fraction,
+            self.user_seconds * fraction if self.user_seconds is not None else None,
+            self.system_seconds * fraction if self.system_seconds is not None else None,
+            self.max_rss_bytes,
+        )
+
+    @classmethod
+    def combined(cls, usages: Sequence["ProcessUsage"], wall_seconds: float) -> "ProcessUsage":
+        """Combine the usage of several processes that did the work of one, such as the segments of a file.
+
+        Parameters
+        ----------
+        usages : Sequence[ProcessUsage]
+            The usage of each process.
+        wall_seconds : float
+            The time from starting the first process until the last exited, as the processes may overlap.
+
+        Returns
+        -------
+        ProcessUsage
+            The total CPU time and the largest peak memory of the processes, where known.
+        """
+        known_rss = [usage.max_rss_bytes for usage in usages if usage.max_rss_bytes is not None]
+        return cls(
+            wall_seconds,
+            _sum_known(usage.user_seconds for usage in usages),
+            _sum_known(usage.system_seconds for usage in usages),
+            max(known_rss, default=None),
+        )
+
+
+def _file_size(path: Path) -> int | None:
+    try:
+        return path.stat().st_size
+    except OSError:
+        return None
+
+
+def _realtime_factor(duration_seconds: float, wall_seconds: float) -> float | None:
+    return duration_seconds / wall_seconds if wall_seconds > 0 else None
+
+
+def _sum_known(values: Iterable[float | None]) -> float | None:
+    known = [value for value in values if value is not None]
+    return sum(known) if known else None
+
+
+class ExtractionMetrics:
+    """A thread-safe recorder of the time spent in each phase of an extraction run, and of every FFmpeg process.
+
+    Phases overlap, as inputs are discovered, probed and extracted concurrently. The time of a phase is
+    the total time spent in it by every thread, so it can exceed the wall time of the run. A phase timed
+    within another on the same thread, such as probing while building a job, is not counted in the outer phase,
+    so no time is counted twice.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        # The time spent in nested phases, for each phase being timed on the current thread
+        self._nesting = local()
+        self._started = time.perf_counter()
+        self._phase_seconds: dict[str, float] = {}
+        self._phase_counts: dict[str, int] = {}
+        self._files: dict[Path, dict[str, Any]] = {}
+
+    def add_time(self, phase: str, seconds: float) -> None:
+        """Add time spent in a phase.
+
+        Parameters
+        ----------
+        phase : str
+            The phase.
+        seconds : float
+            The time spent.
+        """
+        with self._lock:
+            self._phase_seconds[phase] = self._phase_seconds.get(phase, 0.0) + seconds
+            self._phase_counts[phase] = self._phase_counts.get(phase, 0) + 1
+
+    @contextlib.contextmanager
+    def phase(self, phase: str) -> Iterator[None]:
+        """Time the body of a `with` block as part of a phase.
+
+        Time spent in phases nested in the block is only counted in the nested phases.
+
+        Parameters
+        ----------
+        phase : str
+            The phase.
+        """
+        nested_seconds: list[float] = self._nesting.__dict__.setdefault("nested_seconds", [])
+        nested_seconds.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            self.add_time(phase, seconds - nested_seconds.pop())
+            if nested_seconds:
+                nested_seconds[-1] += seconds
+
+    def timed[**P, R](self, phase: str, func: Callable[P, R]) -> Callable[P, R]:
+        """Wrap a function, so the time spent in each call is part of a phase.
+
+        Parameters
+        ----------
+        phase : str
+            The phase.
+        func : Callable[P, R]
+            The function to time.
+
+        Returns
+        -------
+        Callable[P, R]
+            The timed function.
+        """
+
+        def timed_func(*args: P.args, **kwargs: P.kwargs) -> R:
+            with self.phase(phase):
+                return func(*args, **kwargs)
+
+        return timed_func
+
+    def timed_iter[T](self, phase: str, items: Iterable[T]) -> Iterator[T]:
+        """Lazily iterate over items, so the time spent producing each item is part of a phase.
+
+        Parameters
+        ----------
+        phase : str
+            The phase.
+        items : Iterable[T]
+            The items, such as a generator that scans directories.
+
+        Returns
+        -------
+        Iterator[T]
+            The items.
+        """
+        iterator = iter(items)
+        while True:
+            with self.phase(phase):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+
+            yield item
+
+    def record_process(
+        self,
+        job: AudioExtractJob,
+        streams: Sequence[StreamIndex],
+        usage: ProcessUsage,
+        *,
+        succeeded: bool,
+        batch_size: int = 1,
+    ) -> None:
+        """Record an FFmpeg process that extracted streams of a job.
+
+        Parameters
+        ----------
+        job : AudioExtractJob
+            The job the process ran for.
+        streams : Sequence[StreamIndex]
+            The indexes of the streams the process extracted.
+        usage : ProcessUsage
+            The resources the process used.
+        succeeded : bool
+            Whether the streams were extracted successfully.
+        batch_size : int, optional
+            The number of jobs the process extracted, with `usage` being the share of this job, by default 1.
+        """
+        stream_records = []
+        for stream_index in streams:
+            duration_seconds = job.stream(stream_index).duration_ms / 1_000_000
+            output = job.output_paths.get(stream_index)
+            stream_records.append(
+                {
+                    "index": stream_index,
+                    "output": str(output) if output is not None else None,
+                    "succeeded": succeeded,
+                    "duration_seconds": duration_seconds,
+                    # Streams extracted in a single pass share the wall time of their process
+                    "wall_seconds": usage.wall_seconds,
+                    "realtime_factor": _realtime_factor(duration_seconds, usage.wall_seconds),
+                    "bytes_written": _file_size(output) if output is not None and succeeded else None,
+                }
+            )
+
+        process_record = {
+            "streams": list(streams),
+            "batch_size": batch_size,
+            "wall_seconds": usage.wall_seconds,
+            "user_seconds": usage.user_seconds,
+            "system_seconds": usage.system_seconds,
+            "max_rss_bytes": usage.max_rss_bytes,
+        }
+
+        self.add_time("ffmpeg", usage.wall_seconds)
+        with self._lock:
+            file_record = self._files.setdefault(
+                job.input_file,
+                {
+                    "input": str(job.input_file),
+                    "duration_seconds": job.duration_ms / 1_000_000,
+                    "processes": [],
+                    "streams": [],
+                },
+            )
+            file_record["processes"].append(process_record)
+            file_record["streams"].extend(stream_records)
+
+    def report(self) -> dict[str, Any]:
+        """Summarise the metrics recorded so far.
+
+        Returns
+        -------
+        dict[str, Any]
+            The JSON serialisable report.
+        """
+        with self._lock:
+            wall_seconds = time.perf_counter() - self._started
+            phases = {
+                phase: {"seconds": seconds, "count": self._phase_counts[phase]}
+                for phase, seconds in sorted(self._phase_seconds.items())
+            }
+            files = [dict(file_record) for file_record in self._files.values()]
+
+        for file_record in files:
+            processes = file_record["processes"]
+            file_record["wall_seconds"] = sum(process["wall_seconds"] for process in processes)
+            file_record["user_seconds"] = _sum_known(process["user_seconds"] for process in processes)
+            file_record["system_seconds"] = _sum_known(process["system_seconds"] for process in processes)
+            file_record["max_rss_bytes"] = max(
+                (process["max_rss_bytes"] for process in processes if process["max_rss_bytes"] is not None),
+                default=None,
+            )
+            file_record["bytes_written"] = _sum_known(stream["bytes_written"] for stream in file_record["streams"])
+            file_record["realtime_factor"] = _realtime_factor(
+                file_record["duration_seconds"], file_record["wall_seconds"]
+            )
+
+        return {
+            "version": METRICS_VERSION,
+            "wall_seconds": wall_seconds,
+            "phases": phases,
+            "ffmpeg": {
+                "processes": round(
+                    sum(1 / process["batch_size"] for file_record in files for process in file_record["processes"])
+                ),
+                "wall_seconds": sum(file_record["wall_seconds"] for file_record in files),
+                "user_seconds": _sum_known(file_record["user_seconds"] for file_record in files),
+                "system_seconds": _sum_known(file_record["system_seconds"] for file_record in files),
+                "max_rss_bytes": max(
+                    (file_record["max_rss_bytes"] for file_record in files if file_record["max_rss_bytes"] is not None),
+                    default=None,
+                ),
+                "bytes_written": _sum_known(file_record["bytes_written"] for file_record in files),
+            },
+            "files": files,
+        }
+
+    def write(self, path: Path) -> None:
+        """Write the report to a JSON file.
+
+        Parameters
+        ----------
+        path : Path
+            The file to write.
+        """
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with path.open("w", encoding="utf-8") as f:
+                json.dump(self.report(), f, indent=2)
+            logger.info("Wrote metrics to %r", path)
+        except OSError as e:
+            logger.error("Could not write metrics to %r. %s: %s", path, type(e).__name__, e)
+
+
+def timed_phase(metrics: ExtractionMetrics | None, phase: str) -> AbstractContextManager[None]:
+    """Time the body of a `with` block as part of a phase, if metrics are being recorded.
+
+    Parameters
+    ----------
+    metrics : ExtractionMetrics | None
+        The metrics to record to, or None to record nothing.
+    phase : str
+        The phase.
+
+    Returns
+    -------
+    AbstractContextManager[None]
+        The timing context.
+    """
+    return metrics.phase(phase) if metrics is not None else contextlib.nullcontext()
@@ -0,0 +1,290 @@
+"""Stream decoded audio from FFmpeg as NumPy arrays, without writing it to disk.
+
+NumPy is an optional dependency, installed with the `numpy` extra.
+"""
+
+import subprocess
+from collections.abc import Iterator, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from types import ModuleType
+from typing import IO, TYPE_CHECKING, Any, Final
+
+import rich.repr
+
+import ffmpeg
+from BAET._config.logging import create_logger
+from BAET.FFmpeg.jobs import AudioExtractJob
+from BAET.FFmpeg.probe import probe_audio_streams
+from BAET.FFmpeg.probe_cache import ProbeCache
+from BAET.FFmpeg.progress import read_tail
+from BAET.typing import FFmpegOutput, StreamIndex
+
+if TYPE_CHECKING:
+    from numpy.typing import NDArray
+
+logger = create_logger()
+
+# Sample types, with the little-endian NumPy dtype and the FFmpeg raw format of each.
+# The dtypes are explicitly little-endian, so samples are decoded correctly on big-endian hosts too
+PCM_FORMATS: Final[Mapping[str, tuple[str, str]]] = {
+    "int16": ("<i2", "s16le"),
+    "int32": ("<i4", "s32le"),
+    "float32": ("<f4", "f32le"),
+    "float64": ("<f8", "f64le"),
+}
+
+DEFAULT_CHUNK_FRAMES = 48_000
+
+
+def _numpy() -> ModuleType:
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError(
+            "Streaming PCM requires NumPy. Install it with the `numpy` extra, `pip install BAET[numpy]`"
+        ) from e
+
+    return numpy
+
+
+@rich.repr.auto()
+@dataclass(frozen=True, slots=True)
+class PCMFormat:
+    """The format to decode audio to.
+
+    Attributes
+    ----------
+    dtype : str
+        The NumPy dtype of each sample. One of `PCM_FORMATS`.
+    sample_rate : int | None
+        The sample rate to resample to, or None to keep the rate of the stream.
+    channels : int | None
+        The number of channels to mix to, in FFmpeg's default layout for that number, such as stereo for 2,
+        or None to keep the channels of the stream.
+    """
+
+    dtype: str = "float32"
+    sample_rate: int | None = None
+    channels: int | None = None
+
+    def __post_init__(self) -> None:
+        """Check that the dtype is supported.
+
+        Raises
+        ------
+        ValueError
+            If the dtype is not one of `PCM_FORMATS`.
+        """
+        if self.dtype not in PCM_FORMATS:
+            raise ValueError(f"Unsupported PCM dtype {self.dtype!r}. Expected one of {', '.join(PCM_FORMATS)}")
+
+    @property
+    def numpy_dtype(self) -> str:
+        """The little-endian NumPy dtype of the samples, matching `raw_format`."""
+        return PCM_FORMATS[self.dtype][0]
+
+    @property
+    def raw_format(self) -> str:
+        """The FFmpeg raw format of the samples."""
+        return PCM_FORMATS[self.dtype][1]
+
+
+def _read_into(stream: IO[bytes], view: memoryview) -> int:
+    # A pipe returns whatever is available, so keep reading until the view is full or FFmpeg closes stdout
+    filled = 0
+    while filled < len(view):
+        read = stream.readinto(view[filled:])  # type: ignore[attr-defined]
+        if not read:
+            break
+        filled += read
+
+    return filled
+
+
+class PCMStream:
+    """Decoded audio of one stream of a file, read from FFmpeg in fixed size chunks.
+
+    Each chunk is an array of shape `(frames, channels)`. Every chunk has `chunk_frames` frames, except the last,
+    which may have fewer. Chunks are views into a single buffer that is reused for the next chunk,
+    so copy a chunk to keep it after taking the next one.
+
+    FFmpeg is started each time the stream is iterated, and is stopped if iteration stops early.
+
+    Examples
+    --------
+    >>> for chunk in PCMStream(Path("video.mkv"), 1, PCMFormat("float32", sample_rate=16_000, channels=1)):
+    ...     features.append(mel_spectrogram(chunk))  # doctest: +SKIP
+    """
+
+    def __init__(
+        self,
+        file: Path,
+        stream_index: StreamIndex,
+        pcm_format: PCMFormat | None = None,
+        *,
+        chunk_frames: int = DEFAULT_CHUNK_FRAMES,
+        probe_cache: ProbeCache | None = None,
+    ) -> None:
+        """Create a PCM stream.
+
+        Parameters
+        ----------
+        file : Path
+            The file to decode audio from.
+        stream_index : StreamIndex
+            The index of the audio stream in the file, as in `AudioExtractJob.audio_streams`.
+        pcm_format : PCMFormat | None, optional
+            The format to decode to, by default 32-bit floats with the sample rate and channels of the stream.
+        chunk_frames : int, optional
+            The number of frames in each chunk, by default `DEFAULT_CHUNK_FRAMES`.
+        probe_cache : ProbeCache | None, optional
+            The cache of probe results, used if the stream is probed for its sample rate or channels,
+            by default None.
+
+        Raises
+        ------
+        ValueError
+            If `chunk_frames` is not positive, or the file has no audio stream with the index.
+        """
+        if chunk_frames < 1:
+            raise ValueError(f"Chunks must have at least one frame, not {chunk_frames}")
+
+        self.file = file
+        self.stream_index = stream_index
+        self.pcm_format = pcm_format if pcm_format is not None else PCMFormat()
+        self.chunk_frames = chunk_frames
+
+        sample_rate, channels = self.pcm_format.sample_rate, self.pcm_format.channels
+        if sample_rate is None or channels is None:
+            with probe_audio_streams(file, probe_cache) as streams:
+                stream = next((stream for stream in streams if stream["index"] == stream_index), None)
+
+            if stream is None:
+                raise ValueError(f"{str(file)!r} has no audio stream with index {stream_index}")
+
+            sample_rate = sample_rate if sample_rate is not None else int(stream["sample_rate"])
+            channels = channels if channels is not None else int(stream["channels"])
+
+        self.sample_rate: int = sample_rate
+        self.channels: int = channels
+
+    @classmethod
+    def for_job(
+        cls,
+        job: AudioExtractJob,
+        stream_index: StreamIndex,
+        pcm_format: PCMFormat | None = None,
+        *,
+        chunk_frames: int = DEFAULT_CHUNK_FRAMES,
+        probe_cache: ProbeCache | None = None,
+    ) -> "PCMStream":
+        """Create a PCM stream of a stream that a job would extract, instead of extracting it to a file.
+
+        Parameters
+        ----------
+        job : AudioExtractJob
+            The job.
+        stream_index : StreamIndex
+            The index of the audio stream.
+        pcm_format : PCMFormat | None, optional
+            The format to decode to, by default 32-bit floats with the sample rate and channels of the stream.
+        chunk_frames : int, optional
+            The number of frames in each chunk, by default `DEFAULT_CHUNK_FRAMES`.
+        probe_cache : ProbeCache | None, optional
+            The cache of probe results, by default None.
+
+        Returns
+        -------
+        PCMStream
+            The PCM stream.
+
+        Raises
+        ------
+        IndexError
+            If the job does not extract the stream.
+        """
+        job.stream(stream_index)
+        return cls(job.input_file, stream_index, pcm_format, chunk_frames=chunk_frames, probe_cache=probe_cache)
+
+    def __rich_repr__(self) -> rich.repr.Result:
+        """Return a rich representation of the object.
+
+        Returns
+        -------
+        rich.repr.Result
+            The rich representation.
+        """
+        yield "file", self.file
+        yield "stream_index", self.stream_index
+        yield "pcm_format", self.pcm_format
+        yield "sample_rate", self.sample_rate
+        yield "channels", self.channels
+        yield "chunk_frames", self.chunk_frames
+
+    @property
+    def output(self) -> FFmpegOutput:
+        """The FFmpeg output decoding the stream to raw PCM on stdout."""
+        return (
+            ffmpeg.input(str(self.file))[str(self.stream_index)]
+            .output(
+                "pipe:",
+                format=self.pcm_format.raw_format,
+                acodec=f"pcm_{self.pcm_format.raw_format}",
+                ar=self.sample_rate,
+                ac=self.channels,
+            )
+            .global_args("-hide_banner", "-nostats", "-loglevel", "error")
+        )
+
+    def __iter__(self) -> Iterator["NDArray[Any]"]:
+        """Decode the stream, yielding chunks as FFmpeg decodes them.
+
+        Returns
+        -------
+        Iterator[NDArray[Any]]
+            The chunks, each a view into a reused buffer.
+
+        Raises
+        ------
+        RuntimeError
+            If FFmpeg exits with a non-zero exit code.
+        ValueError
+            If the FFmpeg process pipes could not be opened.
+        """
+        np = _numpy()
+        buffer = np.empty((self.chunk_frames, self.channels), dtype=self.pcm_format.numpy_dtype)
+        view = memoryview(buffer).cast("B")
+        frame_bytes = self.channels * buffer.itemsize
+
+        args = ffmpeg.compile(self.output)
+        logger.debug("Running: %s", " ".join(args))
+
+        with subprocess.Popen(  # noqa: S603
+            args,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        ) as proc:
+            stderr_reader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="baet-stderr")
+            try:
+                if proc.stdout is None or proc.stderr is None:
+                    raise ValueError("FFmpeg process pipes are None")
+
+                err = stderr_reader.submit(read_tail, proc.stderr)
+                while True:
+                    filled = _read_into(proc.stdout, view)
+                    if frames := filled // frame_bytes:
+                        yield buffer[:frames]
+                    if filled < len(view):
+                        break
+
+                if proc.wait() != 0:
+                    raise RuntimeError(err.result().decode("utf-8", errors="replace").strip())
+            finally:
+                # Raw PCM has nothing to finalise, so FFmpeg is killed if the consumer stops early
+                if proc.poll() is None:
+                    proc.kill()
+                    proc.wait()
+                stderr_reader.shutdown()
@@ -1,6 +1,8 @@
 """Utilities for FFmpeg probe operations."""
 
 import contextlib
+import json
+import subprocess
 from collections.abc import Iterator
 from pathlib import Path
 from typing import Any
@@ -10,14 +12,30 @@ import rich_click as click
 import ffmpeg
 from BAET._config.console import error_console
 from BAET._config.logging import create_logger
+from BAET.FFmpeg.probe_cache import ProbeCache
 from BAET.typing import AudioStream
 
 logger = create_logger()
 
+# The only stream fields needed to select and extract audio and report its progress.
+# See `TrackSelector`, `AudioExtractJob` and `stream_duration_ms`
+LEAN_STREAM_ENTRIES = (
+    "stream=index,codec_name,codec_type,sample_rate,channels,duration_ts,time_base"
+    ":stream_tags=duration,DURATION,language"
+)
+
+# Cached results are keyed by the entries, so changing them does not reuse results without the new fields
+_AUDIO_STREAMS_QUERY = f"audio_streams?{LEAN_STREAM_ENTRIES}"
+
 
 @contextlib.contextmanager
-def probe_file(file: Path) -> Iterator[dict[str, Any]]:
-    """Probe a file using FFmpeg."""
+def probe_file(file: Path, cache: ProbeCache | None = None) -> Iterator[dict[str, Any]]:
+    """Probe a file using FFmpeg, reusing a cached result if one is valid."""
+    cached: dict[str, Any] | None = cache.get(file, "file") if cache is not None else None
+    if cached is not None:
+        yield cached
+        return
+
     logger.info("Probing file %r", file)
 
     try:
@@ -26,20 +44,59 @@ def probe_file(file: Path) -> Iterator[dict[str, Any]]:
         err: str = e.stderr.decode()
         raise click.ClickException(f"Error probing file {err.strip().splitlines()[-1]}") from e
 
+    if cache is not None:
+        cache.put(file, "file", probed)
+
     yield probed
 
 
+def _has_duration(stream: AudioStream) -> bool:
+    return "duration_ts" in stream or any(key.lower() == "duration" for key in stream.get("tags", {}))
+
+
+def _probe_lean(file: Path) -> list[AudioStream]:
+    # Only audio streams and the needed fields are serialised, which matters for files with many other streams,
+    # such as fonts attached to MKVs
+    args: list[str | Path] = ["ffprobe", "-v", "error", "-of", "json"]
+    args += ["-select_streams", "a", "-show_entries", LEAN_STREAM_ENTRIES, file]
+    proc = subprocess.run(args, capture_output=True, check=False)  # noqa: S603
+    if proc.returncode != 0:
+        raise ffmpeg.Error("ffprobe", proc.stdout, proc.stderr)
+
+    streams: list[AudioStream] = json.loads(proc.stdout.decode("utf-8")).get("streams", [])
+    return streams
+
+
+def _probe_full(file: Path) -> list[AudioStream]:
+    probe = ffmpeg.probe(file)
+    return [stream for stream in probe["streams"] if "codec_type" in stream and stream["codec_type"] == "audio"]
+
+
 @contextlib.contextmanager
-def probe_audio_streams(file: Path) -> Iterator[list[AudioStream]]:
-    """Probe the audio streams of a file."""
+def probe_audio_streams(file: Path, cache: ProbeCache | None = None) -> Iterator[list[AudioStream]]:
+    """Probe the audio streams of a file, reusing a cached result if one is valid.
+
+    Only the fields needed for extraction are probed, unless a stream has no duration,
+    in which case the file is probed again in full.
+    """
+    cached: list[AudioStream] | None = cache.get(file, _AUDIO_STREAMS_QUERY) if cache is not None else None
+    if cached is not None:
+        logger.info("Found %d cached audio streams for %r", len(cached), file)
+        yield cached
+        return
+
     try:
         logger.info("Probing file %r", file)
-        probe = ffmpeg.probe(file)
+        audio_streams = _probe_lean(file)
+
+        if not all(map(_has_duration, audio_streams)):
+            logger.info("Probing file %r in full, as the durations of its audio streams are missing", file)
+            audio_streams = _probe_full(file)
+
+        audio_streams.sort(key=lambda stream: stream["index"])
 
-        audio_streams = sorted(
-            [stream for stream in probe["streams"] if "codec_type" in stream and stream["codec_type"] == "audio"],
-            key=lambda stream: stream["index"],
-        )
+        if cache is not None:
+            cache.put(file, _AUDIO_STREAMS_QUERY, audio_streams)
 
         if not audio_streams:
             logger.warning("No audio streams found")
@@ -52,4 +109,4 @@ def probe_audio_streams(file: Path) -> Iterator[list[AudioStream]]:
     except (ffmpeg.Error, ValueError) as e:
         logger.critical("%s: %s", type(e).__name__, e)
         error_console.print_exception()
-        raise e
+        raise
@@ -0,0 +1,229 @@
+"""Persistent cache of FFprobe results."""
+
+import json
+import sqlite3
+import subprocess
+import time
+from pathlib import Path
+from threading import Lock
+from typing import Any
+
+from BAET._config.cache import user_cache_dir
+from BAET._config.ffmpeg_version import get_ffprobe_version
+from BAET._config.logging import create_logger
+from BAET.helpers.file_identity import FileIdentity, file_identity
+
+logger = create_logger()
+
+PROBE_CACHE_FILENAME = "probe_cache.sqlite3"
+DEFAULT_MAX_ENTRIES = 100_000
+
+# Only refresh the last use of an entry once this many seconds have passed, to avoid a write for every hit
+_LAST_USED_RESOLUTION_SECONDS = 60 * 60
+# How many insertions to allow between evictions
+_EVICTION_INTERVAL = 256
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS probes (
+    path TEXT NOT NULL,
+    query TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    ffprobe_version TEXT NOT NULL,
+    result TEXT NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (path, query)
+);
+CREATE INDEX IF NOT EXISTS probes_last_used ON probes (last_used);
+"""
+
+
+class ProbeCache:
+    """A persistent, size-bounded cache of FFprobe results stored in SQLite.
+
+    Entries are keyed by the identity of the probed file (resolved path, size, modification time and inode)
+    and the version of FFprobe, so a result is only reused while the file and FFprobe are unchanged.
+    The least recently used entries are evicted once the cache holds more than `max_entries` entries.
+
+    The cache is safe to use from multiple threads. Failing to read from or write to the cache is logged and
+    otherwise ignored, so the cache never prevents a file from being probed.
+    """
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        *,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ffprobe_version: str | None = None,
+    ) -> None:
+        """Open, or create, a probe cache.
+
+        Parameters
+        ----------
+        path : Path | None, optional
+            The SQLite database file, by default a file in the user cache directory.
+        max_entries : int, optional
+            The maximum number of entries to keep, by default `DEFAULT_MAX_ENTRIES`.
+        ffprobe_version : str | None, optional
+            The FFprobe version results are cached for, by default the version of FFprobe on the PATH.
+
+        Raises
+        ------
+        sqlite3.Error
+            If the database could not be opened or created, or is not a probe cache.
+        subprocess.CalledProcessError
+            If the version of FFprobe was not given, and FFprobe fails to report it.
+        ValueError
+            If the version of FFprobe was not given, and FFprobe is not on the PATH or reports no version.
+        """
+        # Results of unknown FFprobe builds could differ from each other, so they are never shared
+        ffprobe_version = ffprobe_version or get_ffprobe_version()
+        if not ffprobe_version:
+            raise ValueError("The version of FFprobe is unknown")
+
+        if path is None:
+            path = user_cache_dir() / PROBE_CACHE_FILENAME
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.path = path
+        self.max_entries = max_entries
+        self.ffprobe_version = ffprobe_version
+
+        self._lock = Lock()
+        self._insertions = 0
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        try:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.executescript(_SCHEMA)
+        except sqlite3.Error:
+            # e.g. the file is corrupt, or is not a database
+            self._connection.close()
+            raise
+
+        logger.info("Using probe cache %r for FFprobe %s", path, self.ffprobe_version)
+
+    def get(self, file: Path, query: str) -> Any | None:
+        """Get the cached result of probing a file.
+
+        Parameters
+        ----------
+        file : Path
+            The probed file.
+        query : str
+            The kind of probe that was made.
+
+        Returns
+        -------
+        Any | None
+            The cached result, or None if there is no valid entry for the file as it is now.
+        """
+        try:
+            identity = file_identity(file)
+            with self._lock:
+                row = self._connection.execute(
+                    "SELECT result, last_used FROM probes WHERE path = ? AND query = ? AND size = ? AND mtime_ns = ? "
+                    "AND inode = ? AND ffprobe_version = ?",
+                    (identity.path, query, identity.size, identity.mtime_ns, identity.inode, self.ffprobe_version),
+                ).fetchone()
+
+                if row is None:
+                    logger.debug("Probe cache miss for %r", file)
+                    return None
+
+                result, last_used = row
+                now = time.time()
+                if now - last_used > _LAST_USED_RESOLUTION_SECONDS:
+                    self._connection.execute(
+                        "UPDATE probes SET last_used = ? WHERE path = ? AND query = ?",
+                        (now, identity.path, query),
+                    )
+
+            logger.debug("Probe cache hit for %r", file)
+            return json.loads(result)
+        except (OSError, sqlite3.Error, ValueError) as e:
+            logger.warning("Could not read probe cache for %r. %s: %s", file, type(e).__name__, e)
+            return None
+
+    def put(self, file: Path, query: str, result: Any) -> None:
+        """Cache the result of probing a file.
+
+        Parameters
+        ----------
+        file : Path
+            The probed file.
+        query : str
+            The kind of probe that was made.
+        result : Any
+            The JSON serialisable probe result.
+        """
+        try:
+            identity = file_identity(file)
+            with self._lock:
+                self._insert(identity, query, json.dumps(result, separators=(",", ":")))
+        except (OSError, sqlite3.Error, TypeError, ValueError) as e:
+            logger.warning("Could not write probe cache for %r. %s: %s", file, type(e).__name__, e)
+
+    def _insert(self, identity: FileIdentity, query: str, result: str) -> None:
+        self._connection.execute(
+            "INSERT OR REPLACE INTO probes (path, query, size, mtime_ns, inode, ffprobe_version, result, last_used) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                identity.path,
+                query,
+                identity.size,
+                identity.mtime_ns,
+                identity.inode,
+                self.ffprobe_version,
+                result,
+                time.time(),
+            ),
+        )
+
+        self._insertions += 1
+        if self._insertions % _EVICTION_INTERVAL == 1:
+            self._evict()
+
+    def _evict(self) -> None:
+        (count,) = self._connection.execute("SELECT COUNT(*) FROM probes").fetchone()
+        excess = count - self.max_entries
+        if excess <= 0:
+            return
+
+        logger.info("Evicting %d least recently used entries from the probe cache", excess)
+        self._connection.execute(
+            "DELETE FROM probes WHERE rowid IN (SELECT rowid FROM probes ORDER BY last_used LIMIT ?)",
+            (excess,),
+        )
+
+    def close(self) -> None:
+        """Evict any excess entries and close the cache."""
+        with self._lock:
+            try:
+                self._evict()
+            except sqlite3.Error as e:
+                logger.warning("Could not evict probe cache entries. %s: %s", type(e).__name__, e)
+            finally:
+                self._connection.close()
+
+
+def open_probe_cache(path: Path | None = None) -> ProbeCache | None:
+    """Open the probe cache, if possible.
+
+    Parameters
+    ----------
+    path : Path | None, optional
+        The SQLite database file, by default a file in the user cache directory.
+
+    Returns
+    -------
+    ProbeCache | None
+        The probe cache, or None if it could not be opened, or the version of FFprobe is unknown.
+    """
+    try:
+        return ProbeCache(path)
+    except (OSError, ValueError, sqlite3.Error, subprocess.CalledProcessError) as e:
+        logger.warning("Could not open the probe cache, continuing without it. %s: %s", type(e).__name__, e)
+        return None
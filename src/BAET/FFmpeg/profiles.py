@@ -0,0 +1,72 @@
+"""Encoder option presets, trading encoding speed against output size."""
+
+from collections.abc import Mapping
+from typing import Final
+
+from BAET.constants import EncoderPreset
+from BAET.typing import EncoderOptions
+
+DEFAULT_PRESET: Final[EncoderPreset] = "balanced"
+
+# Output options for each encoder and preset, as passed to `ffmpeg.output`.
+# Lossless encoders trade CPU time for size at the same quality, lossy encoders also trade quality for size.
+ENCODER_PROFILES: Final[Mapping[str, Mapping[EncoderPreset, EncoderOptions]]] = {
+    "flac": {
+        "fast": {"compression_level": 0},
+        "balanced": {"compression_level": 5},
+        "small": {"compression_level": 8},
+    },
+    "libmp3lame": {
+        "fast": {"q:a": 2, "compression_level": 7},
+        "balanced": {"q:a": 4, "compression_level": 5},
+        "small": {"q:a": 6, "compression_level": 2},
+    },
+    "libvorbis": {
+        "fast": {"q:a": 6},
+        "balanced": {"q:a": 4},
+        "small": {"q:a": 2},
+    },
+    "libopus": {
+        "fast": {"b:a": "160k", "compression_level": 0},
+        "balanced": {"b:a": "128k", "compression_level": 5},
+        "small": {"b:a": "64k", "compression_level": 10},
+    },
+    "aac": {
+        "fast": {"b:a": "192k"},
+        "balanced": {"b:a": "160k"},
+        "small": {"b:a": "96k"},
+    },
+    "libfdk_aac": {
+        "fast": {"b:a": "192k"},
+        "balanced": {"b:a": "160k"},
+        "small": {"b:a": "96k"},
+    },
+    "aac_at": {
+        "fast": {"b:a": "192k"},
+        "balanced": {"b:a": "160k"},
+        "small": {"b:a": "96k"},
+    },
+}
+
+
+def encoder_options(encoder: str, preset: EncoderPreset = DEFAULT_PRESET) -> EncoderOptions:
+    """Get the output options to encode with.
+
+    Parameters
+    ----------
+    encoder : str
+        The FFmpeg encoder.
+    preset : EncoderPreset, optional
+        The preset to use, by default `DEFAULT_PRESET`.
+
+    Returns
+    -------
+    EncoderOptions
+        The output options for the encoder and preset. Encoders without a profile, such as PCM encoders,
+        are used with their defaults.
+    """
+    profile = ENCODER_PROFILES.get(encoder)
+    if profile is None:
+        return {}
+
+    return profile[preset]
@@ -0,0 +1,194 @@
+"""Parsing of the progress FFmpeg reports with `-progress`."""
+
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import IO
+
+import rich.repr
+
+from BAET.typing import ProgressCallback
+
+READ_SIZE = 64 * 1024
+STDERR_TAIL_BYTES = 64 * 1024
+
+# FFmpeg names the output time in microseconds `out_time_ms` for compatibility, and also reports it as `out_time_us`
+_OUT_TIME_KEYS = (b"out_time_us", b"out_time_ms")
+_KEYS = frozenset({*_OUT_TIME_KEYS, b"speed", b"total_size"})
+
+
+@rich.repr.auto()
+@dataclass(frozen=True, slots=True)
+class FFmpegProgress:
+    """A progress report from FFmpeg.
+
+    Attributes
+    ----------
+    out_time_us : int | None
+        The output time reached, in microseconds, if known.
+    speed : float | None
+        The processing speed, relative to real time, if known.
+    total_size : int | None
+        The number of bytes written so far, if known.
+    finished : bool
+        Whether this is the final report.
+    """
+
+    out_time_us: int | None
+    speed: float | None
+    total_size: int | None
+    finished: bool
+
+
+def _parse_int(value: bytes | None) -> int | None:
+    if value is None:
+        return None
+
+    try:
+        return int(value)
+    except ValueError:
+        # Reported as N/A when unknown
+        return None
+
+
+def _parse_speed(value: bytes | None) -> float | None:
+    if value is None:
+        return None
+
+    try:
+        return float(value.rstrip(b"x"))
+    except ValueError:
+        return None
+
+
+class ProgressParser:
+    """An incremental parser of FFmpeg progress output.
+
+    FFmpeg reports progress as blocks of `key=value` lines, each terminated by a `progress=continue` line,
+    or `progress=end` for the final block. Data is fed in arbitrarily sized chunks, and a report is produced
+    for each complete block. Lines are only split and compared as bytes, and only values of interest are decoded.
+    """
+
+    def __init__(self, on_progress: ProgressCallback) -> None:
+        """Create a progress parser.
+
+        Parameters
+        ----------
+        on_progress : ProgressCallback
+            Called with each complete progress report.
+        """
+        self.on_progress = on_progress
+        self._buffer = b""
+        self._block: dict[bytes, bytes] = {}
+
+    def feed(self, data: bytes) -> None:
+        """Parse a chunk of progress output.
+
+        Parameters
+        ----------
+        data : bytes
+            The chunk, which may end part way through a line.
+        """
+        *lines, self._buffer = (self._buffer + data).split(b"\n")
+
+        for line in lines:
+            key, _, value = line.partition(b"=")
+            if key == b"progress":
+                self._report(value.strip() == b"end")
+            elif key in _KEYS:
+                self._block[key] = value.strip()
+
+    def _report(self, finished: bool) -> None:
+        block, self._block = self._block, {}
+
+        out_time_us = None
+        for key in _OUT_TIME_KEYS:
+            out_time_us = _parse_int(block.get(key))
+            if out_time_us is not None:
+                break
+
+        self.on_progress(
+            FFmpegProgress(
+                out_time_us=out_time_us,
+                speed=_parse_speed(block.get(b"speed")),
+                total_size=_parse_int(block.get(b"total_size")),
+                finished=finished,
+            )
+        )
+
+
+def read_progress(stdout: IO[bytes], on_progress: ProgressCallback) -> None:
+    """Read and parse FFmpeg progress output until the end of the stream.
+
+    Parameters
+    ----------
+    stdout : IO[bytes]
+        The stream FFmpeg writes progress to.
+    on_progress : ProgressCallback
+        Called with each complete progress report.
+    """
+    parser = ProgressParser(on_progress)
+    read = getattr(stdout, "read1", stdout.read)
+    while data := read(READ_SIZE):
+        parser.feed(data)
+
+
+def read_tail(stream: IO[bytes], max_bytes: int = STDERR_TAIL_BYTES) -> bytes:
+    """Read a stream until its end, keeping only its last bytes.
+
+    Parameters
+    ----------
+    stream : IO[bytes]
+        The stream to drain.
+    max_bytes : int, optional
+        The number of bytes to keep, by default `STDERR_TAIL_BYTES`.
+
+    Returns
+    -------
+    bytes
+        At most the last `max_bytes` bytes of the stream.
+    """
+    tail = bytearray()
+    read = getattr(stream, "read1", stream.read)
+    while data := read(READ_SIZE):
+        tail += data
+        if len(tail) > 2 * max_bytes:
+            del tail[:-max_bytes]
+
+    return bytes(tail[-max_bytes:])
+
+
+def throttled(
+    on_progress: ProgressCallback,
+    min_interval: float,
+    clock: Callable[[], float] = time.monotonic,
+) -> ProgressCallback:
+    """Coalesce progress reports, so at most one is forwarded per interval.
+
+    The final report is always forwarded.
+
+    Parameters
+    ----------
+    on_progress : ProgressCallback
+        Called with the forwarded progress reports.
+    min_interval : float
+        The minimum number of seconds between forwarded reports.
+    clock : Callable[[], float], optional
+        The clock to measure intervals with, by default `time.monotonic`.
+
+    Returns
+    -------
+    ProgressCallback
+        The throttled callback.
+    """
+    last = -min_interval
+
+    def update(progress: FFmpegProgress) -> None:
+        nonlocal last
+
+        now = clock()
+        if progress.finished or now - last >= min_interval:
+            last = now
+            on_progress(progress)
+
+    return update
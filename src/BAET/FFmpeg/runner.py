@@ -0,0 +1,438 @@
+"""Run FFmpeg audio extraction jobs, reporting their progress."""
+
+import asyncio
+import contextlib
+import time
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from threading import Lock, Semaphore
+
+from BAET._config.logging import create_logger
+from BAET.Display.reporting import JobReporter
+from BAET.FFmpeg.batching import job_seconds, merge_job_outputs
+from BAET.FFmpeg.engine import run_ffmpeg, run_ffmpeg_async
+from BAET.FFmpeg.jobs import AudioExtractJob
+from BAET.FFmpeg.metrics import ExtractionMetrics, ProcessUsage
+from BAET.FFmpeg.progress import FFmpegProgress, throttled
+from BAET.FFmpeg.segmenting import SegmentPlan
+from BAET.typing import FFmpegOutput, ProgressCallback, StreamIndex
+
+logger = create_logger()
+
+type StreamCompleteCallback = Callable[[AudioExtractJob, StreamIndex], None]
+
+
+def _job_outputs(job: AudioExtractJob) -> list[tuple[FFmpegOutput, list[StreamIndex]]]:
+    if job.merged_output is not None:
+        streams = list(job.stream_indexed_outputs)
+        logger.info("Extracting %d audio streams of %r in a single pass", len(streams), job.input_file.name)
+        return [(job.merged_output, streams)]
+
+    return [(output, [stream_index]) for stream_index, output in job.stream_indexed_outputs.items()]
+
+
+def _progress_reporter(reporter: JobReporter, streams: Sequence[StreamIndex]) -> ProgressCallback:
+    def report(progress: FFmpegProgress) -> None:
+        reporter.streams_progressed(streams, progress)
+
+    return throttled(report, reporter.progress_interval)
+
+
+def _complete_streams(
+    job: AudioExtractJob,
+    streams: Sequence[StreamIndex],
+    reporter: JobReporter,
+    on_stream_complete: StreamCompleteCallback | None,
+) -> None:
+    reporter.streams_completed(streams)
+
+    if on_stream_complete is not None:
+        for stream_index in streams:
+            on_stream_complete(job, stream_index)
+
+
+def _record_failure(
+    metrics: ExtractionMetrics | None,
+    job: AudioExtractJob,
+    streams: Sequence[StreamIndex],
+    started: float,
+) -> None:
+    if metrics is not None:
+        metrics.record_process(job, streams, ProcessUsage(time.perf_counter() - started), succeeded=False)
+
+
+def _batch_progress_reporter(jobs: Sequence[AudioExtractJob], reporters: Sequence[JobReporter]) -> ProgressCallback:
+    # Every output of a batch is extracted concurrently, and each reporter clamps the shared position to its streams
+    callbacks = [
+        _progress_reporter(reporter, job.stream_indexes) for job, reporter in zip(jobs, reporters, strict=True)
+    ]
+
+    def report(progress: FFmpegProgress) -> None:
+        for callback in callbacks:
+            callback(progress)
+
+    return report
+
+
+def _segment_progress_reporters(
+    reporter: JobReporter,
+    streams: Sequence[StreamIndex],
+    segments: int,
+) -> list[ProgressCallback]:
+    # Segments are extracted concurrently, so the streams have progressed by the total time every segment has reached
+    report = _progress_reporter(reporter, streams)
+    latest: list[FFmpegProgress | None] = [None] * segments
+    lock = Lock()
+
+    def segment_reporter(segment: int) -> ProgressCallback:
+        def update(progress: FFmpegProgress) -> None:
+            with lock:
+                latest[segment] = progress
+                known = [progress for progress in latest if progress is not None]
+                report(
+                    FFmpegProgress(
+                        sum(progress.out_time_us or 0 for progress in known),
+                        sum(progress.speed or 0 for progress in known) or None,
+                        sum(progress.total_size or 0 for progress in known) or None,
+                        len(known) == segments and all(progress.finished for progress in known),
+                    )
+                )
+
+        return update
+
+    return [segment_reporter(segment) for segment in range(segments)]
+
+
+def _ignore_progress(_: FFmpegProgress) -> None:
+    pass
+
+
+def _run_ffmpeg(output: FFmpegOutput, on_progress: ProgressCallback, process_slots: Semaphore | None) -> ProcessUsage:
+    # Each FFmpeg process holds a slot while it runs, so the segments of a job count towards the same limit as jobs
+    with process_slots if process_slots is not None else contextlib.nullcontext():
+        return run_ffmpeg(output, on_progress)
+
+
+async def _run_ffmpeg_async(
+    output: FFmpegOutput,
+    on_progress: ProgressCallback,
+    process_slots: asyncio.Semaphore | None,
+) -> ProcessUsage:
+    if process_slots is None:
+        return await run_ffmpeg_async(output, on_progress)
+
+    async with process_slots:
+        return await run_ffmpeg_async(output, on_progress)
+
+
+def _run_segments(
+    job: AudioExtractJob,
+    plan: SegmentPlan,
+    reporter: JobReporter,
+    on_stream_complete: StreamCompleteCallback | None,
+    metrics: ExtractionMetrics | None,
+    process_slots: Semaphore | None,
+) -> None:
+    streams = plan.stream_indexes
+    logger.info("Extracting %d segments of %r concurrently", len(plan.segments), job.input_file.name)
+
+    reporter.streams_started(streams)
+    started = time.perf_counter()
+    try:
+        outputs = plan.segment_outputs(job.input_file)
+        progress = _segment_progress_reporters(reporter, streams, len(outputs))
+        run_segment = partial(_run_ffmpeg, process_slots=process_slots)
+        with ThreadPoolExecutor(max_workers=len(outputs), thread_name_prefix="baet-segment") as pool:
+            usages = list(pool.map(run_segment, outputs, progress))
+
+        usages += [_run_ffmpeg(output, _ignore_progress, process_slots) for output in plan.join_outputs()]
+    except (RuntimeError, ValueError, OSError) as e:
+        _record_failure(metrics, job, streams, started)
+        reporter.streams_failed(streams, e)
+    else:
+        if metrics is not None:
+            metrics.record_process(
+                job, streams, ProcessUsage.combined(usages, time.perf_counter() - started), succeeded=True
+            )
+        _complete_streams(job, streams, reporter, on_stream_complete)
+    finally:
+        plan.remove_pieces()
+
+
+async def _run_segments_async(
+    job: AudioExtractJob,
+    plan: SegmentPlan,
+    reporter: JobReporter,
+    on_stream_complete: StreamCompleteCallback | None,
+    metrics: ExtractionMetrics | None,
+    process_slots: asyncio.Semaphore | None,
+) -> None:
+    streams = plan.stream_indexes
+    logger.info("Extracting %d segments of %r concurrently", len(plan.segments), job.input_file.name)
+
+    reporter.streams_started(streams)
+    started = time.perf_counter()
+    try:
+        outputs = plan.segment_outputs(job.input_file)
+        progress = _segment_progress_reporters(reporter, streams, len(outputs))
+
+        # Every segment is left to finish before a failure is raised, so no FFmpeg process outlives its pieces
+        results = await asyncio.gather(
+            *(
+                _run_ffmpeg_async(output, on_progress, process_slots)
+                for output, on_progress in zip(outputs, progress, strict=True)
+            ),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        usages = [result for result in results if isinstance(result, ProcessUsage)]
+
+        for output in plan.join_outputs():
+            usages.append(await _run_ffmpeg_async(output, _ignore_progress, process_slots))
+    except (RuntimeError, ValueError, OSError) as e:
+        _record_failure(metrics, job, streams, started)
+        reporter.streams_failed(streams, e)
+    else:
+        if metrics is not None:
+            metrics.record_process(
+                job, streams, ProcessUsage.combined(usages, time.perf_counter() - started), succeeded=True
+            )
+        _complete_streams(job, streams, reporter, on_stream_complete)
+    finally:
+        plan.remove_pieces()
+
+
+def _record_batch(
+    metrics: ExtractionMetrics | None,
+    jobs: Sequence[AudioExtractJob],
+    usage: ProcessUsage,
+) -> None:
+    if metrics is None:
+        return
+
+    # Apportion the process between the jobs by their duration, so totals are not counted once per job
+    total_seconds = sum(map(job_seconds, jobs))
+    for job in jobs:
+        fraction = job_seconds(job) / total_seconds if total_seconds > 0 else 1 / len(jobs)
+        metrics.record_process(job, job.stream_indexes, usage.share(fraction), succeeded=True, batch_size=len(jobs))
+
+
+def _run_outputs(
+    job: AudioExtractJob,
+    reporter: JobReporter,
+    on_stream_complete: StreamCompleteCallback | None,
+    metrics: ExtractionMetrics | None,
+    process_slots: Semaphore | None,
+) -> None:
+    for output, streams in _job_outputs(job):
+        reporter.streams_started(streams)
+        started = time.perf_counter()
+        try:
+            usage = _run_ffmpeg(output, _progress_reporter(reporter, streams), process_slots)
+        except (RuntimeError, ValueError, OSError) as e:
+            _record_failure(metrics, job, streams, started)
+            reporter.streams_failed(streams, e)
+        else:
+            if metrics is not None:
+                metrics.record_process(job, streams, usage, succeeded=True)
+            _complete_streams(job, streams, reporter, on_stream_complete)
+
+    if job.segment_plan is not None:
+        _run_segments(job, job.segment_plan, reporter, on_stream_complete, metrics, process_slots)
+
+
+async def _run_outputs_async(
+    job: AudioExtractJob,
+    reporter: JobReporter,
+    on_stream_complete: StreamCompleteCallback | None,
+    metrics: ExtractionMetrics | None,
+    process_slots: asyncio.Semaphore | None,
+) -> None:
+    for output, streams in _job_outputs(job):
+        reporter.streams_started(streams)
+        started = time.perf_counter()
+        try:
+            usage = await _run_ffmpeg_async(output, _progress_reporter(reporter, streams), process_slots)
+        except (RuntimeError, ValueError, OSError) as e:
+            _record_failure(metrics, job, streams, started)
+            reporter.streams_failed(streams, e)
+        else:
+            if metrics is not None:
+                metrics.record_process(job, streams, usage, succeeded=True)
+            _complete_streams(job, streams, reporter, on_stream_complete)
+
+    if job.segment_plan is not None:
+        await _run_segments_async(job, job.segment_plan, reporter, on_stream_complete, metrics, process_slots)
+
+
+def run_job(
+    job: AudioExtractJob,
+    reporter: JobReporter,
+    on_stream_complete: StreamCompleteCallback | None = None,
+    metrics: ExtractionMetrics | None = None,
+    process_slots: Semaphore | None = None,
+) -> None:
+    """Run a job, blocking the calling thread until it finishes.
+
+    Failing to extract streams, including FFmpeg failing to start, is reported, and does not stop the remaining
+    streams from being extracted.
+
+    Parameters
+    ----------
+    job : AudioExtractJob
+        The job to run.
+    reporter : JobReporter
+        The reporter of the job's progress.
+    on_stream_complete : StreamCompleteCallback | None, optional
+        Called with the job and stream index each time a stream is extracted successfully, by default None.
+    metrics : ExtractionMetrics | None, optional
+        The metrics to record every FFmpeg process to, by default None.
+    process_slots : Semaphore | None, optional
+        Held by each FFmpeg process while it runs, by default None. Share one between jobs to bound how many FFmpeg
+        processes run at once, including the concurrent segments of segmented jobs.
+    """
+    reporter.job_started()
+    try:
+        _run_outputs(job, reporter, on_stream_complete, metrics, process_slots)
+    finally:
+        reporter.job_finished()
+
+
+async def run_job_async(
+    job: AudioExtractJob,
+    reporter: JobReporter,
+    on_stream_complete: StreamCompleteCallback | None = None,
+    metrics: ExtractionMetrics | None = None,
+    process_slots: asyncio.Semaphore | None = None,
+) -> None:
+    """Run a job on the running event loop.
+
+    FFmpeg is supervised with `asyncio` subprocesses, so many jobs can run concurrently
+    without blocking a thread per FFmpeg process. Cancelling the job terminates FFmpeg.
+
+    Parameters
+    ----------
+    job : AudioExtractJob
+        The job to run.
+    reporter : JobReporter
+        The reporter of the job's progress.
+    on_stream_complete : StreamCompleteCallback | None, optional
+        Called with the job and stream index each time a stream is extracted successfully, by default None.
+    metrics : ExtractionMetrics | None, optional
+        The metrics to record every FFmpeg process to, by default None.
+    process_slots : asyncio.Semaphore | None, optional
+        Held by each FFmpeg process while it runs, by default None. Share one between jobs to bound how many FFmpeg
+        processes run at once, including the concurrent segments of segmented jobs.
+    """
+    reporter.job_started()
+    try:
+        await _run_outputs_async(job, reporter, on_stream_complete, metrics, process_slots)
+    finally:
+        reporter.job_finished()
+
+
+def run_batch(
+    jobs: Sequence[AudioExtractJob],
+    reporters: Sequence[JobReporter],
+    on_stream_complete: StreamCompleteCallback | None = None,
+    metrics: ExtractionMetrics | None = None,
+    process_slots: Semaphore | None = None,
+) -> None:
+    """Run a batch of jobs with a single FFmpeg process, blocking the calling thread until it finishes.
+
+    If the process fails, each job is run again on its own, so failures are attributed to the jobs that caused them.
+
+    Parameters
+    ----------
+    jobs : Sequence[AudioExtractJob]
+        The jobs to run. See `pack_jobs`.
+    reporters : Sequence[JobReporter]
+        The reporter of each job's progress.
+    on_stream_complete : StreamCompleteCallback | None, optional
+        Called with the job and stream index each time a stream is extracted successfully, by default None.
+    metrics : ExtractionMetrics | None, optional
+        The metrics to record every FFmpeg process to, by default None.
+    process_slots : Semaphore | None, optional
+        Held by each FFmpeg process while it runs, by default None. Share one between jobs to bound how many FFmpeg
+        processes run at once, including the concurrent segments of segmented jobs.
+    """
+    if len(jobs) == 1:
+        run_job(jobs[0], reporters[0], on_stream_complete, metrics, process_slots)
+        return
+
+    for reporter in reporters:
+        reporter.job_started()
+    try:
+        for job, reporter in zip(jobs, reporters, strict=True):
+            reporter.streams_started(job.stream_indexes)
+
+        logger.info("Extracting the audio streams of %d files in a single FFmpeg process", len(jobs))
+        try:
+            usage = _run_ffmpeg(merge_job_outputs(jobs), _batch_progress_reporter(jobs, reporters), process_slots)
+        except (RuntimeError, ValueError, OSError):
+            logger.warning("Extracting a batch of %d files failed, so extracting each file on its own", len(jobs))
+            for job, reporter in zip(jobs, reporters, strict=True):
+                _run_outputs(job, reporter, on_stream_complete, metrics, process_slots)
+        else:
+            _record_batch(metrics, jobs, usage)
+            for job, reporter in zip(jobs, reporters, strict=True):
+                _complete_streams(job, job.stream_indexes, reporter, on_stream_complete)
+    finally:
+        for reporter in reporters:
+            reporter.job_finished()
+
+
+async def run_batch_async(
+    jobs: Sequence[AudioExtractJob],
+    reporters: Sequence[JobReporter],
+    on_stream_complete: StreamCompleteCallback | None = None,
+    metrics: ExtractionMetrics | None = None,
+    process_slots: asyncio.Semaphore | None = None,
+) -> None:
+    """Run a batch of jobs with a single FFmpeg process, on the running event loop.
+
+    If the process fails, each job is run again on its own, so failures are attributed to the jobs that caused them.
+
+    Parameters
+    ----------
+    jobs : Sequence[AudioExtractJob]
+        The jobs to run. See `pack_jobs`.
+    reporters : Sequence[JobReporter]
+        The reporter of each job's progress.
+    on_stream_complete : StreamCompleteCallback | None, optional
+        Called with the job and stream index each time a stream is extracted successfully, by default None.
+    metrics : ExtractionMetrics | None, optional
+        The metrics to record every FFmpeg process to, by default None.
+    process_slots : asyncio.Semaphore | None, optional
+        Held by each FFmpeg process while it runs, by default None. Share one between jobs to bound how many FFmpeg
+        processes run at once, including the concurrent segments of segmented jobs.
+    """
+    if len(jobs) == 1:
+        await run_job_async(jobs[0], reporters[0], on_stream_complete, metrics, process_slots)
+        return
+
+    for reporter in reporters:
+        reporter.job_started()
+    try:
+        for job, reporter in zip(jobs, reporters, strict=True):
+            reporter.streams_started(job.stream_indexes)
+
+        logger.info("Extracting the audio streams of %d files in a single FFmpeg process", len(jobs))
+        try:
+            usage = await _run_ffmpeg_async(
+                merge_job_outputs(jobs), _batch_progress_reporter(jobs, reporters), process_slots
+            )
+        except (RuntimeError, ValueError, OSError):
+            logger.warning("Extracting a batch of %d files failed, so extracting each file on its own", len(jobs))
+            for job, reporter in zip(jobs, reporters, strict=True):
+                await _run_outputs_async(job, reporter, on_stream_complete, metrics, process_slots)
+        else:
+            _record_batch(metrics, jobs, usage)
+            for job, reporter in zip(jobs, reporters, strict=True):
+                _complete_streams(job, job.stream_indexes, reporter, on_stream_complete)
+    finally:
+        for reporter in reporters:
+            reporter.job_finished()
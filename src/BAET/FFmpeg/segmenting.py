@@ -0,0 +1,278 @@
+"""Splitting of a long file's timeline into segments, extracted by concurrent FFmpeg processes and joined afterwards."""
+
+from dataclasses import dataclass
+from pathlib import Path
+
+import rich.repr
+
+import ffmpeg
+from BAET._config.logging import create_logger
+from BAET.FFmpeg.jobs import with_progress_args
+from BAET.typing import EncoderOptions, FFmpegOutput, Millisecond, StreamIndex
+
+logger = create_logger()
+
+MIN_SEGMENT_SECONDS = 60
+
+# Each segment is decoded from slightly before its start, so the packet holding its first sample is always decoded,
+# and is then trimmed at its exact start
+_SEEK_PREROLL_SECONDS = 1
+
+# Pieces are written to Matroska, which keeps the timestamps the concat demuxer needs to join them
+_PIECE_MUXER = "matroska"
+
+
+@rich.repr.auto()
+@dataclass(frozen=True, slots=True)
+class Segment:
+    """A segment of a file's timeline.
+
+    Boundaries are in whole seconds, which are a whole number of samples at any sample rate,
+    so the segments either side of a boundary are cut at the same sample.
+
+    Attributes
+    ----------
+    start_seconds : int
+        The time the segment starts at.
+    end_seconds : int | None
+        The time the segment ends at, or None if it runs to the end of the file.
+    """
+
+    start_seconds: int
+    end_seconds: int | None
+
+
+def split_timeline(
+    duration_ms: Millisecond,
+    segments: int,
+    min_segment_seconds: int = MIN_SEGMENT_SECONDS,
+) -> tuple[Segment, ...]:
+    """Split a timeline into segments of equal length, in whole seconds.
+
+    Parameters
+    ----------
+    duration_ms : Millisecond
+        The duration of the timeline, as given by `stream_duration_ms`.
+    segments : int
+        The most segments to split the timeline into.
+    min_segment_seconds : int, optional
+        The shortest segment to split off, by default `MIN_SEGMENT_SECONDS`.
+        Shorter timelines are split into fewer segments.
+
+    Returns
+    -------
+    tuple[Segment, ...]
+        The segments, in order. The last runs to the end of the file, so audio beyond the probed duration is kept.
+    """
+    duration_seconds = int(duration_ms // 1_000_000)
+    count = max(1, min(segments, duration_seconds // max(1, min_segment_seconds)))
+
+    starts = [duration_seconds * k // count for k in range(count)]
+    return tuple(Segment(start, starts[k + 1] if k + 1 < count else None) for k, start in enumerate(starts))
+
+
+def can_stitch(source_codec: str | None, codec: str, muxer: str) -> bool:
+    """Check whether segments of a stream can be decoded and encoded separately, then joined without re-encoding them.
+
+    Only PCM and FLAC sources decode to the same samples wherever decoding starts and ends. Lossy decoders such as
+    AAC overlap each frame with its neighbours and trim padding at the end of the stream, so a segment decoded
+    on its own is not sample-identical to the same audio decoded whole.
+
+    PCM has no frames or encoder delay, so segments join sample for sample in any container.
+    FLAC frames are independent, but FLAC files number their frames from the start of the file,
+    so only FLAC in Matroska, which is timed by the container, can be joined.
+
+    Parameters
+    ----------
+    source_codec : str | None
+        The codec of the stream in its file, or None if it is unknown.
+    codec : str
+        The encoder the stream is written with.
+    muxer : str
+        The FFmpeg muxer of the output file.
+
+    Returns
+    -------
+    bool
+        True if segments of the stream can be extracted separately and joined, False otherwise.
+    """
+    if source_codec is None or not (source_codec.startswith("pcm_") or source_codec == "flac"):
+        return False
+
+    return codec.startswith("pcm_") or (codec == "flac" and muxer == "matroska")
+
+
+@rich.repr.auto()
+@dataclass(frozen=True, slots=True)
+class SegmentedStream:
+    """A stream extracted in segments.
+
+    Attributes
+    ----------
+    index : StreamIndex
+        The index of the stream in its file.
+    selector : str
+        The FFmpeg stream selector of the stream in its file, such as `a:0`.
+    output_path : Path
+        The file the joined segments are written to.
+    muxer : str
+        The FFmpeg muxer of the output file.
+    output_options : EncoderOptions
+        The FFmpeg output options each segment is encoded with.
+    """
+
+    index: StreamIndex
+    selector: str
+    output_path: Path
+    muxer: str
+    output_options: EncoderOptions
+
+    def piece_path(self, segment: int) -> Path:
+        """Get the file a segment of the stream is extracted to, before it is joined.
+
+        Parameters
+        ----------
+        segment : int
+            The position of the segment in the timeline.
+
+        Returns
+        -------
+        Path
+            A hidden file beside the output file.
+        """
+        return self.output_path.with_name(f".{self.output_path.stem}.part{segment:03d}.mka")
+
+    @property
+    def list_path(self) -> Path:
+        """The concat demuxer list of the pieces of the stream, beside the output file."""
+        return self.output_path.with_name(f".{self.output_path.stem}.parts.txt")
+
+
+def _concat_entry(path: Path) -> str:
+    # The concat demuxer quotes paths with single quotes, which are escaped by closing and reopening the quote
+    escaped = path.resolve().as_posix().replace("'", r"'\''")
+    return f"file '{escaped}'\n"
+
+
+@rich.repr.auto()
+@dataclass(frozen=True, slots=True)
+class SegmentPlan:
+    """Streams of a file extracted in segments, with one FFmpeg process per segment extracting every stream.
+
+    Each segment is decoded from shortly before its start and trimmed at its exact start and end,
+    then encoded to a piece of each stream. The pieces of each stream are then joined without re-encoding.
+
+    Attributes
+    ----------
+    segments : tuple[Segment, ...]
+        The segments of the timeline, in order.
+    streams : tuple[SegmentedStream, ...]
+        The streams extracted in segments, in index order.
+    """
+
+    segments: tuple[Segment, ...]
+    streams: tuple[SegmentedStream, ...]
+
+    @property
+    def stream_indexes(self) -> list[StreamIndex]:
+        """The indexes of the streams extracted in segments, in index order."""
+        return [stream.index for stream in self.streams]
+
+    def segment_output(self, input_file: Path, segment: int) -> FFmpegOutput:
+        """Get the FFmpeg output extracting a segment of every stream.
+
+        Parameters
+        ----------
+        input_file : Path
+            The file to extract from.
+        segment : int
+            The position of the segment in the timeline.
+
+        Returns
+        -------
+        FFmpegOutput
+            The output, reporting progress to stdout.
+        """
+        start, end = self.segments[segment].start_seconds, self.segments[segment].end_seconds
+        seek = max(0, start - _SEEK_PREROLL_SECONDS)
+        source = ffmpeg.input(str(input_file), ss=seek) if seek > 0 else ffmpeg.input(str(input_file))
+
+        # Timestamps are kept as they are in the file, so every segment is trimmed against the same timeline.
+        # The first and last segments are left open, so audio before zero, such as encoder priming, or after the
+        # probed duration is extracted, exactly as when the file is extracted whole.
+        trim: dict[str, int] = {}
+        if segment > 0:
+            trim["start"] = start
+        if end is not None:
+            trim["end"] = end
+        outputs = [
+            ffmpeg.output(
+                source[stream.selector].filter("atrim", **trim).filter("asetpts", "PTS-STARTPTS"),
+                stream.piece_path(segment).resolve().as_posix(),
+                format=_PIECE_MUXER,
+                **stream.output_options,
+            )
+            for stream in self.streams
+        ]
+
+        return with_progress_args(ffmpeg.merge_outputs(*outputs)).global_args("-copyts")
+
+    def segment_outputs(self, input_file: Path) -> list[FFmpegOutput]:
+        """Get the FFmpeg output extracting each segment.
+
+        Parameters
+        ----------
+        input_file : Path
+            The file to extract from.
+
+        Returns
+        -------
+        list[FFmpegOutput]
+            The output of each segment, in order.
+        """
+        return [self.segment_output(input_file, segment) for segment in range(len(self.segments))]
+
+    def join_output(self, stream: SegmentedStream) -> FFmpegOutput:
+        """Write the concat list of a stream's pieces, and get the FFmpeg output joining them.
+
+        Parameters
+        ----------
+        stream : SegmentedStream
+            The stream.
+
+        Returns
+        -------
+        FFmpegOutput
+            The output copying the pieces into the output file, reporting progress to stdout.
+        """
+        stream.list_path.write_text(
+            "".join(_concat_entry(stream.piece_path(segment)) for segment in range(len(self.segments))),
+            encoding="utf-8",
+        )
+
+        return with_progress_args(
+            ffmpeg.input(stream.list_path.resolve().as_posix(), format="concat", safe=0).output(
+                stream.output_path.resolve().as_posix(),
+                format=stream.muxer,
+                acodec="copy",
+            )
+        )
+
+    def join_outputs(self) -> list[FFmpegOutput]:
+        """Write the concat list of every stream's pieces, and get the FFmpeg outputs joining them.
+
+        Returns
+        -------
+        list[FFmpegOutput]
+            The output of each stream, in index order.
+        """
+        return [self.join_output(stream) for stream in self.streams]
+
+    def remove_pieces(self) -> None:
+        """Remove the pieces and concat lists of every stream, which are only needed until they are joined."""
+        for stream in self.streams:
+            for path in (*(stream.piece_path(segment) for segment in range(len(self.segments))), stream.list_path):
+                try:
+                    path.unlink(missing_ok=True)
+                except OSError as e:
+                    logger.warning("Could not remove %r. %s", path, e)
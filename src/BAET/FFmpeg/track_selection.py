@@ -0,0 +1,119 @@
+"""Selection of the audio tracks of a file to extract, from their probed metadata."""
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+import rich.repr
+
+from BAET.typing import AudioStream, StreamIndex
+
+# FFmpeg's language of a stream without a language tag
+UNDETERMINED_LANGUAGE = "und"
+
+
+def stream_language(stream: AudioStream) -> str:
+    """Get the language of a probed audio stream.
+
+    Parameters
+    ----------
+    stream : AudioStream
+        The probed audio stream.
+
+    Returns
+    -------
+    str
+        The lowercase language tag of the stream, such as `eng`, or `UNDETERMINED_LANGUAGE` if it has none.
+    """
+    tags: dict[str, str] = stream.get("tags") or {}
+    language = next((value for key, value in tags.items() if key.lower() == "language"), None)
+    return language.strip().lower() if language else UNDETERMINED_LANGUAGE
+
+
+@rich.repr.auto()
+@dataclass(frozen=True, slots=True)
+class TrackSelector:
+    """A selection of audio tracks, by index, language, codec and channel count.
+
+    A track is selected if it passes every given criterion. Criteria that are not given select every track,
+    so the default selector selects every track.
+
+    Attributes
+    ----------
+    indexes : frozenset[StreamIndex]
+        The indexes of the tracks in their file, as shown by `baet probe`. Empty to select any index.
+    languages : frozenset[str]
+        The lowercase language tags of the tracks, such as `eng`. Tracks without a language tag
+        have the language `und`. Empty to select any language.
+    codecs : frozenset[str]
+        The lowercase codecs the tracks are stored with in their file, such as `aac`. Empty to select any codec.
+    min_channels : int | None
+        The fewest channels of the tracks, or None to select any number of channels.
+    """
+
+    indexes: frozenset[StreamIndex] = frozenset()
+    languages: frozenset[str] = frozenset()
+    codecs: frozenset[str] = frozenset()
+    min_channels: int | None = None
+
+    @classmethod
+    def create(
+        cls,
+        indexes: Iterable[StreamIndex] = (),
+        languages: Iterable[str] = (),
+        codecs: Iterable[str] = (),
+        min_channels: int | None = None,
+    ) -> "TrackSelector":
+        """Create a track selector, normalising the case of languages and codecs.
+
+        Parameters
+        ----------
+        indexes : Iterable[StreamIndex], optional
+            The indexes of the tracks to select, by default every index.
+        languages : Iterable[str], optional
+            The languages of the tracks to select, by default every language.
+        codecs : Iterable[str], optional
+            The codecs of the tracks to select, by default every codec.
+        min_channels : int | None, optional
+            The fewest channels of the tracks to select, by default None.
+
+        Returns
+        -------
+        TrackSelector
+            The track selector.
+        """
+        return cls(
+            frozenset(indexes),
+            frozenset(language.strip().lower() for language in languages),
+            frozenset(codec.strip().lower() for codec in codecs),
+            min_channels,
+        )
+
+    @property
+    def selects_all(self) -> bool:
+        """Whether the selector selects every track."""
+        return not (self.indexes or self.languages or self.codecs or self.min_channels is not None)
+
+    def matches(self, stream: AudioStream) -> bool:
+        """Check whether a probed audio stream is selected.
+
+        Parameters
+        ----------
+        stream : AudioStream
+            The probed audio stream.
+
+        Returns
+        -------
+        bool
+            True if the stream passes every criterion, False otherwise.
+            A stream whose codec or channel count was not probed does not pass a criterion on it.
+        """
+        if self.indexes and stream["index"] not in self.indexes:
+            return False
+
+        if self.languages and stream_language(stream) not in self.languages:
+            return False
+
+        if self.codecs and str(stream.get("codec_name", "")).lower() not in self.codecs:
+            return False
+
+        return self.min_channels is None or int(stream.get("channels") or 0) >= self.min_channels
@@ -1,11 +1,19 @@
 """Bulk Audio Export Tool (BAET) is a command line tool for exporting audio tracks from video files in bulk."""
 
-from importlib.metadata import version
+from typing import Any
 
 from ._config.console import app_console
 from ._config.logging import configure_logging, create_logger
 from .theme import app_theme
 
-__version__ = version(__name__)
-
 __all__ = ["app_console", "configure_logging", "create_logger", "app_theme"]
+
+
+def __getattr__(name: str) -> Any:
+    # Reading package metadata is slow, so only look up the version when it is used
+    if name == "__version__":
+        from importlib.metadata import version
+
+        return version(__name__)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
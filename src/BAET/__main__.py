@@ -1,16 +1,31 @@
 """Bulk Audio Export Tool (BAET) is a command line tool for exporting audio tracks from video files in bulk."""
 
 import sys
-
-from rich.traceback import install
+from types import TracebackType
 
 from BAET.cli.cli import cli
 
-# Enable rich traceback
-install(show_locals=True)
+
+def _rich_excepthook(
+    exc_type: type[BaseException],
+    exc_value: BaseException,
+    traceback: TracebackType | None,
+) -> None:
+    # Rich tracebacks are slow to import, so only install them once there is a traceback to show
+    from rich.traceback import install
+
+    install(show_locals=True)
+    sys.excepthook(exc_type, exc_value, traceback)
 
 
 def main() -> None:
     """Entry point for BAET."""
+    # Enable rich traceback
+    sys.excepthook = _rich_excepthook
+
     cli()
     sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
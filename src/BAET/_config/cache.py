@@ -0,0 +1,30 @@
+import os
+import sys
+from pathlib import Path
+
+APP_CACHE_DIR_NAME = "BAET"
+CACHE_DIR_ENV_VAR = "BAET_CACHE_DIR"
+
+
+def user_cache_dir() -> Path:
+    """Get the directory BAET stores its persistent caches in.
+
+    The directory can be overridden with the `BAET_CACHE_DIR` environment variable.
+    Otherwise, the platform's conventional user cache directory is used.
+
+    Returns
+    -------
+    Path
+        The cache directory. It is not guaranteed to exist.
+    """
+    if override := os.environ.get(CACHE_DIR_ENV_VAR):
+        return Path(override).expanduser()
+
+    if sys.platform == "win32":
+        base = Path(os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local")
+    elif sys.platform == "darwin":
+        base = Path.home() / "Library" / "Caches"
+    else:
+        base = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+
+    return base / APP_CACHE_DIR_NAME
@@ -4,3 +4,4 @@ from ..theme import app_theme
 
 app_console = Console(theme=app_theme)
 error_console = Console(stderr=True, style="bold red", theme=app_theme)
+stderr_console = Console(stderr=True, theme=app_theme)
@@ -0,0 +1,246 @@
+import json
+import os
+import re
+import subprocess
+from dataclasses import dataclass
+from functools import cache
+from pathlib import Path
+from subprocess import CalledProcessError
+from typing import Any
+
+import rich.repr
+
+from .cache import user_cache_dir
+from .ffmpeg_version import which_ffmpeg
+from .logging import create_logger
+
+logger = create_logger()
+
+CAPABILITIES_CACHE_FILENAME = "ffmpeg_capabilities.json"
+CAPABILITIES_CACHE_VERSION = 1
+
+# e.g. " A....D aac                  AAC (Advanced Audio Coding)", but not the legend " A..... = Audio"
+_ENCODER_PATTERN = re.compile(r"^ (?P<flags>[VAS][F.][S.][X.][B.][D.]) (?!=)(?P<name>\S+)", re.MULTILINE)
+# e.g. "  E ipod            iPod H.264 MP4 (MPEG-4 Part 14)"
+_MUXER_PATTERN = re.compile(r"^ [D ]E[d ]? +(?!=)(?P<names>\S+)", re.MULTILINE)
+# e.g. " ... atrim             A->A       Pick one continuous section from the input, drop the rest."
+_FILTER_PATTERN = re.compile(r"^ [T.][S.][C.] (?P<name>\S+) +\S*->\S*", re.MULTILINE)
+
+
+@rich.repr.auto()
+@dataclass(frozen=True)
+class FFmpegCapabilities:
+    """The capabilities of an FFmpeg build.
+
+    Attributes
+    ----------
+    version : str
+        The FFmpeg version.
+    audio_encoders : frozenset[str]
+        The audio encoders FFmpeg supports.
+    experimental_encoders : frozenset[str]
+        The audio encoders that can only be used with `-strict experimental`.
+    muxers : frozenset[str]
+        The muxers FFmpeg can write with.
+    filters : frozenset[str]
+        The filters FFmpeg supports.
+    """
+
+    version: str
+    audio_encoders: frozenset[str]
+    experimental_encoders: frozenset[str]
+    muxers: frozenset[str]
+    filters: frozenset[str]
+
+    def to_json(self) -> dict[str, Any]:
+        """Convert the capabilities to a JSON serialisable dictionary.
+
+        Returns
+        -------
+        dict[str, Any]
+            The capabilities.
+        """
+        return {
+            "version": self.version,
+            "audio_encoders": sorted(self.audio_encoders),
+            "experimental_encoders": sorted(self.experimental_encoders),
+            "muxers": sorted(self.muxers),
+            "filters": sorted(self.filters),
+        }
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> "FFmpegCapabilities":
+        """Create capabilities from a dictionary produced by `to_json`.
+
+        Parameters
+        ----------
+        data : dict[str, Any]
+            The capabilities.
+
+        Returns
+        -------
+        FFmpegCapabilities
+            The capabilities.
+        """
+        return cls(
+            version=data["version"],
+            audio_encoders=frozenset(data["audio_encoders"]),
+            experimental_encoders=frozenset(data["experimental_encoders"]),
+            muxers=frozenset(data["muxers"]),
+            filters=frozenset(data["filters"]),
+        )
+
+
+def _run_ffmpeg(ffmpeg: Path, *args: str) -> str:
+    proc = subprocess.run([ffmpeg, "-hide_banner", *args], capture_output=True, check=True)  # noqa: S603
+    return proc.stdout.decode("utf-8", errors="replace")
+
+
+def discover_capabilities(ffmpeg: Path) -> FFmpegCapabilities:
+    """Query an FFmpeg binary for its capabilities.
+
+    Parameters
+    ----------
+    ffmpeg : Path
+        The FFmpeg binary.
+
+    Returns
+    -------
+    FFmpegCapabilities
+        The capabilities of the binary.
+
+    Raises
+    ------
+    CalledProcessError
+        If FFmpeg exits with a non-zero exit code.
+    """
+    logger.info("Discovering the capabilities of %r", ffmpeg)
+
+    version_output = _run_ffmpeg(ffmpeg, "-version")
+    version = version_output[len("ffmpeg version") : version_output.find("Copyright")].strip()
+
+    encoders = [match.group("flags", "name") for match in _ENCODER_PATTERN.finditer(_run_ffmpeg(ffmpeg, "-encoders"))]
+    muxers = [
+        name for match in _MUXER_PATTERN.finditer(_run_ffmpeg(ffmpeg, "-muxers")) for name in match["names"].split(",")
+    ]
+    filters = [match["name"] for match in _FILTER_PATTERN.finditer(_run_ffmpeg(ffmpeg, "-filters"))]
+
+    return FFmpegCapabilities(
+        version=version,
+        audio_encoders=frozenset(name for flags, name in encoders if flags[0] == "A"),
+        experimental_encoders=frozenset(name for flags, name in encoders if flags[0] == "A" and flags[3] == "X"),
+        muxers=frozenset(muxers),
+        filters=frozenset(filters),
+    )
+
+
+def _binary_key(ffmpeg: Path) -> dict[str, Any]:
+    stat = ffmpeg.stat()
+    return {"path": str(ffmpeg), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _is_cache_entry(entry: Any) -> bool:
+    return isinstance(entry, dict) and isinstance(entry.get("binary"), dict) and "path" in entry["binary"]
+
+
+def _read_cache(cache_file: Path) -> dict[str, Any]:
+    empty: dict[str, Any] = {"version": CAPABILITIES_CACHE_VERSION, "binaries": []}
+    try:
+        with cache_file.open(encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return empty
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring unreadable FFmpeg capabilities cache %r. %s: %s", cache_file, type(e).__name__, e)
+        return empty
+
+    if not isinstance(data, dict) or not isinstance(data.get("binaries"), list):
+        logger.warning("Ignoring malformed FFmpeg capabilities cache %r", cache_file)
+        return empty
+
+    if data.get("version") != CAPABILITIES_CACHE_VERSION:
+        return empty
+
+    # Malformed entries are dropped, so their binaries are queried again
+    return empty | {"binaries": [entry for entry in data["binaries"] if _is_cache_entry(entry)]}
+
+
+def _write_cache(cache_file: Path, data: dict[str, Any]) -> None:
+    temp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with temp_file.open("w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(temp_file, cache_file)
+    except OSError as e:
+        logger.warning("Could not write FFmpeg capabilities cache %r. %s: %s", cache_file, type(e).__name__, e)
+
+
+def load_capabilities(ffmpeg: Path, cache_file: Path | None = None) -> FFmpegCapabilities:
+    """Get the capabilities of an FFmpeg binary, reusing the cached capabilities if the binary is unchanged.
+
+    Capabilities are cached on disk, keyed by the path, size and modification time of the binary,
+    so FFmpeg is only queried again when it is replaced or upgraded.
+
+    Parameters
+    ----------
+    ffmpeg : Path
+        The FFmpeg binary.
+    cache_file : Path | None, optional
+        The cache file, by default a file in the user cache directory.
+
+    Returns
+    -------
+    FFmpegCapabilities
+        The capabilities of the binary.
+
+    Raises
+    ------
+    OSError
+        If the binary could not be found.
+    CalledProcessError
+        If FFmpeg exits with a non-zero exit code.
+    """
+    if cache_file is None:
+        cache_file = user_cache_dir() / CAPABILITIES_CACHE_FILENAME
+
+    ffmpeg = ffmpeg.resolve()
+    key = _binary_key(ffmpeg)
+
+    data = _read_cache(cache_file)
+    for entry in data["binaries"]:
+        if entry["binary"] == key:
+            try:
+                return FFmpegCapabilities.from_json(entry["capabilities"])
+            except (KeyError, TypeError) as e:
+                logger.warning("Ignoring invalid cached FFmpeg capabilities. %s: %s", type(e).__name__, e)
+
+    capabilities = discover_capabilities(ffmpeg)
+
+    # Only keep entries for binaries that are unchanged, as others can never be used again
+    binaries = [entry for entry in data["binaries"] if entry["binary"]["path"] != key["path"]]
+    binaries.append({"binary": key, "capabilities": capabilities.to_json()})
+    _write_cache(cache_file, {"version": CAPABILITIES_CACHE_VERSION, "binaries": binaries})
+
+    return capabilities
+
+
+@cache
+def get_ffmpeg_capabilities() -> FFmpegCapabilities | None:
+    """Get the capabilities of the FFmpeg on the PATH.
+
+    Returns
+    -------
+    FFmpegCapabilities | None
+        The capabilities, or None if FFmpeg could not be found or queried.
+    """
+    ffmpeg = which_ffmpeg()
+    if not ffmpeg:
+        logger.warning("Could not find FFmpeg on the PATH")
+        return None
+
+    try:
+        return load_capabilities(Path(ffmpeg))
+    except (OSError, CalledProcessError) as e:
+        logger.warning("Could not discover the capabilities of FFmpeg. %s: %s", type(e).__name__, e)
+        return None
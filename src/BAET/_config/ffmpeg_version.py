@@ -18,6 +18,10 @@ def which_ffmpeg() -> str | PathLike[str] | None:
     return which("ffmpeg")
 
 
+def which_ffprobe() -> str | PathLike[str] | None:
+    return which("ffprobe")
+
+
 def get_ffmpeg_version() -> str | None:
     try:
         ffmpeg = which_ffmpeg()
@@ -44,6 +48,24 @@ def get_ffmpeg_version() -> str | None:
         raise e
 
 
+def get_ffprobe_version() -> str | None:
+    try:
+        ffprobe = which_ffprobe()
+
+        if not ffprobe:
+            return None
+
+        proc = subprocess.run([ffprobe, "-version"], capture_output=True, check=True)  # noqa: S603
+
+        output = proc.stdout.decode("utf-8")
+        return output[len("ffprobe version") : output.find("Copyright")].strip()
+
+    except CalledProcessError as e:
+        logger.critical("FFprobe exited with a non-zero exit code.\n%s: %s", type(e).__name__, e)
+        error_console.print_exception()
+        raise e
+
+
 class FFmpegVersionInfo:
     def __init__(self) -> None:
         self._version: str | None = None
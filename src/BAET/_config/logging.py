@@ -1,15 +1,14 @@
-import inspect
 import logging
+import sys
 from collections.abc import Callable
 from functools import wraps
 from logging import FileHandler, Logger
 from pathlib import Path
-from types import ModuleType
-from typing import Any, Concatenate
+from typing import Any
 
 from rich.logging import RichHandler
 
-from .console import app_console
+from .console import app_console, stderr_console
 
 rich_handler = RichHandler(
     rich_tracebacks=True,
@@ -27,52 +26,53 @@ logging.basicConfig(
 app_logger = logging.getLogger("app_logger")
 
 
-def pass_module[**P](func: Callable[Concatenate[ModuleType, P], Logger]) -> Callable[P, Logger]:
-    """Decorate a function, passing the module of the caller as the first argument of the decorated function."""
-    frame = inspect.stack()[1]
-    module = inspect.getmodule(frame[0])
+def _caller_module_name(depth: int = 1) -> str:
+    # Frame inspection via `inspect` reads source files for the whole stack, so only look at the calling frame
+    module_name: str = sys._getframe(depth + 1).f_globals.get("__name__", "__main__")
+    return module_name
 
-    if module is None:
-        raise RuntimeError("Could not inspect module")
 
-    @wraps(func)
-    def wrapper(*args: P.args, **kwargs: P.kwargs) -> Any:
-        return func(module, *args, **kwargs)
-
-    return wrapper
+def create_logger(name: str | None = None) -> Logger:
+    """Create and return a logger for a module.
 
+    Parameters
+    ----------
+    name : str | None, optional
+        The name of the module, by default the name of the calling module.
 
-@pass_module
-def create_logger(module: ModuleType) -> Logger:
-    """Create and return a logger for the current module."""
-    if module is None:
-        raise RuntimeError("Could not inspect module")
-
-    module_name = module.__name__
+    Returns
+    -------
+    Logger
+        The logger for the module.
+    """
+    if name is None:
+        name = _caller_module_name()
 
-    logger = app_logger.getChild(module_name)
-    return logger
+    return app_logger.getChild(name)
 
 
-@pass_module
-def find_module_logger(module: ModuleType) -> Logger:
-    """Find the logger for the current module.
+def find_module_logger(name: str | None = None) -> Logger:
+    """Find the logger for a module.
 
     Parameters
     ----------
-    module : ModuleType
-        The module to find the logger for.
+    name : str | None, optional
+        The name of the module, by default the name of the calling module.
 
     Returns
     -------
     Logger
-        The logger for the module, or None if it doesn't exist.
+        The `logger` of the module, or the app logger if the module doesn't have one.
 
     Raises
     ------
     TypeError
         If the found logger variable is not of type logging.Logger.
     """
+    if name is None:
+        name = _caller_module_name()
+
+    module = sys.modules.get(name)
     logger = getattr(module, "logger", app_logger)
 
     if not isinstance(logger, logging.Logger):
@@ -96,22 +96,23 @@ def pass_logger(func: Callable[..., Any]) -> Callable[..., Any]:
 
     Raises
     ------
-    RuntimeError
-        If the module cannot be inspected.
+    TypeError
+        If the module's logger variable is not of type logging.Logger.
     """
 
     @wraps(func)
     def wrapper(*args: Any, **kwargs: Any) -> Any:
-        logger = find_module_logger()
-
-        if logger is None:
-            logger = app_logger
-
+        logger = find_module_logger(func.__module__)
         return func(logger, *args, **kwargs)
 
     return wrapper
 
 
+def log_to_stderr() -> None:
+    """Write logs to standard error rather than standard output, so standard output can be read by other programs."""
+    rich_handler.console = stderr_console
+
+
 def configure_logging(*, enable_logging: bool = True, file_out: Path | None = None) -> None:
     """Configure logging.
 
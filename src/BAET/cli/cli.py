@@ -4,13 +4,19 @@ import rich_click as click
 
 from BAET._config.logging import app_logger, configure_logging, create_logger
 from BAET.cli.help_configuration import baet_config
-
-from .commands import extract, probe
+from BAET.cli.lazy_group import LazyGroup
 
 logger = create_logger()
 
 
-@click.group("baet")
+@click.group(
+    "baet",
+    cls=LazyGroup,
+    lazy_subcommands={
+        "extract": "BAET.cli.commands.extract:extract",
+        "probe": "BAET.cli.commands.probe:probe",
+    },
+)
 @baet_config(use_markdown=True)
 @click.version_option(prog_name="BAET", package_name="BAET", message="%(prog)s v%(version)s")
 @click.option("--logging", "-L", help="Run the application with logging.", count=True)
@@ -26,7 +32,3 @@ def cli(logging: int) -> None:
 
     # Currently only two levels of verbosity for info/debug level logging
     logger.info("Logging verbosity: %s", max(0, min(2, logging)))
-
-
-cli.add_command(extract.extract)
-cli.add_command(probe.probe)
@@ -1,45 +1,97 @@
 """Extract click command."""
 
+import asyncio
+import os
 import re
-from collections.abc import Callable, MutableMapping, Sequence
+from collections.abc import Callable, Iterable, Iterator, Sequence
 from dataclasses import dataclass, field
 from functools import wraps
+from itertools import chain
 from pathlib import Path
 from re import Pattern
+from threading import Semaphore
 from typing import Concatenate
 
 import rich.repr
 import rich_click as click
-from rich.console import Group
-from rich.live import Live
-from rich.padding import Padding
 from rich.pretty import pretty_repr
-from rich.table import Table
 
 import ffmpeg
-from BAET._config.console import app_console
-from BAET._config.logging import create_logger
+from BAET._config.ffmpeg_capabilities import FFmpegCapabilities, get_ffmpeg_capabilities
+from BAET._config.logging import create_logger, log_to_stderr
 from BAET.cli.help_configuration import baet_config
-from BAET.constants import AUDIO_EXTENSIONS, VIDEO_EXTENSIONS_NO_DOT, VideoExtension_NoDot
-from BAET.display.job_progress import FFmpegJobProgress
+from BAET.cli.types import CommaSeparatedParamType
+from BAET.constants import (
+    AUDIO_EXTENSIONS,
+    ENCODER_PRESETS,
+    EXECUTION_ENGINES,
+    PROGRESS_MODES,
+    VIDEO_EXTENSIONS_NO_DOT,
+    EncoderPreset,
+    ExecutionEngine,
+    ProgressMode,
+    VideoExtension_NoDot,
+)
+from BAET.Display.batch_progress import BatchProgress
+from BAET.Display.jsonl_progress import JsonlBatchReporter
+from BAET.Display.reporting import BatchReporter, JobReporter, NullBatchReporter, TimedBatchReporter
+from BAET.FFmpeg.batching import (
+    DEFAULT_PACK_INPUTS,
+    DEFAULT_PACK_MEGABYTES,
+    DEFAULT_PACK_SECONDS,
+    BatchBudget,
+    pack_jobs,
+)
+from BAET.FFmpeg.codecs import (
+    AUTO_CODEC,
+    Container,
+    check_plan,
+    container_for,
+    container_for_filetype,
+)
+from BAET.FFmpeg.job_builder import build_job
 from BAET.FFmpeg.jobs import AudioExtractJob
-from BAET.FFmpeg.probe import probe_audio_streams
+from BAET.FFmpeg.manifest import ExtractionManifest
+from BAET.FFmpeg.metrics import ExtractionMetrics, timed_phase
+from BAET.FFmpeg.probe_cache import open_probe_cache
+from BAET.FFmpeg.profiles import DEFAULT_PRESET
+from BAET.FFmpeg.runner import StreamCompleteCallback, run_batch, run_batch_async
+from BAET.FFmpeg.segmenting import MIN_SEGMENT_SECONDS
+from BAET.FFmpeg.track_selection import TrackSelector
+from BAET.helpers.concurrency import bounded_imap_unordered
+from BAET.helpers.file_discovery import scan_files
+from BAET.helpers.name_filter import NameFilter
 from BAET.helpers.string_helpers import pretty_join
-from BAET.typing import AudioStream
-from ffmpeg import Stream
+from BAET.typing import StreamIndex
 
 logger = create_logger()
 
 
+@rich.repr.auto()
+@dataclass()
+class DirectoryInput:
+    """Dataclass for holding a directory of inputs, which are discovered once all filters are known."""
+
+    input_dir: Path
+    output_dir: Path
+    filetype: str
+    recursive: bool = False
+    follow_symlinks: bool = False
+
+
 @rich.repr.auto()
 @dataclass()
 class ExtractJob:
     """Dataclass for holding extract job information."""
 
-    input_outputs: list[tuple[Path, Path]] = field(default_factory=lambda: [])
-    includes: list[Pattern[str]] = field(default_factory=lambda: [])
-    excludes: list[Pattern[str]] = field(default_factory=lambda: [])
-    include_extensions: list[Pattern[str]] = field(default_factory=lambda: [])
+    input_outputs: list[tuple[Path, Path]] = field(default_factory=list)
+    input_dirs: list[DirectoryInput] = field(default_factory=list)
+    includes: list[Pattern[str]] = field(default_factory=list)
+    excludes: list[Pattern[str]] = field(default_factory=list)
+    exclude_dirs: list[Pattern[str]] = field(default_factory=list)
+    include_extensions: list[tuple[str, bool]] = field(default_factory=list)
+    batch_budget: BatchBudget | None = None
+    segments: dict[Path, int] = field(default_factory=dict)
 
 
 pass_extract_context = click.make_pass_decorator(ExtractJob, ensure=True)
@@ -69,7 +121,7 @@ def processor[**P](
     is_flag=True,
     default=False,
     show_default=True,
-    help="Overwrite existing files.",
+    help="Extract every track again, even if a previous run already extracted it from the unchanged input.",
 )
 @click.option(
     "--dry-run",
@@ -78,9 +130,146 @@ def processor[**P](
     show_default=True,
     help="Run without actually producing any output.",
 )
+@click.option(
+    "--single-pass/--per-stream",
+    "single_pass",
+    default=True,
+    show_default=True,
+    help="Extract every audio stream of a file with one FFmpeg process, or run one FFmpeg process per stream.",
+)
+@click.option(
+    "--codec",
+    "-c",
+    default=AUTO_CODEC,
+    show_default=True,
+    metavar="copy|auto|ENCODER",
+    help=(
+        "How to write audio tracks. `copy` remuxes tracks without re-encoding them, `auto` remuxes tracks the output "
+        "filetype can hold and encodes the rest with the fastest encoder FFmpeg has for the filetype, "
+        "and any other value is the FFmpeg encoder to encode every track with."
+    ),
+)
+@click.option(
+    "--preset",
+    type=click.Choice(ENCODER_PRESETS, case_sensitive=False),
+    default=DEFAULT_PRESET,
+    show_default=True,
+    help=(
+        "How to balance encoding speed against output size, when tracks are encoded. `fast` spends the least CPU time, "
+        "`small` produces the smallest files."
+    ),
+)
+@click.option(
+    "--track",
+    "tracks",
+    multiple=True,
+    type=CommaSeparatedParamType(click.IntRange(min=0)),
+    metavar="INDEX[,...]",
+    help=(
+        "Only extract the audio tracks with these indexes, as shown by `baet probe`. "
+        "Can be specified multiple times. By default, every track is extracted."
+    ),
+)
+@click.option(
+    "--lang",
+    "languages",
+    multiple=True,
+    type=CommaSeparatedParamType(click.STRING),
+    metavar="LANGUAGE[,...]",
+    help=(
+        "Only extract audio tracks tagged with these languages, such as `eng`. Tracks without a language tag "
+        "have the language `und`. Can be specified multiple times."
+    ),
+)
+@click.option(
+    "--track-codec",
+    "track_codecs",
+    multiple=True,
+    type=CommaSeparatedParamType(click.STRING),
+    metavar="CODEC[,...]",
+    help=(
+        "Only extract audio tracks stored with these codecs in the input, such as `aac`. "
+        "Can be specified multiple times. See `--codec` for the codec tracks are written with."
+    ),
+)
+@click.option(
+    "--min-channels",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Only extract audio tracks with at least this many channels, such as 6 for 5.1 surround tracks.",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    "max_jobs",
+    type=click.IntRange(min=1),
+    default=os.cpu_count() or 1,
+    show_default="CPU count",
+    help="The maximum number of FFmpeg processes to run at once.",
+)
+@click.option(
+    "--probe-jobs",
+    "probe_jobs",
+    type=click.IntRange(min=1),
+    default=min(32, (os.cpu_count() or 1) + 4),
+    show_default="min(32, CPU count + 4)",
+    help="The maximum number of files to probe at once, while extraction of already probed files runs.",
+)
+@click.option(
+    "--probe-cache/--no-probe-cache",
+    "use_probe_cache",
+    default=True,
+    show_default=True,
+    help="Reuse FFprobe results of unchanged files from previous runs.",
+)
+@click.option(
+    "--engine",
+    type=click.Choice(EXECUTION_ENGINES, case_sensitive=False),
+    default="thread",
+    show_default=True,
+    help="Run FFmpeg processes from a pool of threads, or supervise them all from a single asyncio event loop.",
+)
+@click.option(
+    "--progress",
+    type=click.Choice(PROGRESS_MODES, case_sensitive=False),
+    default="rich",
+    show_default=True,
+    help=(
+        "How to report progress. `rich` displays progress bars, `jsonl` writes one JSON event per line to standard "
+        "output for other programs to consume, and `none` reports nothing."
+    ),
+)
+@click.option(
+    "--metrics-out",
+    type=click.Path(dir_okay=False, writable=True, resolve_path=True, path_type=Path),
+    default=None,
+    help=(
+        "Write a JSON report of the time spent in each phase (scanning, filtering, probing, building jobs, FFmpeg and "
+        "progress reporting), and of the CPU time, peak memory, bytes written and speed of every FFmpeg process."
+    ),
+)
 @baet_config()
-def extract(dry_run: bool, overwrite: bool) -> None:
+def extract(
+    dry_run: bool,
+    overwrite: bool,
+    single_pass: bool,
+    codec: str,
+    preset: EncoderPreset,
+    tracks: tuple[tuple[StreamIndex, ...], ...],
+    languages: tuple[tuple[str, ...], ...],
+    track_codecs: tuple[tuple[str, ...], ...],
+    min_channels: int | None,
+    max_jobs: int,
+    probe_jobs: int,
+    use_probe_cache: bool,
+    engine: ExecutionEngine,
+    progress: ProgressMode,
+    metrics_out: Path | None,
+) -> None:
     """Extract click command."""
+    if progress == "jsonl":
+        # Keep standard output for machine-readable events, before anything else is logged
+        log_to_stderr()
 
 
 @extract.result_callback()
@@ -90,117 +279,394 @@ def process(
     processors: Sequence[Callable[[ExtractJob], ExtractJob]],
     dry_run: bool,
     overwrite: bool,
+    single_pass: bool,
+    codec: str,
+    preset: EncoderPreset,
+    tracks: tuple[tuple[StreamIndex, ...], ...],
+    languages: tuple[tuple[str, ...], ...],
+    track_codecs: tuple[tuple[str, ...], ...],
+    min_channels: int | None,
+    max_jobs: int,
+    probe_jobs: int,
+    use_probe_cache: bool,
+    engine: ExecutionEngine,
+    progress: ProgressMode,
+    metrics_out: Path | None,
 ) -> None:
     """Process the extract command."""
     logger.info("Dry run: %s", dry_run)
+    logger.info("Overwrite: %s", overwrite)
+    logger.info("Single pass: %s", single_pass)
+    logger.info("Codec: %s", codec)
+    logger.info("Encoder preset: %s", preset)
+
+    track_selector = TrackSelector.create(
+        chain.from_iterable(tracks),
+        chain.from_iterable(languages),
+        chain.from_iterable(track_codecs),
+        min_channels,
+    )
+    logger.info("Tracks: %s", "all" if track_selector.selects_all else pretty_repr(track_selector))
+    logger.info("Maximum concurrent jobs: %d", max_jobs)
+    logger.info("Maximum concurrent probes: %d", probe_jobs)
+    logger.info("Use probe cache: %s", use_probe_cache)
+    logger.info("Execution engine: %s", engine)
+    logger.info("Progress: %s", progress)
+    logger.info("Metrics output: %s", metrics_out)
+
+    metrics = ExtractionMetrics() if metrics_out is not None else None
 
     job: ExtractJob = ExtractJob()
     for p in processors:
         job = p(job)
 
     if not job.include_extensions:
-        default_filter = ctx.invoke(filter_command, extensions=[re.escape(e) for e in VIDEO_EXTENSIONS_NO_DOT])
+        default_filter = ctx.invoke(filter_command, extensions=VIDEO_EXTENSIONS_NO_DOT)
         job = default_filter(job)
 
     logger.debug("Job (Prefiltered Inputs)::\n%s", pretty_repr(job))
-    logger.info(pretty_join(job.input_outputs, "Prefiltered inputs", formatter=lambda inout: f"{inout[0]!r}"))
 
-    for include in job.includes:
-        job.input_outputs = list(filter(lambda x: include.match(x[0].name), job.input_outputs))
+    capabilities = get_ffmpeg_capabilities()
+    if capabilities is not None:
+        check_capabilities(job, codec, capabilities)
+
+    include_file: Callable[[str], bool] = NameFilter(job.includes, job.excludes, job.include_extensions)
+    include_dir: Callable[[str], bool] = NameFilter(excludes=job.exclude_dirs)
+    if metrics is not None:
+        include_file = metrics.timed("filter", include_file)
+        include_dir = metrics.timed("filter", include_dir)
+
+    def log_input_output(input_output: tuple[Path, Path]) -> tuple[Path, Path]:
+        logger.info("Extracting %r -> %r", *input_output)
+        return input_output
+
+    # Inputs are discovered and filtered lazily, so probing can start before directories are fully scanned
+    input_outputs: Iterable[tuple[Path, Path]] = map(
+        log_input_output,
+        chain(
+            (input_output for input_output in job.input_outputs if include_file(input_output[0].name)),
+            *(discover_inputs(directory, include_file, include_dir) for directory in job.input_dirs),
+        ),
+    )
+    if metrics is not None:
+        # Filtering the entries of directories is timed as filtering rather than scanning
+        input_outputs = metrics.timed_iter("scan", input_outputs)
 
-    for exclude in job.excludes:
-        job.input_outputs = list(filter(lambda x: not exclude.match(x[0].name), job.input_outputs))
+    probe_cache = open_probe_cache() if use_probe_cache else None
+    manifest = ExtractionManifest()
 
-    job.input_outputs = list(
-        filter(lambda x: any(ext.match(x[0].name) for ext in job.include_extensions), list(job.input_outputs))
-    )
+    unprobed: list[Path] = []
 
-    logger.debug("Job (Filtered Inputs):\n%s", pretty_repr(job))
-    logger.info(pretty_join(job.input_outputs, "Filtered inputs", formatter=lambda inout: f"{inout[0]!r}"))
+    try:
+        # Probe and build jobs on a pool of threads, so extraction starts as soon as the first file is probed
+        def build(input_output: tuple[Path, Path]) -> AudioExtractJob | None:
+            with timed_phase(metrics, "build_job"):
+                try:
+                    return build_job(
+                        input_output[0],
+                        input_output[1],
+                        single_pass=single_pass,
+                        codec=codec,
+                        preset=preset,
+                        capabilities=capabilities,
+                        probe_cache=probe_cache,
+                        manifest=manifest,
+                        overwrite=overwrite,
+                        metrics=metrics,
+                        segments=job.segments.get(input_output[0], 1),
+                        tracks=track_selector,
+                    )
+                except (ffmpeg.Error, ValueError, OSError) as e:
+                    # A file that cannot be probed fails on its own, rather than stopping every other file
+                    logger.error("Could not probe %r. %s: %s", input_output[0], type(e).__name__, e)
+                    unprobed.append(input_output[0])
+                    return None
+
+        built = bounded_imap_unordered(
+            build,
+            input_outputs,
+            max_workers=probe_jobs,
+            thread_name_prefix="baet-probe",
+        )
+        pending = (built_job for built_job in built if built_job is not None and built_job.audio_streams)
+
+        def record_stream(built_job: AudioExtractJob, stream_index: StreamIndex) -> None:
+            if built_job.input_identity is not None:
+                manifest.record(
+                    built_job.input_identity,
+                    built_job.output_paths[stream_index],
+                    built_job.stream(stream_index).duration_ms,
+                    built_job.output_encodings[stream_index],
+                )
 
-    logger.info(
-        pretty_join(
-            job.input_outputs,
-            "Extracting",
-            formatter=lambda inout: f"{inout[0]!r} -> {inout[1].relative_to(inout[0].parent)!r}",
+        if dry_run:
+            for built_job in pending:
+                logger.info("Built job for %r", built_job.input_file)
+        elif engine == "asyncio":
+            reporter = create_batch_reporter(progress, metrics)
+            asyncio.run(run_asyncio(pending, max_jobs, reporter, record_stream, metrics, job.batch_budget))
+        elif max_jobs > 1:
+            reporter = create_batch_reporter(progress, metrics)
+            run_parallel(pending, max_jobs, reporter, record_stream, metrics, job.batch_budget)
+        else:
+            reporter = create_batch_reporter(progress, metrics)
+            run_synchronously(pending, reporter, record_stream, metrics, job.batch_budget)
+    finally:
+        if probe_cache is not None:
+            probe_cache.close()
+
+        if metrics is not None and metrics_out is not None:
+            metrics.write(metrics_out)
+
+    if unprobed:
+        raise click.ClickException(
+            pretty_join(
+                unprobed,
+                f"Could not extract {len(unprobed)} files, as they could not be probed",
+                formatter=str,
+                force_newline=True,
+            )
         )
-    )
 
-    built = [build_job(io[0], io[1]) for io in job.input_outputs]
+    logger.info("Finished extracting.")
 
-    if not dry_run:
-        run_synchronously(built)
 
-    logger.info("Finished extracting.")
+def check_capabilities(job: ExtractJob, codec: str, capabilities: FFmpegCapabilities) -> None:
+    """Check that FFmpeg can write every output of a job, before any inputs are probed.
 
+    Parameters
+    ----------
+    job : ExtractJob
+        The job.
+    codec : str
+        The codec to write streams with.
+    capabilities : FFmpegCapabilities
+        The capabilities of FFmpeg.
+
+    Raises
+    ------
+    click.UsageError
+        If FFmpeg cannot write an output container, or does not have the requested encoder.
+    """
+    containers: set[Container] = {container_for(out) for _, out in job.input_outputs}
+    containers.update(container_for_filetype(directory.filetype) for directory in job.input_dirs)
+
+    for container in containers:
+        try:
+            check_plan(codec, container, capabilities)
+        except ValueError as e:
+            raise click.UsageError(str(e)) from e
+
+        if codec == AUTO_CODEC:
+            try:
+                logger.info("Encoding %s files with %s", container.muxer, container.select_encoder(capabilities))
+            except ValueError as e:
+                logger.warning("Only streams that can be copied will be extracted. %s", e)
 
-def build_job(file: Path, out_path: Path) -> AudioExtractJob:
-    """Build an audio extraction job.
+
+def discover_inputs(
+    directory: DirectoryInput,
+    include_file: Callable[[str], bool],
+    include_dir: Callable[[str], bool],
+) -> Iterator[tuple[Path, Path]]:
+    """Lazily discover the inputs in a directory and the outputs to extract them to.
 
     Parameters
     ----------
-    file : Path
-        The file to extract audio from.
+    directory : DirectoryInput
+        The directory to search.
+
+    include_file : Callable[[str], bool]
+        A predicate on file names selecting which files to extract.
 
-    out_path : Path
-        The output path to extract to.
+    include_dir : Callable[[str], bool]
+        A predicate on directory names selecting which subdirectories to search.
 
     Returns
     -------
-    AudioExtractJob
-        The audio extraction job.
+    Iterator[tuple[Path, Path]]
+        The discovered input files and their output paths, mirroring the input directory tree.
     """
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-
-    audio_streams: list[AudioStream] = []
-    indexed_outputs: MutableMapping[int, Stream] = {}
-
-    file = file.expanduser()
-    with probe_audio_streams(file) as streams:
-        for idx, stream in enumerate(streams):
-            ffmpeg_input = ffmpeg.input(str(file))
-            stream_index = stream["index"]
-            output_path = out_path.with_stem(f"{out_path.stem}_track{stream_index}")
-            sample_rate = stream.get(
-                "sample_rate",
-                44100,
-            )
+    for entry in scan_files(
+        directory.input_dir,
+        recursive=directory.recursive,
+        follow_symlinks=directory.follow_symlinks,
+        include_file=include_file,
+        include_dir=include_dir,
+    ):
+        input_file = Path(entry.path)
+        output_dir = directory.output_dir / input_file.parent.relative_to(directory.input_dir)
+        yield input_file, output_dir / input_file.stem / input_file.with_suffix(directory.filetype).name
 
-            audio_streams.append(stream)
 
-            indexed_outputs[stream_index] = (
-                ffmpeg.output(
-                    ffmpeg_input[f"a:{idx}"],
-                    f"{output_path.resolve().as_posix()}",  # .replace(" ", r"\ ")}",
-                    format=output_path.suffix.lstrip("."),
-                    acodec="pcm_s16le",
-                    audio_bitrate=sample_rate,
-                )
-                .overwrite_output()
-                .global_args("-progress", "-", "-nostats")
-            )
+def create_batch_reporter(progress: ProgressMode, metrics: ExtractionMetrics | None = None) -> BatchReporter:
+    """Create the reporter of a batch's progress.
+
+    Parameters
+    ----------
+    progress : ProgressMode
+        How to report progress. `rich` displays progress bars, `jsonl` writes JSON lines to standard output
+        and `none` reports nothing.
+    metrics : ExtractionMetrics | None, optional
+        The metrics to record the time spent reporting and rendering progress to, by default None.
+
+    Returns
+    -------
+    BatchReporter
+        The batch reporter.
+    """
+    reporter: BatchReporter
+    if progress == "jsonl":
+        reporter = JsonlBatchReporter()
+    elif progress == "none":
+        reporter = NullBatchReporter()
+    else:
+        reporter = BatchProgress(metrics=metrics)
 
-    return AudioExtractJob(file, audio_streams, indexed_outputs)
+    return TimedBatchReporter(reporter, metrics) if metrics is not None else reporter
 
 
-def run_synchronously(jobs: list[AudioExtractJob]) -> None:
-    """Run audio extraction jobs synchronously.
+def _batch_name(batch: Sequence[AudioExtractJob]) -> str:
+    if len(batch) == 1:
+        return str(batch[0].input_file)
+
+    return f"{batch[0].input_file} and {len(batch) - 1} more"
+
+
+def run_synchronously(
+    jobs: Iterable[AudioExtractJob],
+    reporter: BatchReporter,
+    on_stream_complete: StreamCompleteCallback | None = None,
+    metrics: ExtractionMetrics | None = None,
+    budget: BatchBudget | None = None,
+) -> None:
+    """Run audio extraction jobs synchronously, one FFmpeg process at a time, including the segments of a job.
 
     Parameters
     ----------
-    jobs : list[AudioExtractJob]
-        The extraction jobs for FFmpeg to run.
+    jobs : Iterable[AudioExtractJob]
+        The extraction jobs for FFmpeg to run. Jobs are reported as they are taken from the iterable.
+    reporter : BatchReporter
+        The reporter of the batch's progress.
+    on_stream_complete : StreamCompleteCallback | None, optional
+        Called each time a stream is extracted successfully, by default None.
+    metrics : ExtractionMetrics | None, optional
+        The metrics to record every FFmpeg process to, by default None.
+    budget : BatchBudget | None, optional
+        The budget to pack small jobs into a single FFmpeg process within, or None to run every job on its own,
+        by default None.
     """
-    display = Table.grid()
-
-    job_progresses = [FFmpegJobProgress(job) for job in jobs]
-    display.add_row(Padding(Group(*job_progresses), pad=(1, 2)))
+    process_slots = Semaphore(1)
 
     logger.info("Starting synchronous execution of queued jobs")
-    with Live(display, console=app_console):
-        for progress in job_progresses:
-            logger.info("Starting job %r", {progress.job.input_file})
-            progress.start()
+    with reporter.live():
+        for batch in pack_jobs(jobs, budget):
+            logger.info("Starting job %r", _batch_name(batch))
+            run_batch(batch, [reporter.add(job) for job in batch], on_stream_complete, metrics, process_slots)
+
+
+def run_parallel(
+    jobs: Iterable[AudioExtractJob],
+    max_jobs: int,
+    reporter: BatchReporter,
+    on_stream_complete: StreamCompleteCallback | None = None,
+    metrics: ExtractionMetrics | None = None,
+    budget: BatchBudget | None = None,
+) -> None:
+    """Run audio extraction jobs concurrently on a bounded pool of workers.
+
+    Each worker runs one job at a time, and every FFmpeg process holds one of `max_jobs` slots while it runs,
+    so at most `max_jobs` FFmpeg processes run at once, including the concurrent segments of segmented jobs.
+    Reporters are thread-safe, so progress is reported directly from the workers.
+
+    Jobs are only taken from the iterable while fewer than `2 * max_jobs` are queued or running, so a slow
+    extraction holds back the stages producing the jobs, rather than every job being built and held at once.
+
+    Parameters
+    ----------
+    jobs : Iterable[AudioExtractJob]
+        The extraction jobs for FFmpeg to run. Jobs are queued as they are taken from the iterable.
+    max_jobs : int
+        The maximum number of jobs to run at once.
+    reporter : BatchReporter
+        The reporter of the batch's progress.
+    on_stream_complete : StreamCompleteCallback | None, optional
+        Called each time a stream is extracted successfully, by default None.
+    metrics : ExtractionMetrics | None, optional
+        The metrics to record every FFmpeg process to, by default None.
+    budget : BatchBudget | None, optional
+        The budget to pack small jobs into a single FFmpeg process within, or None to run every job on its own,
+        by default None.
+    """
+    process_slots = Semaphore(max_jobs)
+
+    def run(queued: tuple[list[AudioExtractJob], list[JobReporter]]) -> str:
+        batch, reporters = queued
+        run_batch(batch, reporters, on_stream_complete, metrics, process_slots)
+        return _batch_name(batch)
+
+    logger.info("Starting parallel execution of queued jobs with %d workers", max_jobs)
+    with reporter.live():
+        # Jobs are reported as queued when they are taken, so the batch display only grows with the queue
+        queued = ((batch, [reporter.add(job) for job in batch]) for batch in pack_jobs(jobs, budget))
+        for name in bounded_imap_unordered(run, queued, max_workers=max_jobs, thread_name_prefix="baet-job"):
+            logger.info("Finished job %r", name)
+
+
+async def run_asyncio(
+    jobs: Iterable[AudioExtractJob],
+    max_jobs: int,
+    reporter: BatchReporter,
+    on_stream_complete: StreamCompleteCallback | None = None,
+    metrics: ExtractionMetrics | None = None,
+    budget: BatchBudget | None = None,
+) -> None:
+    """Run audio extraction jobs concurrently from a single asyncio event loop.
+
+    The next job is only taken from the iterable once a slot to run it is free, so a slow extraction holds back
+    the stages producing the jobs, rather than every job being built and held at once. Every FFmpeg process also
+    holds one of `max_jobs` process slots while it runs, so the concurrent segments of segmented jobs do not
+    exceed the limit either.
+
+    Parameters
+    ----------
+    jobs : Iterable[AudioExtractJob]
+        The extraction jobs for FFmpeg to run. The iterable may block, as it is consumed off the event loop.
+    max_jobs : int
+        The maximum number of jobs to run at once.
+    reporter : BatchReporter
+        The reporter of the batch's progress.
+    on_stream_complete : StreamCompleteCallback | None, optional
+        Called each time a stream is extracted successfully, by default None.
+    metrics : ExtractionMetrics | None, optional
+        The metrics to record every FFmpeg process to, by default None.
+    budget : BatchBudget | None, optional
+        The budget to pack small jobs into a single FFmpeg process within, or None to run every job on its own,
+        by default None.
+    """
+    semaphore = asyncio.Semaphore(max_jobs)
+    process_slots = asyncio.Semaphore(max_jobs)
+
+    async def run(batch: list[AudioExtractJob], reporters: list[JobReporter]) -> None:
+        try:
+            logger.info("Starting job %r", _batch_name(batch))
+            await run_batch_async(batch, reporters, on_stream_complete, metrics, process_slots)
+            logger.info("Finished job %r", _batch_name(batch))
+        finally:
+            semaphore.release()
+
+    logger.info("Starting asyncio execution of queued jobs with at most %d concurrent jobs", max_jobs)
+    iterator = pack_jobs(jobs, budget)
+    with reporter.live():
+        async with asyncio.TaskGroup() as group:
+            while True:
+                await semaphore.acquire()
+                batch = await asyncio.to_thread(next, iterator, None)
+                if batch is None:
+                    semaphore.release()
+                    break
+
+                group.create_task(run(batch, [reporter.add(job) for job in batch]))
 
 
 @extract.command("file")
@@ -227,9 +693,27 @@ def run_synchronously(jobs: list[AudioExtractJob]) -> None:
     type=click.Choice(AUDIO_EXTENSIONS, case_sensitive=False),
     default=None,
 )
+@click.option(
+    "--segments",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help=(
+        "Split the file into this many segments of its timeline, extracted by concurrent FFmpeg processes, up to "
+        "`--jobs` at once, and joined sample for sample, which is much faster for very long files. "
+        f"Segments are at least {MIN_SEGMENT_SECONDS} seconds long. Only PCM or FLAC tracks written as PCM, such as "
+        "to .wav files, or as FLAC to .mka files can be joined, so other tracks, such as AAC, are extracted whole."
+    ),
+)
 @baet_config()
 @processor
-def input_file(job: ExtractJob, input_: Path, output: Path | None, filetype: str | None) -> ExtractJob:
+def input_file(
+    job: ExtractJob,
+    input_: Path,
+    output: Path | None,
+    filetype: str | None,
+    segments: int,
+) -> ExtractJob:
     """Extract specific tracks from a video file."""
     if filetype is not None and not filetype.startswith("."):
         filetype = f".{filetype}"
@@ -240,6 +724,11 @@ def input_file(job: ExtractJob, input_: Path, output: Path | None, filetype: str
         if filetype:
             logger.warning("Provided a file output and filetype, ignoring filetype.")
         out = output
+
+        try:
+            container_for(out)
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint="output") from e
     elif output.is_dir():
         out = output / input_.with_suffix(filetype or ".wav").name
     else:
@@ -249,6 +738,10 @@ def input_file(job: ExtractJob, input_: Path, output: Path | None, filetype: str
     logger.info("Extracting to: %r", out)
 
     job.input_outputs.append((input_, out))
+    if segments > 1:
+        logger.info("Extracting in up to %d segments", segments)
+        job.segments[input_] = segments
+
     return job
 
 
@@ -276,9 +769,65 @@ def input_file(job: ExtractJob, input_: Path, output: Path | None, filetype: str
     type=click.Choice(AUDIO_EXTENSIONS, case_sensitive=False),
     default="wav",
 )
+@click.option(
+    "--recursive",
+    "-r",
+    is_flag=True,
+    default=False,
+    show_default=True,
+    help="Also extract from videos in subdirectories, mirroring the directory tree in the output directory.",
+)
+@click.option(
+    "--follow-symlinks",
+    is_flag=True,
+    default=False,
+    show_default=True,
+    help="Follow symbolic links to directories when searching recursively. Directories are never visited twice.",
+)
+@click.option(
+    "--pack/--no-pack",
+    default=False,
+    show_default=True,
+    help=(
+        "Extract several small files with each FFmpeg process, which is much faster for many short clips. "
+        "Files that fail are extracted again on their own, so failures are reported for the file that caused them."
+    ),
+)
+@click.option(
+    "--pack-seconds",
+    type=click.FloatRange(min=0, min_open=True),
+    default=DEFAULT_PACK_SECONDS,
+    show_default=True,
+    help="The most media, in seconds of the longest track of each file, to extract with each packed FFmpeg process.",
+)
+@click.option(
+    "--pack-megabytes",
+    type=click.IntRange(min=1),
+    default=DEFAULT_PACK_MEGABYTES,
+    show_default=True,
+    help="The largest total size of the files extracted with each packed FFmpeg process.",
+)
+@click.option(
+    "--pack-inputs",
+    type=click.IntRange(min=2),
+    default=DEFAULT_PACK_INPUTS,
+    show_default=True,
+    help="The most files extracted with each packed FFmpeg process.",
+)
 @baet_config()
 @processor
-def input_dir(job: ExtractJob, input_: Path, output: Path | None, filetype: str) -> ExtractJob:
+def input_dir(
+    job: ExtractJob,
+    input_: Path,
+    output: Path | None,
+    filetype: str,
+    recursive: bool,
+    follow_symlinks: bool,
+    pack: bool,
+    pack_seconds: float,
+    pack_megabytes: int,
+    pack_inputs: int,
+) -> ExtractJob:
     """Extract specific tracks from a video file."""
     if output is None:
         output = input_
@@ -286,15 +835,17 @@ def input_dir(job: ExtractJob, input_: Path, output: Path | None, filetype: str)
     logger.info("Extracting audio tracks from video in dir: %r", input_)
     logger.info("Extracting to directory: %r", output)
     logger.info("Extracting to filetype: %r", filetype)
+    logger.info("Searching subdirectories: %s", recursive)
 
     if not filetype.startswith("."):
         filetype = f".{filetype}"
 
-    for input_file in input_.iterdir():
-        if not input_file.is_file():
-            continue
-        file_output = output / input_file.stem / input_file.with_suffix(filetype).name
-        job.input_outputs.append((input_file, file_output))
+    job.input_dirs.append(DirectoryInput(input_, output, filetype, recursive, follow_symlinks))
+
+    if pack:
+        # Jobs are packed as they are probed, so the budget applies to every input of the run
+        job.batch_budget = BatchBudget(pack_seconds, pack_megabytes * 1024 * 1024, pack_inputs)
+        logger.info("Packing small files into FFmpeg processes within %s", job.batch_budget)
 
     return job
 
@@ -316,6 +867,14 @@ def input_dir(job: ExtractJob, input_: Path, output: Path | None, filetype: str)
     default=[],
     help="Exclude files matching this pattern.",
 )
+@click.option(
+    "--exclude-dir",
+    "exclude_dirs",
+    multiple=True,
+    show_default=False,
+    default=[],
+    help="Do not search subdirectories matching this pattern, when searching recursively.",
+)
 @click.option(
     "--ext",
     "extensions",
@@ -337,6 +896,7 @@ def filter_command(
     job: ExtractJob,
     includes: Sequence[str],
     excludes: Sequence[str],
+    exclude_dirs: Sequence[str],
     extensions: Sequence[VideoExtension_NoDot],
     case_sensitive: bool,
 ) -> ExtractJob:
@@ -345,11 +905,11 @@ def filter_command(
 
     include_patterns: list[Pattern[str]] = []
     exclude_patterns: list[Pattern[str]] = []
-    extensions_patterns: list[Pattern[str]] = []
+    exclude_dir_patterns: list[Pattern[str]] = []
 
     pattern_list_pairs = zip(
-        [includes, excludes, extensions],
-        [include_patterns, exclude_patterns, extensions_patterns],
+        [includes, excludes, exclude_dirs],
+        [include_patterns, exclude_patterns, exclude_dir_patterns],
         strict=True,
     )
 
@@ -361,10 +921,6 @@ def filter_command(
         logger.error("Error: %s", e)
         raise click.BadParameter("Invalid pattern", param_hint="pattern") from e
 
-    include_patterns = [re.compile(p, flag) for p in includes]
-    exclude_patterns = [re.compile(p, flag) for p in excludes]
-    extensions_patterns = [re.compile(rf".*\.{re.escape(e)}$", flag) for e in extensions]
-
     logger.info("Filtering is case sensitivity: %s", case_sensitive)
 
     if includes:
@@ -373,12 +929,15 @@ def filter_command(
     if excludes:
         logger.info(pretty_join(excludes, "Exclude file patterns"))
 
+    if exclude_dirs:
+        logger.info(pretty_join(exclude_dirs, "Exclude directory patterns"))
+
     if extensions:
         logger.info(pretty_join(extensions, "Including extensions"))
-        logger.info(pretty_join(extensions_patterns, "Including' extensions", formatter=lambda p: p.pattern))
 
     job.includes.extend(include_patterns)
     job.excludes.extend(exclude_patterns)
-    job.include_extensions.extend(extensions_patterns)
+    job.exclude_dirs.extend(exclude_dir_patterns)
+    job.include_extensions.extend((extension, case_sensitive) for extension in extensions)
 
     return job
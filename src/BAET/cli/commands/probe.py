@@ -12,6 +12,7 @@ import rich_click as click
 from BAET._config.logging import create_logger
 from BAET.cli.help_configuration import baet_config
 from BAET.FFmpeg.probe import probe_file
+from BAET.FFmpeg.probe_cache import open_probe_cache
 
 logger = create_logger()
 
@@ -28,27 +29,40 @@ class ProbeContext:
     key: tuple[str, ...] | None
 
 
-def _probe_file(file: Path) -> dict[str, Any]:
+def _probe_file(file: Path, use_probe_cache: bool) -> dict[str, Any]:
     probed_dict: OrderedDict[str, Any]
-    with probe_file(file) as probed:
-        if "format" in probed:
-            probed_dict = OrderedDict(probed)
-            probed_dict.move_to_end("format", last=False)
+    probe_cache = open_probe_cache() if use_probe_cache else None
 
-        return dict(probed)
+    try:
+        with probe_file(file, probe_cache) as probed:
+            if "format" in probed:
+                probed_dict = OrderedDict(probed)
+                probed_dict.move_to_end("format", last=False)
+
+            return dict(probed)
+    finally:
+        if probe_cache is not None:
+            probe_cache.close()
 
 
 @click.group(chain=True, invoke_without_command=True)
 @baet_config(use_markdown=True)
 @click.argument("file", type=click.Path(exists=True, dir_okay=False), required=True)
-def probe(file: Path) -> None:
+@click.option(
+    "--probe-cache/--no-probe-cache",
+    "use_probe_cache",
+    default=True,
+    show_default=True,
+    help="Reuse the FFprobe result of the file from a previous run, if the file is unchanged.",
+)
+def probe(file: Path, use_probe_cache: bool) -> None:
     """Call FFprobe on a video file."""
 
 
 @probe.result_callback()
-def probe_result_callback(commands: list[_key_selector], file: Path) -> None:
+def probe_result_callback(commands: list[_key_selector], file: Path, use_probe_cache: bool) -> None:
     """Run the probe command."""
-    probed: dict[str, Any] = _probe_file(file)
+    probed: dict[str, Any] = _probe_file(Path(file), use_probe_cache)
 
     if not commands:
         rich.print_json(data=probed)
@@ -0,0 +1,78 @@
+"""A command group that imports its subcommands only when they are used."""
+
+import importlib
+from collections.abc import Mapping
+from typing import Any
+
+import rich_click as click
+
+
+class LazyGroup(click.RichGroup):
+    """A command group whose subcommands are imported the first time they are needed.
+
+    Running one subcommand only imports that subcommand's module, so the dependencies of other subcommands
+    do not slow down startup.
+    """
+
+    def __init__(self, *args: Any, lazy_subcommands: Mapping[str, str] | None = None, **kwargs: Any) -> None:
+        """Create a lazy command group.
+
+        Parameters
+        ----------
+        *args : Any
+            The positional arguments of `RichGroup`.
+        lazy_subcommands : Mapping[str, str] | None, optional
+            A map of subcommand names to the import paths of the subcommands, in the form `module:attribute`,
+            by default None.
+        **kwargs : Any
+            The keyword arguments of `RichGroup`.
+        """
+        super().__init__(*args, **kwargs)
+        self.lazy_subcommands = dict(lazy_subcommands or {})
+
+    def list_commands(self, ctx: click.Context) -> list[str]:
+        """List the names of the eager and lazy subcommands.
+
+        Parameters
+        ----------
+        ctx : click.Context
+            The click context.
+
+        Returns
+        -------
+        list[str]
+            The sorted subcommand names.
+        """
+        return sorted({*super().list_commands(ctx), *self.lazy_subcommands})
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> click.Command | None:
+        """Get a subcommand, importing it if it is lazy.
+
+        Parameters
+        ----------
+        ctx : click.Context
+            The click context.
+        cmd_name : str
+            The name of the subcommand.
+
+        Returns
+        -------
+        click.Command | None
+            The subcommand, or None if there is no subcommand with the name.
+        """
+        if cmd_name in self.lazy_subcommands:
+            return self._load(cmd_name)
+
+        return super().get_command(ctx, cmd_name)
+
+    def _load(self, cmd_name: str) -> click.Command:
+        module_name, _, attribute = self.lazy_subcommands[cmd_name].partition(":")
+        command = getattr(importlib.import_module(module_name), attribute)
+
+        if not isinstance(command, click.Command):
+            raise TypeError(f"Lazy subcommand {cmd_name!r} is not a click command: {command!r}")
+
+        # Cache the imported command, so it is only imported once
+        self.add_command(command, cmd_name)
+        del self.lazy_subcommands[cmd_name]
+        return command
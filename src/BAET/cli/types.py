@@ -4,7 +4,7 @@ import re
 from collections import OrderedDict
 from collections.abc import Callable, Iterable
 from re import Pattern
-from typing import Any, Protocol, override, runtime_checkable
+from typing import TYPE_CHECKING, Any, Protocol, override, runtime_checkable
 
 import rich_click as click
 from rich.repr import Result
@@ -32,6 +32,32 @@ class RegexPatternParamType(click.ParamType):
 RegexPattern = RegexPatternParamType()
 
 
+if TYPE_CHECKING:
+    _TupleParamType = click.ParamType[tuple[Any, ...]]
+else:
+    # `ParamType` is only generic from Click 8.2, so it is not subscripted at runtime
+    _TupleParamType = click.ParamType
+
+
+class CommaSeparatedParamType(_TupleParamType):
+    """Comma separated list type for parsing with click, such as `1,3`, converting each item with another type."""
+
+    def __init__(self, item_type: "click.ParamType[Any]") -> None:
+        self.item_type = item_type
+        self.name = f"{item_type.name}[,...]"
+
+    @override
+    def convert(self, value: Any, param: click.Parameter | None, ctx: click.Context | None) -> tuple[Any, ...]:
+        if isinstance(value, tuple):
+            return value
+
+        items = [item.strip() for item in str(value).split(",")]
+        if not all(items):
+            self.fail(f"{value!r} has an empty item...", param, ctx)
+
+        return tuple(self.item_type.convert(item, param, ctx) for item in items)
+
+
 @runtime_checkable
 class Equatable(Protocol):
     """A protocol asserting that an object has an implementation of `__eq__`."""
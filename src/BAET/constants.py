@@ -12,5 +12,14 @@ VideoExtension_NoDot = Literal["mp4", "mkv", "avi", "webm"]
 VIDEO_EXTENSIONS: Final[Sequence[VideoExtension]] = [".mp4", ".mkv", ".avi", ".webm"]
 VIDEO_EXTENSIONS_NO_DOT: Final[tuple[VideoExtension_NoDot, ...]] = typing.get_args(VideoExtension_NoDot)
 
-AudioExtension = Literal["mp3", "wav", "flac", "ogg"]
+AudioExtension = Literal["mp3", "wav", "flac", "ogg", "opus", "m4a", "mka"]
 AUDIO_EXTENSIONS: Final[tuple[AudioExtension, ...]] = typing.get_args(AudioExtension)
+
+ExecutionEngine = Literal["thread", "asyncio"]
+EXECUTION_ENGINES: Final[tuple[ExecutionEngine, ...]] = typing.get_args(ExecutionEngine)
+
+EncoderPreset = Literal["fast", "balanced", "small"]
+ENCODER_PRESETS: Final[tuple[EncoderPreset, ...]] = typing.get_args(EncoderPreset)
+
+ProgressMode = Literal["rich", "jsonl", "none"]
+PROGRESS_MODES: Final[tuple[ProgressMode, ...]] = typing.get_args(ProgressMode)
@@ -0,0 +1,417 @@
+"""A library API to extract audio tracks from within another program, without running the `baet` command.
+
+An `Extractor` holds a pool of workers, a probe cache and a manifest of completed extractions, which are shared by
+every file submitted to it. Each file is probed, built into an `AudioExtractJob` and run on a worker, and its
+outcome is returned as a future.
+
+Examples
+--------
+>>> with Extractor(ExtractOptions(filetype=".flac"), max_jobs=4) as extractor:
+...     future = extractor.submit(Path("video.mkv"), Path("out"))
+...     for stream in future.result().streams:
+...         print(stream.output, stream.error)  # doctest: +SKIP
+"""
+
+import asyncio
+import os
+import time
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from threading import Lock
+from types import TracebackType
+from typing import Self
+
+import rich.repr
+
+import ffmpeg
+from BAET._config.ffmpeg_capabilities import get_ffmpeg_capabilities
+from BAET._config.logging import create_logger
+from BAET.constants import EncoderPreset
+from BAET.Display.reporting import JobReporter, NullJobReporter
+from BAET.FFmpeg.codecs import AUTO_CODEC
+from BAET.FFmpeg.job_builder import build_job
+from BAET.FFmpeg.jobs import AudioExtractJob
+from BAET.FFmpeg.manifest import ExtractionManifest
+from BAET.FFmpeg.probe_cache import ProbeCache, open_probe_cache
+from BAET.FFmpeg.profiles import DEFAULT_PRESET
+from BAET.FFmpeg.progress import FFmpegProgress
+from BAET.FFmpeg.runner import run_job
+from BAET.FFmpeg.track_selection import TrackSelector
+from BAET.helpers.concurrency import bounded_imap_unordered
+from BAET.typing import Millisecond, StreamIndex
+
+logger = create_logger()
+
+
+@rich.repr.auto()
+@dataclass(frozen=True, slots=True)
+class ExtractOptions:
+    """How to extract the audio tracks of each file, as the options of `baet extract`.
+
+    Attributes
+    ----------
+    filetype : str
+        The suffix of the output files, which selects their container.
+    codec : str
+        How to write audio tracks. See `select_codec`.
+    preset : EncoderPreset
+        How to balance encoding speed against output size, when tracks are encoded. See `encoder_options`.
+    single_pass : bool
+        Whether to extract every audio track of a file with one FFmpeg process.
+    overwrite : bool
+        Whether to extract tracks again, even if they were already extracted from the unchanged input.
+    tracks : TrackSelector
+        The audio tracks to extract. By default, every track is extracted.
+    """
+
+    filetype: str = ".wav"
+    codec: str = AUTO_CODEC
+    preset: EncoderPreset = DEFAULT_PRESET
+    single_pass: bool = True
+    overwrite: bool = False
+    tracks: TrackSelector = field(default_factory=TrackSelector)
+
+
+@rich.repr.auto()
+@dataclass(frozen=True, slots=True)
+class StreamOutcome:
+    """The outcome of extracting an audio stream.
+
+    Attributes
+    ----------
+    index : StreamIndex
+        The index of the stream in its file.
+    output : Path
+        The file the stream was extracted to.
+    duration_ms : Millisecond
+        The duration of the stream, as given by `stream_duration_ms`.
+    wall_seconds : float
+        The time FFmpeg spent extracting the stream. Streams extracted in a single pass share this time.
+    error : str | None
+        Why the stream could not be extracted, or None if it was extracted successfully.
+    """
+
+    index: StreamIndex
+    output: Path
+    duration_ms: Millisecond
+    wall_seconds: float
+    error: str | None = None
+
+    @property
+    def succeeded(self) -> bool:
+        """Whether the stream was extracted successfully."""
+        return self.error is None
+
+
+@rich.repr.auto()
+@dataclass(frozen=True, slots=True)
+class FileOutcome:
+    """The outcome of extracting the audio streams of a file.
+
+    Streams that were already extracted from the unchanged input are skipped, so are not in `streams`.
+
+    Attributes
+    ----------
+    input_file : Path
+        The file.
+    streams : tuple[StreamOutcome, ...]
+        The outcome of each stream that was extracted, in index order.
+    wall_seconds : float
+        The time spent probing the file and extracting its streams.
+    error : str | None
+        Why the file could not be probed, or None if it was.
+    """
+
+    input_file: Path
+    streams: tuple[StreamOutcome, ...]
+    wall_seconds: float
+    error: str | None = None
+
+    @property
+    def succeeded(self) -> bool:
+        """Whether the file was probed and every stream was extracted successfully."""
+        return self.error is None and all(stream.succeeded for stream in self.streams)
+
+
+type StreamOutcomeCallback = Callable[[Path, StreamOutcome], None]
+
+
+def _describe(error: Exception) -> str:
+    if isinstance(error, ffmpeg.Error) and error.stderr:
+        stderr: bytes = error.stderr
+        return stderr.decode("utf-8", errors="replace").strip()
+
+    return f"{type(error).__name__}: {error}"
+
+
+class _OutcomeReporter:
+    """A job reporter that records the outcome of each stream, forwarding every report to another reporter."""
+
+    def __init__(self, job: AudioExtractJob, reporter: JobReporter, on_stream: StreamOutcomeCallback | None) -> None:
+        self.job = job
+        self.progress_interval = reporter.progress_interval
+        self.outcomes: dict[StreamIndex, StreamOutcome] = {}
+        self._reporter = reporter
+        self._on_stream = on_stream
+        self._started: dict[StreamIndex, float] = {}
+
+    def _record(self, streams: Sequence[StreamIndex], error: str | None) -> None:
+        now = time.perf_counter()
+        for stream_index in streams:
+            outcome = StreamOutcome(
+                stream_index,
+                self.job.output_paths[stream_index],
+                self.job.stream(stream_index).duration_ms,
+                now - self._started.get(stream_index, now),
+                error,
+            )
+            self.outcomes[stream_index] = outcome
+
+            if self._on_stream is not None:
+                self._on_stream(self.job.input_file, outcome)
+
+    def job_started(self) -> None:
+        self._reporter.job_started()
+
+    def streams_started(self, streams: Sequence[StreamIndex]) -> None:
+        started = time.perf_counter()
+        self._started.update((stream_index, started) for stream_index in streams)
+        self._reporter.streams_started(streams)
+
+    def streams_progressed(self, streams: Sequence[StreamIndex], progress: FFmpegProgress) -> None:
+        self._reporter.streams_progressed(streams, progress)
+
+    def streams_completed(self, streams: Sequence[StreamIndex]) -> None:
+        self._record(streams, None)
+        self._reporter.streams_completed(streams)
+
+    def streams_failed(self, streams: Sequence[StreamIndex], error: Exception) -> None:
+        self._record(streams, _describe(error))
+        self._reporter.streams_failed(streams, error)
+
+    def job_finished(self) -> None:
+        self._reporter.job_finished()
+
+
+class Extractor:
+    """Extracts the audio tracks of files on a shared pool of workers.
+
+    Each worker probes, builds and runs one file at a time, so at most `max_jobs` files are extracted at once.
+    Probe results are cached, and completed extractions are recorded in the manifest of each output directory,
+    exactly as `baet extract` does, so files are not probed or extracted again while they are unchanged.
+
+    The extractor is safe to use from multiple threads. Close it, or use it as a context manager,
+    to wait for submitted files and release its workers and probe cache.
+    """
+
+    def __init__(
+        self,
+        options: ExtractOptions | None = None,
+        *,
+        max_jobs: int | None = None,
+        probe_cache: ProbeCache | None = None,
+        use_probe_cache: bool = True,
+        reporter: Callable[[AudioExtractJob], JobReporter] | None = None,
+    ) -> None:
+        """Create an extractor.
+
+        Parameters
+        ----------
+        options : ExtractOptions | None, optional
+            How to extract each file, by default `ExtractOptions()`.
+        max_jobs : int | None, optional
+            The maximum number of files to extract at once, by default the CPU count.
+        probe_cache : ProbeCache | None, optional
+            The probe cache to share, by default the user's probe cache, which is opened and closed by the extractor.
+        use_probe_cache : bool, optional
+            Whether to use a probe cache, by default True.
+        reporter : Callable[[AudioExtractJob], JobReporter] | None, optional
+            Creates the reporter of each job's progress, such as `BatchReporter.add`, by default None.
+        """
+        self.options = options if options is not None else ExtractOptions()
+        self.max_jobs = max_jobs if max_jobs is not None else os.cpu_count() or 1
+
+        self._owns_probe_cache = use_probe_cache and probe_cache is None
+        self._probe_cache = (open_probe_cache() if self._owns_probe_cache else probe_cache) if use_probe_cache else None
+        self._reporter = reporter
+        self._capabilities = get_ffmpeg_capabilities()
+        self._manifest = ExtractionManifest()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_jobs, thread_name_prefix="baet-extractor")
+        self._lock = Lock()
+        self._closed = False
+
+    def __rich_repr__(self) -> rich.repr.Result:
+        """Return a rich representation of the object.
+
+        Returns
+        -------
+        rich.repr.Result
+            The rich representation.
+        """
+        yield "options", self.options
+        yield "max_jobs", self.max_jobs
+
+    def _output_path(self, file: Path, output_dir: Path | None) -> Path:
+        directory = output_dir if output_dir is not None else file.parent
+        return directory / file.with_suffix(self.options.filetype).name
+
+    def _extract(self, file: Path, output_dir: Path | None, on_stream: StreamOutcomeCallback | None) -> FileOutcome:
+        started = time.perf_counter()
+        try:
+            job = build_job(
+                file,
+                self._output_path(file, output_dir),
+                single_pass=self.options.single_pass,
+                codec=self.options.codec,
+                preset=self.options.preset,
+                capabilities=self._capabilities,
+                probe_cache=self._probe_cache,
+                manifest=self._manifest,
+                overwrite=self.options.overwrite,
+                tracks=self.options.tracks,
+            )
+        except (ffmpeg.Error, ValueError, OSError) as e:
+            logger.error("Could not probe %r. %s", file, _describe(e))
+            return FileOutcome(file, (), time.perf_counter() - started, _describe(e))
+
+        def record_stream(built_job: AudioExtractJob, stream_index: StreamIndex) -> None:
+            if built_job.input_identity is not None:
+                self._manifest.record(
+                    built_job.input_identity,
+                    built_job.output_paths[stream_index],
+                    built_job.stream(stream_index).duration_ms,
+                    built_job.output_encodings[stream_index],
+                )
+
+        reporter = self._reporter(job) if self._reporter is not None else NullJobReporter()
+        outcomes = _OutcomeReporter(job, reporter, on_stream)
+        run_job(job, outcomes, record_stream)
+
+        streams = tuple(outcomes.outcomes[stream_index] for stream_index in job.stream_indexes)
+        return FileOutcome(file, streams, time.perf_counter() - started)
+
+    def submit(
+        self,
+        file: Path,
+        output_dir: Path | None = None,
+        on_stream: StreamOutcomeCallback | None = None,
+    ) -> Future[FileOutcome]:
+        """Submit a file to extract the audio tracks of.
+
+        Each track is extracted to `output_dir / f"{file.stem}_track{index}{filetype}"`.
+
+        Parameters
+        ----------
+        file : Path
+            The file to extract audio from.
+        output_dir : Path | None, optional
+            The directory to extract to, by default the directory of the file.
+        on_stream : StreamOutcomeCallback | None, optional
+            Called on a worker with the file and the outcome of each stream as soon as it is extracted,
+            by default None.
+
+        Returns
+        -------
+        Future[FileOutcome]
+            The outcome of the file. Failing to probe the file or to extract a stream is part of the outcome,
+            rather than raised.
+
+        Raises
+        ------
+        RuntimeError
+            If the extractor is closed.
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Cannot submit files to a closed extractor")
+
+            return self._executor.submit(self._extract, file, output_dir, on_stream)
+
+    async def extract_async(
+        self,
+        file: Path,
+        output_dir: Path | None = None,
+        on_stream: StreamOutcomeCallback | None = None,
+    ) -> FileOutcome:
+        """Extract the audio tracks of a file, awaiting its outcome from the running event loop.
+
+        Parameters
+        ----------
+        file : Path
+            The file to extract audio from.
+        output_dir : Path | None, optional
+            The directory to extract to, by default the directory of the file.
+        on_stream : StreamOutcomeCallback | None, optional
+            Called on a worker with the file and the outcome of each stream as soon as it is extracted,
+            by default None.
+
+        Returns
+        -------
+        FileOutcome
+            The outcome of the file.
+        """
+        return await asyncio.wrap_future(self.submit(file, output_dir, on_stream))
+
+    def extract_all(
+        self,
+        files: Iterable[Path],
+        output_dir: Path | None = None,
+        on_stream: StreamOutcomeCallback | None = None,
+    ) -> Iterator[FileOutcome]:
+        """Lazily extract the audio tracks of many files, yielding their outcomes as they complete.
+
+        Files are only taken from `files` as workers become free, so `files` may be a lazy or unbounded iterable.
+
+        Parameters
+        ----------
+        files : Iterable[Path]
+            The files to extract audio from.
+        output_dir : Path | None, optional
+            The directory to extract to, by default the directory of each file.
+        on_stream : StreamOutcomeCallback | None, optional
+            Called on a worker with the file and the outcome of each stream as soon as it is extracted,
+            by default None.
+
+        Returns
+        -------
+        Iterator[FileOutcome]
+            The outcome of each file, in order of completion.
+        """
+        return bounded_imap_unordered(
+            lambda file: self._extract(file, output_dir, on_stream),
+            files,
+            max_workers=self.max_jobs,
+            executor=self._executor,
+        )
+
+    def close(self) -> None:
+        """Wait for the submitted files to be extracted, then release the workers and the probe cache."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+
+        self._executor.shutdown(wait=True)
+        if self._owns_probe_cache and self._probe_cache is not None:
+            self._probe_cache.close()
+
+    def __enter__(self) -> Self:
+        """Use the extractor as a context manager, which closes it on exit.
+
+        Returns
+        -------
+        Self
+            The extractor.
+        """
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the extractor."""
+        self.close()
@@ -0,0 +1,79 @@
+"""Helpers for running work concurrently."""
+
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from itertools import islice
+
+
+def bounded_imap_unordered[T, R](
+    func: Callable[[T], R],
+    items: Iterable[T],
+    max_workers: int,
+    *,
+    max_pending: int | None = None,
+    thread_name_prefix: str = "",
+    executor: Executor | None = None,
+) -> Iterator[R]:
+    """Lazily map a function over items on a pool of threads, yielding results as they complete.
+
+    Items are only taken from `items` as capacity becomes available, so at most `max_pending`
+    results are being computed or waiting to be consumed at any time.
+
+    Parameters
+    ----------
+    func : Callable[[T], R]
+        The function to apply to each item.
+
+    items : Iterable[T]
+        The items to map over. This may be a lazy or unbounded iterable.
+
+    max_workers : int
+        The maximum number of threads to run `func` on.
+
+    max_pending : int | None, optional
+        The maximum number of submitted items without a consumed result, by default twice `max_workers`.
+
+    thread_name_prefix : str, optional
+        The prefix for worker thread names, by default "".
+
+    executor : Executor | None, optional
+        An executor to share, instead of a pool of `max_workers` threads owned by this call, by default None.
+        A shared executor is not shut down, and `max_workers` only sizes `max_pending`.
+
+    Returns
+    -------
+    Iterator[R]
+        The results, in order of completion. If `func` raises, the exception is raised by the iterator and
+        the pending items are cancelled, so `func` should handle the errors of single items itself.
+
+    Examples
+    --------
+    >>> sorted(bounded_imap_unordered(lambda x: x * 2, range(5), max_workers=2))
+    [0, 2, 4, 6, 8]
+    """
+    if max_pending is None:
+        max_pending = 2 * max_workers
+
+    iterator = iter(items)
+    pending: set[Future[R]] = set()
+
+    with (
+        nullcontext(executor)
+        if executor is not None
+        else ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+    ) as pool:
+        try:
+            while True:
+                for item in islice(iterator, max_pending - len(pending)):
+                    pending.add(pool.submit(func, item))
+
+                if not pending:
+                    return
+
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        finally:
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,81 @@
+"""Lazy discovery of files in directory trees."""
+
+import os
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+from BAET._config.logging import create_logger
+
+logger = create_logger()
+
+
+def scan_files(
+    root: Path,
+    *,
+    recursive: bool = False,
+    follow_symlinks: bool = False,
+    include_file: Callable[[str], bool] | None = None,
+    include_dir: Callable[[str], bool] | None = None,
+) -> Iterator[os.DirEntry[str]]:
+    """Lazily find the files in a directory, optionally descending into subdirectories.
+
+    Directories are read with `os.scandir`, so file types are taken from the directory listing
+    rather than from a separate `stat` call per entry on most platforms. Filters are applied while
+    walking, and a subdirectory rejected by `include_dir` is never read.
+
+    Parameters
+    ----------
+    root : Path
+        The directory to search.
+
+    recursive : bool, optional
+        Whether to search subdirectories, by default False.
+
+    follow_symlinks : bool, optional
+        Whether to follow symbolic links to directories, by default False. Symbolic links to files are always followed.
+        Directories that were already visited are skipped, so symbolic link loops are not followed.
+
+    include_file : Callable[[str], bool] | None, optional
+        A predicate on file names selecting which files to yield, by default all files.
+
+    include_dir : Callable[[str], bool] | None, optional
+        A predicate on directory names selecting which subdirectories to search, by default all subdirectories.
+
+    Returns
+    -------
+    Iterator[os.DirEntry[str]]
+        The directory entries of the selected files, as they are found.
+    """
+    visited: set[tuple[int, int]] = set()
+    if follow_symlinks:
+        root_stat = root.stat()
+        visited.add((root_stat.st_dev, root_stat.st_ino))
+
+    pending = [os.fspath(root)]
+    while pending:
+        directory = pending.pop()
+
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=follow_symlinks):
+                            if not recursive or (include_dir is not None and not include_dir(entry.name)):
+                                continue
+
+                            if follow_symlinks:
+                                stat = entry.stat()
+                                key = (stat.st_dev, stat.st_ino)
+                                if key in visited:
+                                    logger.warning("Skipping already visited directory %r", entry.path)
+                                    continue
+                                visited.add(key)
+
+                            pending.append(entry.path)
+                        elif entry.is_file():
+                            if include_file is None or include_file(entry.name):
+                                yield entry
+                    except OSError as e:
+                        logger.warning("Skipping %r. %s: %s", entry.path, type(e).__name__, e)
+        except OSError as e:
+            logger.warning("Could not read directory %r. %s: %s", directory, type(e).__name__, e)
@@ -0,0 +1,53 @@
+"""Helpers for identifying files across runs."""
+
+import os
+from pathlib import Path
+from typing import NamedTuple
+
+
+class FileIdentity(NamedTuple):
+    """The identity of a file, which changes whenever the file is replaced or modified.
+
+    Attributes
+    ----------
+    path : str
+        The resolved path of the file.
+    size : int
+        The size of the file in bytes.
+    mtime_ns : int
+        The modification time of the file in nanoseconds.
+    inode : int
+        The inode number of the file (the file index on Windows).
+    """
+
+    path: str
+    size: int
+    mtime_ns: int
+    inode: int
+
+
+def file_identity(file: Path, stat: os.stat_result | None = None) -> FileIdentity:
+    """Get the identity of a file.
+
+    Parameters
+    ----------
+    file : Path
+        The file to identify.
+    stat : os.stat_result | None, optional
+        A stat result of the file that is already available, by default None.
+
+    Returns
+    -------
+    FileIdentity
+        The identity of the file.
+    """
+    resolved = file.resolve()
+    if stat is None:
+        stat = resolved.stat()
+
+    return FileIdentity(
+        path=resolved.as_posix(),
+        size=stat.st_size,
+        mtime_ns=stat.st_mtime_ns,
+        inode=stat.st_ino,
+    )
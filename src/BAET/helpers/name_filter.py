@@ -0,0 +1,106 @@
+"""Compiled matching of file names against include, exclude and extension filters."""
+
+import re
+from collections.abc import Iterable, Sequence
+from re import Pattern
+
+# Flags that can be scoped to a single pattern inside a combined pattern
+_SCOPABLE_FLAGS = {"i": re.IGNORECASE, "m": re.MULTILINE, "s": re.DOTALL, "x": re.VERBOSE}
+_UNSCOPABLE_FLAGS = re.ASCII | re.LOCALE
+# Backreferences refer to groups by position or name, which combining patterns would break
+_BACKREFERENCE = re.compile(r"\\[1-9]|\(\?P=")
+
+
+def _scoped(pattern: Pattern[str]) -> str:
+    enabled = "".join(letter for letter, flag in _SCOPABLE_FLAGS.items() if pattern.flags & flag)
+    disabled = "".join(letter for letter, flag in _SCOPABLE_FLAGS.items() if not pattern.flags & flag)
+    return f"(?{enabled}-{disabled}:{pattern.pattern})"
+
+
+def _combine(patterns: Sequence[Pattern[str]], template: str, joiner: str) -> Pattern[str] | None:
+    if len(patterns) == 1:
+        return patterns[0]
+
+    if any(p.flags & _UNSCOPABLE_FLAGS or _BACKREFERENCE.search(p.pattern) for p in patterns):
+        return None
+
+    try:
+        return re.compile(joiner.join(template.format(_scoped(p)) for p in patterns))
+    except re.error:
+        # e.g. the same group name is used by multiple patterns, or a pattern sets global inline flags
+        return None
+
+
+class NameFilter:
+    """A filter on file names, compiled so each name is matched once against all patterns.
+
+    A name is accepted if it matches every include pattern, matches no exclude pattern,
+    and ends with one of the included extensions. Patterns are matched from the start of the name,
+    as with `re.match`.
+
+    Include patterns are combined into a single pattern of lookaheads, and exclude patterns into a
+    single alternation, preserving the flags of each pattern. Extensions are looked up in a set.
+    Patterns that cannot be combined, such as those with backreferences, are matched individually.
+    """
+
+    def __init__(
+        self,
+        includes: Sequence[Pattern[str]] = (),
+        excludes: Sequence[Pattern[str]] = (),
+        extensions: Iterable[tuple[str, bool]] | None = None,
+    ) -> None:
+        """Compile a file name filter.
+
+        Parameters
+        ----------
+        includes : Sequence[Pattern[str]], optional
+            Patterns that a name must all match, by default ().
+        excludes : Sequence[Pattern[str]], optional
+            Patterns that a name must not match any of, by default ().
+        extensions : Iterable[tuple[str, bool]] | None, optional
+            Pairs of an extension, without the dot, and whether it is matched case sensitively,
+            by default None, which accepts any extension.
+        """
+        self._includes: list[Pattern[str]] = []
+        self._excludes: list[Pattern[str]] = []
+
+        if includes:
+            combined = _combine(includes, "(?={})", "")
+            self._includes = [combined] if combined is not None else list(includes)
+
+        if excludes:
+            combined = _combine(excludes, "(?:{})", "|")
+            self._excludes = [combined] if combined is not None else list(excludes)
+
+        self._extensions: frozenset[str] | None = None
+        self._lowered_extensions: frozenset[str] = frozenset()
+        if extensions is not None:
+            extensions = list(extensions)
+            self._extensions = frozenset(ext for ext, case_sensitive in extensions if case_sensitive)
+            self._lowered_extensions = frozenset(
+                ext.lower() for ext, case_sensitive in extensions if not case_sensitive
+            )
+
+    def __call__(self, name: str) -> bool:
+        """Check whether a file name is accepted by the filter.
+
+        Parameters
+        ----------
+        name : str
+            The file name.
+
+        Returns
+        -------
+        bool
+            True if the name is accepted, False otherwise.
+        """
+        if self._extensions is not None:
+            _, dot, extension = name.rpartition(".")
+            if not dot or (extension not in self._extensions and extension.lower() not in self._lowered_extensions):
+                return False
+
+        for include in self._includes:
+            if include.match(name) is None:
+                return False
+
+        return all(exclude.match(name) is None for exclude in self._excludes)
@@ -1,13 +1,17 @@
 """Typing definitions for BAET."""
 
-from collections.abc import Mapping
-from typing import Any
+from collections.abc import Callable, Mapping
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
 
 from bidict import BidirectionalMapping
 from rich.progress import TaskID
 
 from ffmpeg import Stream
 
+if TYPE_CHECKING:
+    from BAET.FFmpeg.progress import FFmpegProgress
+
 # Numbers
 type Millisecond = int | float
 
@@ -15,8 +19,10 @@ type Millisecond = int | float
 type StreamIndex = int
 type AudioStream = dict[str, Any]
 type FFmpegOutput = Stream
+type ProgressCallback = Callable[[FFmpegProgress], None]
+type EncoderOptions = Mapping[str, str | int]
 
 # Mappings
 type IndexedOutputs = Mapping[StreamIndex, FFmpegOutput]
-type IndexedAudioStream = Mapping[StreamIndex, AudioStream]
+type IndexedPaths = Mapping[StreamIndex, Path]
 type StreamTaskBiMap = BidirectionalMapping[StreamIndex, TaskID]
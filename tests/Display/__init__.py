@@ -0,0 +1 @@
+"""Progress display tests."""
@@ -0,0 +1,67 @@
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from rich.console import Console
+
+from BAET.Display.batch_progress import DEFAULT_MAX_RECENT, BatchProgress
+from BAET.FFmpeg.jobs import AudioExtractJob, StreamRecord
+
+
+def make_job(name: str) -> AudioExtractJob:
+    return AudioExtractJob(Path(f"{name}.mkv"), [StreamRecord(1, "aac", 1_000_000)], {})
+
+
+def render(batch: BatchProgress) -> str:
+    console = Console(file=StringIO(), width=200, record=True)
+    console.print(batch)
+    return console.export_text()
+
+
+class TestBatchProgress:
+    @pytest.fixture()
+    def batch(self) -> BatchProgress:
+        batch = BatchProgress()
+        progresses = [batch.add(make_job(f"file{i:02}")) for i in range(12)]
+
+        # Ten jobs finish, one of them failing, and one is left running
+        for i, progress in enumerate(progresses[:11]):
+            progress.job_started()
+            if i == 3:
+                progress.streams_failed([1], RuntimeError("FFmpeg failed"))
+            if i < 10:
+                progress.job_finished()
+
+        return batch
+
+    def test_only_recently_finished_jobs_are_displayed(self, batch: BatchProgress) -> None:
+        rendered = render(batch)
+
+        finished = [f"file{i:02}.mkv" for i in range(10)]
+        assert [name for name in finished if name in rendered] == finished[-DEFAULT_MAX_RECENT:]
+
+    def test_running_jobs_are_displayed_in_full(self, batch: BatchProgress) -> None:
+        rendered = render(batch)
+
+        assert rendered.count("Progress for") == 1
+        assert 'Progress for "file10.mkv"' in rendered
+        assert "file11.mkv" not in rendered
+
+    def test_batch_bar_counts_every_job(self, batch: BatchProgress) -> None:
+        rendered = render(batch)
+
+        assert "10/12" in rendered
+        assert "1 failed" in rendered
+
+    def test_rendered_rows_are_bounded(self) -> None:
+        batch = BatchProgress()
+        for i in range(100):
+            progress = batch.add(make_job(f"file{i:03}"))
+            progress.job_started()
+            progress.job_finished()
+
+        rows = [line for line in render(batch).splitlines() if line.strip()]
+
+        # The recently finished jobs, then the batch bar
+        assert len(rows) == DEFAULT_MAX_RECENT + 1
+        assert "100/100" in rows[-1]
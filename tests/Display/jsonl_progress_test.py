@@ -0,0 +1,75 @@
+import json
+from io import StringIO
+from pathlib import Path
+from typing import Any
+
+from BAET.Display.jsonl_progress import JsonlBatchReporter
+from BAET.FFmpeg.jobs import AudioExtractJob, StreamRecord
+from BAET.FFmpeg.progress import FFmpegProgress
+
+# The fields of each event, besides the `event`, `time` and `input` every event has
+EVENT_FIELDS: dict[str, set[str]] = {
+    "job_queued": {"streams"},
+    "job_started": set(),
+    "stream_progress": {"stream_index", "out_time_us", "speed", "total_size"},
+    "stream_completed": {"stream_index", "output"},
+    "stream_failed": {"stream_index", "output", "error"},
+    "job_finished": {"failed_streams"},
+}
+
+
+def parse_events(lines: str) -> list[dict[str, Any]]:
+    events = [json.loads(line) for line in lines.splitlines()]
+    for event in events:
+        assert set(event) == {"event", "time", "input"} | EVENT_FIELDS[event["event"]], event
+        assert isinstance(event["time"], float)
+    return events
+
+
+def make_job(tmp_path: Path) -> AudioExtractJob:
+    return AudioExtractJob(
+        tmp_path / "video.mkv",
+        [StreamRecord(1, "aac", 10_000_000), StreamRecord(2, "ac3", 4_000_000)],
+        {},
+        output_paths={1: tmp_path / "video_track1.wav", 2: tmp_path / "video_track2.wav"},
+    )
+
+
+class TestJsonlBatchReporter:
+    def test_every_event_is_one_json_line(self, tmp_path: Path) -> None:
+        stream = StringIO()
+        reporter = JsonlBatchReporter(stream).add(make_job(tmp_path))
+
+        reporter.job_started()
+        reporter.streams_started([1, 2])
+        reporter.streams_progressed([1, 2], FFmpegProgress(6_000_000, 1.5, 1_024, finished=False))
+        reporter.streams_completed([1])
+        reporter.streams_failed([2], RuntimeError("FFmpeg failed"))
+        reporter.job_finished()
+
+        events = parse_events(stream.getvalue())
+        assert [event["event"] for event in events] == [
+            "job_queued",
+            "job_started",
+            "stream_progress",
+            "stream_progress",
+            "stream_completed",
+            "stream_failed",
+            "job_finished",
+        ]
+        assert {event["input"] for event in events} == {str(tmp_path / "video.mkv")}
+        assert events[0]["streams"] == [1, 2]
+        assert events[4]["output"] == str(tmp_path / "video_track1.wav")
+        assert events[5]["error"] == "FFmpeg failed"
+        assert events[6]["failed_streams"] == 1
+
+    def test_progress_is_clamped_to_each_streams_duration(self, tmp_path: Path) -> None:
+        stream = StringIO()
+        reporter = JsonlBatchReporter(stream).add(make_job(tmp_path))
+
+        reporter.streams_progressed([1, 2], FFmpegProgress(6_000_000, None, None, finished=False))
+
+        progress = [event for event in parse_events(stream.getvalue()) if event["event"] == "stream_progress"]
+        assert [(event["stream_index"], event["out_time_us"]) for event in progress] == [(1, 6_000_000), (2, 4_000_000)]
+        assert progress[0]["speed"] is None
+        assert progress[0]["total_size"] is None
@@ -0,0 +1,61 @@
+from pathlib import Path
+
+import ffmpeg
+from BAET.FFmpeg.batching import BatchBudget, merge_job_outputs, pack_jobs
+from BAET.FFmpeg.jobs import AudioExtractJob, StreamRecord, with_progress_args
+from BAET.helpers.file_identity import FileIdentity
+
+
+def make_job(tmp_path: Path, name: str, seconds: int, size: int = 1_000) -> AudioExtractJob:
+    input_file = tmp_path / f"{name}.mkv"
+    output_path = tmp_path / f"{name}_track1.wav"
+    output = with_progress_args(ffmpeg.output(ffmpeg.input(str(input_file))["a:0"], str(output_path)))
+    return AudioExtractJob(
+        input_file,
+        [StreamRecord(1, "aac", seconds * 1_000_000)],
+        {1: output},
+        output_paths={1: output_path},
+        input_identity=FileIdentity(str(input_file), size, 0, 0),
+    )
+
+
+def names(batches: list[list[AudioExtractJob]]) -> list[list[str]]:
+    return [[job.input_file.stem for job in batch] for batch in batches]
+
+
+class TestPackJobs:
+    def test_without_budget_every_job_is_alone(self, tmp_path: Path) -> None:
+        jobs = [make_job(tmp_path, name, 1) for name in "abc"]
+
+        assert names(list(pack_jobs(jobs, None))) == [["a"], ["b"], ["c"]]
+
+    def test_jobs_are_packed_within_the_duration(self, tmp_path: Path) -> None:
+        jobs = [make_job(tmp_path, name, 4) for name in "abcde"]
+
+        assert names(list(pack_jobs(jobs, BatchBudget(max_seconds=10)))) == [["a", "b"], ["c", "d"], ["e"]]
+
+    def test_jobs_are_packed_within_the_size_and_input_count(self, tmp_path: Path) -> None:
+        jobs = [make_job(tmp_path, name, 1, size=400) for name in "abcde"]
+
+        assert names(list(pack_jobs(jobs, BatchBudget(max_bytes=1_000)))) == [["a", "b"], ["c", "d"], ["e"]]
+        assert names(list(pack_jobs(jobs, BatchBudget(max_inputs=3)))) == [["a", "b", "c"], ["d", "e"]]
+
+    def test_oversized_jobs_are_alone_without_ending_the_batch(self, tmp_path: Path) -> None:
+        jobs = [make_job(tmp_path, "a", 1), make_job(tmp_path, "long", 600), make_job(tmp_path, "b", 1)]
+
+        assert names(list(pack_jobs(jobs, BatchBudget()))) == [["long"], ["a", "b"]]
+
+
+class TestMergeJobOutputs:
+    def test_every_input_is_mapped_to_its_own_output(self, tmp_path: Path) -> None:
+        args = merge_job_outputs([make_job(tmp_path, "a", 1), make_job(tmp_path, "b", 1)]).get_args()
+
+        assert args.count("-i") == 2
+        assert args[args.index(str(tmp_path / "a_track1.wav")) - 1] == "0:a:0"
+        assert args[args.index(str(tmp_path / "b_track1.wav")) - 1] == "1:a:0"
+
+    def test_progress_is_reported_once(self, tmp_path: Path) -> None:
+        args = merge_job_outputs([make_job(tmp_path, "a", 1), make_job(tmp_path, "b", 1)]).get_args()
+
+        assert args.count("-progress") == 1
+        assert args.count("-y") == 1
@@ -0,0 +1,73 @@
+from pathlib import Path
+
+import pytest
+
+from BAET._config.ffmpeg_capabilities import FFmpegCapabilities
+from BAET.FFmpeg.codecs import AUTO_CODEC, CONTAINERS, COPY_CODEC, check_plan, container_for, select_codec
+
+
+def capabilities(encoders: set[str], muxers: set[str] | None = None) -> FFmpegCapabilities:
+    return FFmpegCapabilities(
+        version="test",
+        audio_encoders=frozenset(encoders),
+        experimental_encoders=frozenset(),
+        muxers=frozenset(muxers if muxers is not None else {container.muxer for container in CONTAINERS.values()}),
+        filters=frozenset(),
+    )
+
+
+class TestSelectCodec:
+    @pytest.mark.parametrize(
+        ("filename", "codec_name"),
+        [("a.wav", "pcm_s24le"), ("a.m4a", "aac"), ("a.ogg", "opus"), ("a.flac", "flac"), ("a.mka", "dts")],
+    )
+    def test_auto_copies_compatible_streams(self, filename: str, codec_name: str) -> None:
+        assert select_codec(AUTO_CODEC, codec_name, container_for(Path(filename))) == COPY_CODEC
+
+    @pytest.mark.parametrize(
+        ("filename", "codec_name"),
+        [("a.wav", "aac"), ("a.mp3", "opus"), ("a.opus", "vorbis"), ("a.flac", None)],
+    )
+    def test_auto_encodes_incompatible_streams(self, filename: str, codec_name: str | None) -> None:
+        container = container_for(Path(filename))
+
+        assert select_codec(AUTO_CODEC, codec_name, container) == container.encoder
+
+    def test_copy_rejects_incompatible_streams(self) -> None:
+        with pytest.raises(ValueError, match="Cannot copy"):
+            select_codec(COPY_CODEC, "aac", CONTAINERS["wav"])
+
+    def test_encoder_is_used_as_given(self) -> None:
+        assert select_codec("pcm_s24le", "pcm_s16le", CONTAINERS["wav"]) == "pcm_s24le"
+
+    def test_unknown_extension_is_rejected(self) -> None:
+        with pytest.raises(ValueError, match="Unsupported output file type"):
+            container_for(Path("a.aac"))
+
+
+class TestSelectEncoder:
+    def test_unknown_capabilities_use_default_encoder(self) -> None:
+        assert CONTAINERS["m4a"].select_encoder(None) == "aac"
+
+    def test_faster_encoder_is_preferred(self) -> None:
+        assert CONTAINERS["m4a"].select_encoder(capabilities({"aac", "libfdk_aac"})) == "libfdk_aac"
+
+    def test_fallback_encoder_is_used_without_default(self) -> None:
+        assert CONTAINERS["mp3"].select_encoder(capabilities({"libshine"})) == "libshine"
+
+    def test_missing_encoders_are_rejected(self) -> None:
+        with pytest.raises(ValueError, match="none of the encoders"):
+            select_codec(AUTO_CODEC, "aac", CONTAINERS["flac"], capabilities({"aac"}))
+
+
+class TestCheckPlan:
+    def test_possible_plan_is_accepted(self) -> None:
+        check_plan(AUTO_CODEC, CONTAINERS["wav"], capabilities({"pcm_s16le"}))
+
+    def test_missing_muxer_is_rejected(self) -> None:
+        with pytest.raises(ValueError, match="cannot write"):
+            check_plan(COPY_CODEC, CONTAINERS["ogg"], capabilities(set(), muxers={"wav"}))
+
+    def test_missing_encoder_is_rejected(self) -> None:
+        with pytest.raises(ValueError, match="does not have"):
+            check_plan("libfdk_aac", CONTAINERS["m4a"], capabilities({"aac"}))
@@ -0,0 +1,97 @@
+import asyncio
+import shutil
+import sys
+from asyncio.subprocess import Process
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+import ffmpeg
+from BAET.FFmpeg import engine
+from BAET.FFmpeg.engine import run_ffmpeg_async
+from BAET.FFmpeg.jobs import with_progress_args
+from BAET.FFmpeg.progress import FFmpegProgress
+from BAET.typing import FFmpegOutput
+
+requires_ffmpeg = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="FFmpeg is not installed")
+requires_posix = pytest.mark.skipif(sys.platform == "win32", reason="Signals are POSIX only")
+
+
+def sine_output(output_file: Path, seconds: int, *, realtime: bool = False) -> FFmpegOutput:
+    # Reading the input at its native rate keeps FFmpeg running for as long as the input lasts
+    options: dict[str, Any] = {"re": None} if realtime else {}
+    source = ffmpeg.input(f"sine=duration={seconds}", format="lavfi", **options)
+    return with_progress_args(source.output(str(output_file), format="wav"))
+
+
+def spawned_processes(monkeypatch: pytest.MonkeyPatch) -> list[Process]:
+    processes: list[Process] = []
+    create_subprocess_exec = asyncio.create_subprocess_exec
+
+    async def record(*args: Any, **kwargs: Any) -> Process:
+        proc = await create_subprocess_exec(*args, **kwargs)
+        processes.append(proc)
+        return proc
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", record)
+    return processes
+
+
+@requires_ffmpeg
+class TestRunFFmpegAsync:
+    def test_output_is_written_and_progress_reported(self, tmp_path: Path) -> None:
+        progress: list[FFmpegProgress] = []
+
+        usage = asyncio.run(run_ffmpeg_async(sine_output(tmp_path / "sine.wav", 1), progress.append))
+
+        assert (tmp_path / "sine.wav").stat().st_size > 0
+        assert progress[-1].finished
+        assert usage.wall_seconds > 0
+
+    def test_failure_raises_with_ffmpeg_error(self, tmp_path: Path) -> None:
+        output = with_progress_args(ffmpeg.input(str(tmp_path / "missing.mkv")).output(str(tmp_path / "out.wav")))
+
+        with pytest.raises(RuntimeError, match=r"missing\.mkv"):
+            asyncio.run(run_ffmpeg_async(output, lambda _: None))
+
+    def test_cancellation_terminates_ffmpeg(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        processes = spawned_processes(monkeypatch)
+
+        async def cancel_when_started() -> None:
+            started = asyncio.Event()
+            task = asyncio.create_task(
+                run_ffmpeg_async(sine_output(tmp_path / "long.wav", 600, realtime=True), lambda _: started.set())
+            )
+            await asyncio.wait_for(started.wait(), 30)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(cancel_when_started())
+
+        assert len(processes) == 1
+        assert processes[0].returncode is not None
+
+
+@requires_posix
+class TestTerminate:
+    def test_process_ignoring_sigterm_is_killed(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(engine, "TERMINATE_TIMEOUT_SECONDS", 0.1)
+
+        async def terminate_stubborn_process() -> int | None:
+            proc = await asyncio.create_subprocess_exec("sh", "-c", "trap '' TERM; sleep 30")
+            await asyncio.sleep(0.1)  # Let the shell install its trap
+            await engine._terminate(proc)
+            return proc.returncode
+
+        assert asyncio.run(terminate_stubborn_process()) == -9
+
+    def test_exited_process_is_left_alone(self) -> None:
+        async def terminate_exited_process() -> int | None:
+            proc = await asyncio.create_subprocess_exec("true")
+            await proc.wait()
+            await engine._terminate(proc)
+            return proc.returncode
+
+        assert asyncio.run(terminate_exited_process()) == 0
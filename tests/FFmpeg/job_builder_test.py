@@ -0,0 +1,113 @@
+import contextlib
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from BAET.FFmpeg import job_builder
+from BAET.FFmpeg.job_builder import build_job
+from BAET.FFmpeg.jobs import AudioExtractJob
+from BAET.FFmpeg.manifest import ExtractionManifest
+from BAET.FFmpeg.probe_cache import ProbeCache
+from BAET.typing import AudioStream
+
+STREAMS: list[AudioStream] = [
+    {"index": 1, "codec_name": "aac", "channels": 2, "duration_ts": 480_000, "time_base": "1/48000"},
+    {"index": 2, "codec_name": "ac3", "channels": 6, "duration_ts": 480_000, "time_base": "1/48000"},
+    {"index": 4, "codec_name": "flac", "channels": 2, "duration_ts": 480_000, "time_base": "1/48000"},
+]
+
+
+@pytest.fixture(autouse=True)
+def probed_streams(monkeypatch: pytest.MonkeyPatch) -> None:
+    @contextlib.contextmanager
+    def probe_audio_streams(file: Path, cache: ProbeCache | None = None) -> Iterator[list[AudioStream]]:
+        yield [dict(stream) for stream in STREAMS]
+
+    monkeypatch.setattr(job_builder, "probe_audio_streams", probe_audio_streams)
+
+
+def mapped_outputs(args: list[str]) -> dict[str, str]:
+    """Map each output file of FFmpeg arguments to the stream mapped into it."""
+    outputs: dict[str, str] = {}
+    options: dict[str, str] = {}
+    position = 0
+    while position < len(args):
+        if args[position] in {"-nostats", "-y"}:
+            position += 1
+        elif args[position].startswith("-"):
+            options[args[position]] = args[position + 1]
+            position += 2
+        else:
+            if "-map" in options:
+                outputs[args[position]] = options["-map"]
+            options = {}
+            position += 1
+
+    return outputs
+
+
+class TestSinglePass:
+    def test_one_process_maps_every_stream_to_its_output(self, tmp_path: Path) -> None:
+        job = build_job(tmp_path / "video.mkv", tmp_path / "video.wav", single_pass=True)
+
+        assert job.merged_output is not None
+        args = job.merged_output.get_args()
+        assert args.count("-i") == 1
+        assert args.count("-progress") == 1
+        assert mapped_outputs(args) == {
+            (tmp_path / f"video_track{index}.wav").resolve().as_posix(): f"0:a:{position}"
+            for position, index in enumerate((1, 2, 4))
+        }
+
+    def test_every_output_is_also_built_on_its_own(self, tmp_path: Path) -> None:
+        job = build_job(tmp_path / "video.mkv", tmp_path / "video.wav", single_pass=True)
+
+        assert list(job.stream_indexed_outputs) == [1, 2, 4]
+        assert mapped_outputs(job.stream_indexed_outputs[2].get_args()) == {
+            (tmp_path / "video_track2.wav").resolve().as_posix(): "0:a:1"
+        }
+
+    def test_per_stream_jobs_have_no_merged_output(self, tmp_path: Path) -> None:
+        job = build_job(tmp_path / "video.mkv", tmp_path / "video.wav", single_pass=False)
+
+        assert job.merged_output is None
+        assert len(job.stream_indexed_outputs) == 3
+
+
+def record_outputs(manifest: ExtractionManifest, job: AudioExtractJob) -> None:
+    assert job.input_identity is not None
+    for index, output_path in job.output_paths.items():
+        output_path.write_bytes(b"audio")
+        manifest.record(job.input_identity, output_path, job.stream(index).duration_ms, job.output_encodings[index])
+
+
+class TestResume:
+    @pytest.fixture()
+    def video(self, tmp_path: Path) -> Path:
+        file = tmp_path / "video.mkv"
+        file.write_bytes(b"video")
+        return file
+
+    def test_extracted_streams_are_skipped(self, video: Path, tmp_path: Path) -> None:
+        record_outputs(ExtractionManifest(), build_job(video, tmp_path / "video.flac", manifest=ExtractionManifest()))
+
+        job = build_job(video, tmp_path / "video.flac", manifest=ExtractionManifest())
+
+        assert job.stream_indexes == []
+        assert job.merged_output is None
+
+    @pytest.mark.parametrize(
+        "changes",
+        [{"preset": "small"}, {"codec": "pcm_s24le"}, {"overwrite": True}],
+    )
+    def test_streams_are_extracted_again_with_other_settings(
+        self, video: Path, tmp_path: Path, changes: dict[str, Any]
+    ) -> None:
+        first = build_job(video, tmp_path / "video.mka", codec="flac", manifest=ExtractionManifest())
+        record_outputs(ExtractionManifest(), first)
+
+        job = build_job(video, tmp_path / "video.mka", **({"codec": "flac"} | changes), manifest=ExtractionManifest())
+
+        assert job.stream_indexes == [1, 2, 4]
@@ -0,0 +1,37 @@
+from pathlib import Path
+
+import pytest
+
+from BAET.FFmpeg.jobs import AudioExtractJob, StreamRecord
+
+
+class TestStreamRecord:
+    def test_from_probe_keeps_only_needed_fields(self) -> None:
+        record = StreamRecord.from_probe(
+            {"index": 2, "codec_name": "ac3", "codec_type": "audio", "duration_ts": 96_000, "time_base": "1/48000"}
+        )
+
+        assert record == StreamRecord(2, "ac3", 2_000_000)
+        assert not hasattr(record, "__dict__")
+
+    def test_from_probe_reads_duration_tags(self) -> None:
+        record = StreamRecord.from_probe({"index": 1, "tags": {"DURATION": "00:01:30.500000000"}})
+
+        assert record == StreamRecord(1, None, 90_500_000)
+
+    def test_from_probe_without_duration_raises(self) -> None:
+        with pytest.raises(ValueError, match="Could not find duration"):
+            StreamRecord.from_probe({"index": 1})
+
+
+class TestAudioExtractJob:
+    def test_streams_are_looked_up_by_index(self) -> None:
+        streams = [StreamRecord(1, "aac", 1_000_000), StreamRecord(3, "flac", 3_000_000)]
+        job = AudioExtractJob(Path("a.mkv"), streams, {})
+
+        assert job.stream(3) is streams[1]
+        assert job.stream_indexes == [1, 3]
+        assert job.duration_ms == 3_000_000
+
+        with pytest.raises(IndexError):
+            job.stream(2)
@@ -0,0 +1,140 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from BAET.FFmpeg.manifest import MANIFEST_FILENAME, ExtractionManifest, OutputEncoding
+from BAET.helpers.file_identity import FileIdentity
+
+INPUT = FileIdentity("/videos/video.mkv", 1_000, 1, 1)
+PCM = OutputEncoding.create(1, "pcm_s16le", "wav", {"acodec": "pcm_s16le"})
+
+
+@pytest.fixture()
+def output(tmp_path: Path) -> Path:
+    file = tmp_path / "video_track1.wav"
+    file.write_bytes(b"audio")
+    return file
+
+
+def manifest_lines(directory: Path) -> list[str]:
+    return (directory / MANIFEST_FILENAME).read_text(encoding="utf-8").splitlines()
+
+
+class TestExtractionManifest:
+    def test_recorded_output_is_complete_in_the_next_run(self, output: Path) -> None:
+        ExtractionManifest().record(INPUT, output, 1_000_000, PCM)
+
+        assert ExtractionManifest().is_complete(INPUT, output, PCM)
+
+    def test_unrecorded_output_is_not_complete(self, output: Path) -> None:
+        assert not ExtractionManifest().is_complete(INPUT, output, PCM)
+
+    def test_changed_input_is_extracted_again(self, output: Path) -> None:
+        ExtractionManifest().record(INPUT, output, 1_000_000, PCM)
+
+        assert not ExtractionManifest().is_complete(INPUT._replace(mtime_ns=2), output, PCM)
+
+    def test_modified_or_missing_output_is_extracted_again(self, output: Path) -> None:
+        ExtractionManifest().record(INPUT, output, 1_000_000, PCM)
+
+        output.write_bytes(b"truncated")
+        assert not ExtractionManifest().is_complete(INPUT, output, PCM)
+
+        output.unlink()
+        assert not ExtractionManifest().is_complete(INPUT, output, PCM)
+
+    @pytest.mark.parametrize(
+        "encoding",
+        [
+            OutputEncoding.create(1, "pcm_s24le", "wav", {"acodec": "pcm_s24le"}),
+            OutputEncoding.create(1, "pcm_s16le", "wav", {"acodec": "pcm_s16le", "ar": 48_000}),
+            OutputEncoding.create(2, "pcm_s16le", "wav", {"acodec": "pcm_s16le"}),
+        ],
+    )
+    def test_output_encoded_differently_is_extracted_again(self, output: Path, encoding: OutputEncoding) -> None:
+        ExtractionManifest().record(INPUT, output, 1_000_000, PCM)
+
+        assert not ExtractionManifest().is_complete(INPUT, output, encoding)
+
+    def test_encoder_options_are_compared_regardless_of_order(self, output: Path) -> None:
+        options: dict[str, str | int] = {"acodec": "libmp3lame", "compression_level": 0, "q:a": 4}
+        ExtractionManifest().record(INPUT, output, 1_000_000, OutputEncoding.create(1, "libmp3lame", "mp3", options))
+
+        reordered = OutputEncoding.create(1, "libmp3lame", "mp3", dict(reversed(options.items())))
+        assert ExtractionManifest().is_complete(INPUT, output, reordered)
+
+    def test_recording_appends_a_line(self, tmp_path: Path) -> None:
+        manifest = ExtractionManifest()
+        for i in range(5):
+            output = tmp_path / f"video_track{i}.wav"
+            output.write_bytes(b"audio")
+            manifest.record(INPUT, output, 1_000_000, PCM)
+
+        assert len(manifest_lines(tmp_path)) == 5
+
+    def test_superseded_records_are_compacted(self, output: Path) -> None:
+        manifest = ExtractionManifest()
+        for _ in range(5):
+            manifest.record(INPUT, output, 1_000_000, PCM)
+
+        assert len(manifest_lines(output.parent)) == 5
+        assert ExtractionManifest().is_complete(INPUT, output, PCM)
+        assert len(manifest_lines(output.parent)) == 1
+
+    def test_least_recently_used_directories_are_read_again(self, tmp_path: Path) -> None:
+        outputs = [tmp_path / name / "video_track1.wav" for name in ("a", "b")]
+        for output in outputs:
+            output.parent.mkdir()
+            output.write_bytes(b"audio")
+
+        manifest = ExtractionManifest(max_directories=1)
+        for output in outputs:
+            manifest.record(INPUT, output, 1_000_000, PCM)
+            (output.parent / MANIFEST_FILENAME).unlink()
+
+        # Only the records of the most recent directory are still in memory
+        assert manifest.is_complete(INPUT, outputs[1], PCM)
+        assert not manifest.is_complete(INPUT, outputs[0], PCM)
+
+
+class TestCorruptManifest:
+    def test_truncated_line_only_invalidates_its_own_output(self, output: Path, tmp_path: Path) -> None:
+        other = tmp_path / "video_track2.wav"
+        other.write_bytes(b"audio")
+        ExtractionManifest().record(INPUT, output, 1_000_000, PCM)
+        ExtractionManifest().record(INPUT, other, 1_000_000, PCM)
+
+        manifest_file = tmp_path / MANIFEST_FILENAME
+        manifest_file.write_text(manifest_file.read_text(encoding="utf-8")[:-20], encoding="utf-8")
+
+        manifest = ExtractionManifest()
+        assert manifest.is_complete(INPUT, output, PCM)
+        assert not manifest.is_complete(INPUT, other, PCM)
+
+    @pytest.mark.parametrize(
+        "changes",
+        [
+            {"input": {"path": "/videos/video.mkv"}},
+            {"input": None},
+            {"size": "5"},
+            {"encoding": ["pcm_s16le"]},
+        ],
+    )
+    def test_malformed_record_is_not_complete(self, output: Path, changes: dict[str, object]) -> None:
+        ExtractionManifest().record(INPUT, output, 1_000_000, PCM)
+        manifest_file = output.parent / MANIFEST_FILENAME
+        (line,) = manifest_lines(output.parent)
+        manifest_file.write_text(json.dumps(json.loads(line) | changes) + "\n", encoding="utf-8")
+
+        assert not ExtractionManifest().is_complete(INPUT, output, PCM)
+
+    @pytest.mark.parametrize("content", ["[1, 2, 3]\n", '{"version": 1, "entries": {}}\n', "\x00\x01"])
+    def test_unreadable_manifest_is_ignored(self, output: Path, content: str) -> None:
+        (output.parent / MANIFEST_FILENAME).write_text(content, encoding="utf-8")
+        manifest = ExtractionManifest()
+
+        assert not manifest.is_complete(INPUT, output, PCM)
+
+        manifest.record(INPUT, output, 1_000_000, PCM)
+        assert ExtractionManifest().is_complete(INPUT, output, PCM)
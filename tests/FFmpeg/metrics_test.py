@@ -0,0 +1,116 @@
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from BAET.FFmpeg.jobs import AudioExtractJob, StreamRecord
+from BAET.FFmpeg.metrics import ExtractionMetrics, ProcessUsage
+
+
+def make_job(tmp_path: Path) -> AudioExtractJob:
+    streams = [StreamRecord(1, "aac", 10_000_000), StreamRecord(2, "aac", 20_000_000)]
+    output_paths = {1: tmp_path / "a_track1.wav", 2: tmp_path / "a_track2.wav"}
+    output_paths[1].write_bytes(b"x" * 100)
+    output_paths[2].write_bytes(b"x" * 300)
+    return AudioExtractJob(tmp_path / "a.mkv", streams, {}, output_paths=output_paths)
+
+
+class TestExtractionMetrics:
+    def test_phases_accumulate(self) -> None:
+        metrics = ExtractionMetrics()
+        metrics.add_time("probe", 1.5)
+        metrics.add_time("probe", 0.5)
+
+        assert metrics.report()["phases"] == {"probe": {"seconds": 2.0, "count": 2}}
+
+    def test_timed_iter_yields_every_item(self) -> None:
+        metrics = ExtractionMetrics()
+
+        assert list(metrics.timed_iter("scan", range(3))) == [0, 1, 2]
+        # One timing per item, and one for the end of the iterable
+        assert metrics.report()["phases"]["scan"]["count"] == 4
+
+    def test_nested_phases_are_not_counted_twice(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        now = [0.0]
+        monkeypatch.setattr(time, "perf_counter", lambda: now[0])
+        metrics = ExtractionMetrics()
+
+        with metrics.phase("build_job"):
+            now[0] += 1
+            with metrics.phase("probe"):
+                now[0] += 5
+            now[0] += 1
+
+        assert metrics.report()["phases"] == {
+            "build_job": {"seconds": 2.0, "count": 1},
+            "probe": {"seconds": 5.0, "count": 1},
+        }
+
+    def test_phases_timed_while_iterating_are_not_counted_in_the_iteration(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        now = [0.0]
+        monkeypatch.setattr(time, "perf_counter", lambda: now[0])
+        metrics = ExtractionMetrics()
+
+        def include(item: int) -> bool:
+            now[0] += 2
+            return True
+
+        def scan() -> Iterator[int]:
+            for item in range(3):
+                now[0] += 1
+                if metrics.timed("filter", include)(item):
+                    yield item
+
+        assert list(metrics.timed_iter("scan", scan())) == [0, 1, 2]
+        phases = metrics.report()["phases"]
+        assert phases["scan"]["seconds"] == 3.0
+        assert phases["filter"]["seconds"] == 6.0
+
+    def test_single_pass_process_is_summarised_per_file_and_stream(self, tmp_path: Path) -> None:
+        metrics = ExtractionMetrics()
+        metrics.record_process(
+            make_job(tmp_path),
+            [1, 2],
+            ProcessUsage(wall_seconds=2.0, user_seconds=3.0, system_seconds=0.5, max_rss_bytes=1024),
+            succeeded=True,
+        )
+
+        report = metrics.report()
+        (file_record,) = report["files"]
+
+        assert report["ffmpeg"]["processes"] == 1
+        assert report["ffmpeg"]["bytes_written"] == 400
+        assert file_record["duration_seconds"] == 20.0
+        assert file_record["realtime_factor"] == 10.0
+        assert [stream["realtime_factor"] for stream in file_record["streams"]] == [5.0, 10.0]
+
+    def test_unknown_usage_is_not_summed(self, tmp_path: Path) -> None:
+        metrics = ExtractionMetrics()
+        metrics.record_process(make_job(tmp_path), [1], ProcessUsage(wall_seconds=1.0), succeeded=False)
+
+        report = metrics.report()
+
+        assert report["ffmpeg"]["user_seconds"] is None
+        assert report["ffmpeg"]["max_rss_bytes"] is None
+        assert report["files"][0]["streams"][0]["bytes_written"] is None
+
+    def test_batched_processes_are_counted_once(self, tmp_path: Path) -> None:
+        metrics = ExtractionMetrics()
+        for name in ("a", "b"):
+            job = AudioExtractJob(tmp_path / f"{name}.mkv", make_job(tmp_path).audio_streams, {})
+            metrics.record_process(job, [1, 2], ProcessUsage(wall_seconds=1.0), succeeded=True, batch_size=2)
+
+        report = metrics.report()
+
+        assert report["ffmpeg"]["processes"] == 1
+        assert len(report["files"]) == 2
+
+
+class TestProcessUsage:
+    def test_share_splits_time_but_not_memory(self) -> None:
+        usage = ProcessUsage(wall_seconds=4.0, user_seconds=2.0, system_seconds=None, max_rss_bytes=1024)
+
+        assert usage.share(0.25) == ProcessUsage(wall_seconds=1.0, user_seconds=0.5, max_rss_bytes=1024)
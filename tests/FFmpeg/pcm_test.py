@@ -0,0 +1,59 @@
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from BAET.FFmpeg.pcm import PCMFormat, PCMStream
+
+np = pytest.importorskip("numpy")
+
+requires_ffmpeg = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="FFmpeg is not installed")
+
+
+@pytest.fixture(scope="module")
+def stereo_file(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    file = tmp_path_factory.mktemp("pcm") / "stereo.mkv"
+    source = "sine=frequency=440:sample_rate=48000:duration=1"
+    args = ["ffmpeg", "-v", "error", "-f", "lavfi", "-i", source, "-ac", "2", "-c:a", "flac", str(file)]
+    subprocess.run(args, check=True)  # noqa: S603
+    return file
+
+
+class TestPCMFormat:
+    def test_unsupported_dtype_raises(self) -> None:
+        with pytest.raises(ValueError, match="Unsupported PCM dtype"):
+            PCMFormat("complex64")
+
+    def test_raw_format_matches_dtype(self) -> None:
+        assert PCMFormat("int16").raw_format == "s16le"
+
+    @pytest.mark.parametrize("dtype", ["int16", "int32", "float32", "float64"])
+    def test_samples_are_little_endian_on_any_host(self, dtype: str) -> None:
+        assert np.dtype(PCMFormat(dtype).numpy_dtype) == np.dtype(dtype).newbyteorder("<")
+
+
+@requires_ffmpeg
+class TestPCMStream:
+    def test_chunks_reuse_one_buffer(self, stereo_file: Path) -> None:
+        stream = PCMStream(stereo_file, 0, chunk_frames=10_000)
+        chunks = [(chunk.shape, chunk.dtype, chunk.__array_interface__["data"][0]) for chunk in stream]
+
+        assert stream.sample_rate == 48_000
+        assert stream.channels == 2
+        assert [shape for shape, _, _ in chunks] == [(10_000, 2)] * 4 + [(8_000, 2)]
+        assert {dtype for _, dtype, _ in chunks} == {np.dtype("float32")}
+        assert len({address for _, _, address in chunks}) == 1
+
+    def test_audio_is_resampled_and_mixed(self, stereo_file: Path) -> None:
+        stream = PCMStream(stereo_file, 0, PCMFormat("int16", sample_rate=16_000, channels=1))
+
+        (chunk,) = list(stream)
+
+        assert chunk.shape == (16_000, 1)
+        assert chunk.dtype == np.dtype("int16")
+        assert np.abs(chunk).max() > 0
+
+    def test_missing_stream_raises(self, stereo_file: Path) -> None:
+        with pytest.raises(ValueError, match="no audio stream with index 3"):
+            PCMStream(stereo_file, 3)
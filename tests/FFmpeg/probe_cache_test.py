@@ -0,0 +1,126 @@
+import os
+import subprocess
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from BAET.FFmpeg import probe_cache
+from BAET.FFmpeg.probe_cache import ProbeCache, open_probe_cache
+
+RESULT = [{"index": 1, "codec_name": "aac"}]
+
+
+@pytest.fixture()
+def cache_path(tmp_path: Path) -> Path:
+    return tmp_path / "cache" / "probes.sqlite3"
+
+
+@pytest.fixture()
+def video(tmp_path: Path) -> Path:
+    file = tmp_path / "video.mkv"
+    file.write_bytes(b"video")
+    return file
+
+
+@pytest.fixture()
+def cache(cache_path: Path) -> Iterator[ProbeCache]:
+    opened = ProbeCache(cache_path, ffprobe_version="6.0")
+    yield opened
+    opened.close()
+
+
+class TestProbeCache:
+    def test_cached_result_is_reused(self, cache: ProbeCache, video: Path) -> None:
+        cache.put(video, "streams", RESULT)
+
+        assert cache.get(video, "streams") == RESULT
+        assert cache.get(video, "format") is None
+
+    def test_results_persist_between_runs(self, cache_path: Path, video: Path) -> None:
+        first = ProbeCache(cache_path, ffprobe_version="6.0")
+        first.put(video, "streams", RESULT)
+        first.close()
+
+        second = ProbeCache(cache_path, ffprobe_version="6.0")
+        try:
+            assert second.get(video, "streams") == RESULT
+        finally:
+            second.close()
+
+    def test_modified_file_is_not_reused(self, cache: ProbeCache, video: Path) -> None:
+        cache.put(video, "streams", RESULT)
+        stat = video.stat()
+        os.utime(video, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        assert cache.get(video, "streams") is None
+
+    def test_resized_file_is_not_reused(self, cache: ProbeCache, video: Path) -> None:
+        cache.put(video, "streams", RESULT)
+        stat = video.stat()
+        video.write_bytes(b"a longer video")
+        os.utime(video, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        assert cache.get(video, "streams") is None
+
+    def test_results_of_another_ffprobe_version_are_not_reused(self, cache_path: Path, video: Path) -> None:
+        first = ProbeCache(cache_path, ffprobe_version="6.0")
+        first.put(video, "streams", RESULT)
+        first.close()
+
+        upgraded = ProbeCache(cache_path, ffprobe_version="7.0")
+        try:
+            assert upgraded.get(video, "streams") is None
+        finally:
+            upgraded.close()
+
+    def test_least_recently_used_entries_are_evicted(
+        self, cache_path: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        now = [1_000_000.0]
+        monkeypatch.setattr(time, "time", lambda: now[0])
+        files = {name: tmp_path / f"{name}.mkv" for name in "abc"}
+        for file in files.values():
+            file.write_bytes(b"video")
+
+        cache = ProbeCache(cache_path, max_entries=2, ffprobe_version="6.0")
+        for file in files.values():
+            now[0] += 1
+            cache.put(file, "streams", RESULT)
+
+        # Using the oldest entry long after it was cached makes it the most recently used
+        now[0] += 24 * 60 * 60
+        assert cache.get(files["a"], "streams") == RESULT
+        cache.close()
+
+        reopened = ProbeCache(cache_path, ffprobe_version="6.0")
+        try:
+            assert {name for name, file in files.items() if reopened.get(file, "streams") is not None} == {"a", "c"}
+        finally:
+            reopened.close()
+
+
+class TestOpenProbeCache:
+    def test_corrupt_cache_is_not_used(self, cache_path: Path) -> None:
+        cache_path.parent.mkdir(parents=True)
+        cache_path.write_bytes(b"not a database" * 100)
+
+        assert open_probe_cache(cache_path) is None
+
+    def test_broken_ffprobe_is_not_fatal(self, cache_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        def get_ffprobe_version() -> str:
+            raise subprocess.CalledProcessError(1, ["ffprobe", "-version"])
+
+        monkeypatch.setattr(probe_cache, "get_ffprobe_version", get_ffprobe_version)
+
+        assert open_probe_cache(cache_path) is None
+
+    @pytest.mark.parametrize("version", [None, ""])
+    def test_unknown_ffprobe_version_is_not_cached(
+        self, cache_path: Path, monkeypatch: pytest.MonkeyPatch, version: str | None
+    ) -> None:
+        monkeypatch.setattr(probe_cache, "get_ffprobe_version", lambda: version)
+
+        assert open_probe_cache(cache_path) is None
+        assert not cache_path.exists()
@@ -0,0 +1,51 @@
+from pathlib import Path
+
+import pytest
+
+from BAET.FFmpeg import probe
+from BAET.FFmpeg.probe import probe_audio_streams
+from BAET.typing import AudioStream
+
+LEAN_STREAMS = [
+    {"index": 2, "codec_name": "aac", "codec_type": "audio", "duration_ts": 480_000, "time_base": "1/48000"},
+    {"index": 1, "codec_name": "ac3", "codec_type": "audio", "tags": {"DURATION": "00:00:10.000000000"}},
+]
+
+FULL_STREAMS = [
+    {"index": 0, "codec_type": "video"},
+    {"index": 1, "codec_name": "ac3", "codec_type": "audio", "tags": {"DURATION-eng": "00:00:10.000000000"}},
+]
+
+
+def use_probes(monkeypatch: pytest.MonkeyPatch, lean: list[AudioStream], full: list[AudioStream]) -> list[str]:
+    calls: list[str] = []
+
+    def probe_lean(file: Path) -> list[AudioStream]:
+        calls.append("lean")
+        return [dict(stream) for stream in lean]
+
+    def ffmpeg_probe(file: Path) -> dict[str, list[AudioStream]]:
+        calls.append("full")
+        return {"streams": [dict(stream) for stream in full]}
+
+    monkeypatch.setattr(probe, "_probe_lean", probe_lean)
+    monkeypatch.setattr(probe.ffmpeg, "probe", ffmpeg_probe)
+    return calls
+
+
+class TestProbeAudioStreams:
+    def test_lean_probe_is_used_when_durations_are_known(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        calls = use_probes(monkeypatch, LEAN_STREAMS, FULL_STREAMS)
+
+        with probe_audio_streams(Path("a.mkv")) as streams:
+            assert [stream["index"] for stream in streams] == [1, 2]
+
+        assert calls == ["lean"]
+
+    def test_full_probe_is_used_when_durations_are_missing(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        calls = use_probes(monkeypatch, [{"index": 1, "codec_type": "audio", "tags": {}}], FULL_STREAMS)
+
+        with probe_audio_streams(Path("a.mkv")) as streams:
+            assert streams == FULL_STREAMS[1:]
+
+        assert calls == ["lean", "full"]
@@ -0,0 +1,24 @@
+import pytest
+
+from BAET.constants import ENCODER_PRESETS
+from BAET.FFmpeg.codecs import CONTAINERS
+from BAET.FFmpeg.profiles import ENCODER_PROFILES, encoder_options
+
+
+class TestEncoderOptions:
+    @pytest.mark.parametrize("preset", ENCODER_PRESETS)
+    def test_every_profile_has_every_preset(self, preset: str) -> None:
+        for encoder, profile in ENCODER_PROFILES.items():
+            assert preset in profile, encoder
+
+    def test_container_encoders_have_profiles(self) -> None:
+        for container in CONTAINERS.values():
+            assert container.encoder.startswith("pcm_") or container.encoder in ENCODER_PROFILES
+
+    def test_encoders_without_profiles_use_defaults(self) -> None:
+        assert encoder_options("pcm_s16le", "small") == {}
+
+    def test_flac_presets_trade_speed_for_size(self) -> None:
+        levels = [encoder_options("flac", preset)["compression_level"] for preset in ("fast", "balanced", "small")]
+
+        assert levels == sorted(levels)
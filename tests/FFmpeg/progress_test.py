@@ -0,0 +1,73 @@
+from logging import getLogger
+
+import faker
+import pytest
+from faker import Faker
+
+from BAET.FFmpeg.progress import FFmpegProgress, ProgressParser, throttled
+
+fake: Faker = faker.Faker()
+
+logger = getLogger("testing")
+
+PROGRESS_OUTPUT = (
+    b"bitrate=1411.2kbits/s\n"
+    b"total_size=1048576\n"
+    b"out_time_us=5000000\n"
+    b"out_time_ms=5000000\n"
+    b"out_time=00:00:05.000000\n"
+    b"speed=12.5x\n"
+    b"progress=continue\n"
+    b"total_size=N/A\n"
+    b"out_time_us=N/A\n"
+    b"out_time_ms=N/A\n"
+    b"speed=N/A\n"
+    b"progress=continue\n"
+    b"total_size=2097152\n"
+    b"out_time_ms=10000000\n"
+    b"speed=13x\n"
+    b"progress=end\n"
+)
+
+EXPECTED = [
+    FFmpegProgress(out_time_us=5_000_000, speed=12.5, total_size=1_048_576, finished=False),
+    FFmpegProgress(out_time_us=None, speed=None, total_size=None, finished=False),
+    FFmpegProgress(out_time_us=10_000_000, speed=13.0, total_size=2_097_152, finished=True),
+]
+
+
+class TestProgressParser:
+    @pytest.mark.repeat(100)
+    def test_parses_blocks_split_across_chunks(self) -> None:
+        reports: list[FFmpegProgress] = []
+        parser = ProgressParser(reports.append)
+
+        splits = sorted(fake.random_elements(range(len(PROGRESS_OUTPUT)), length=5, unique=True))
+        logger.info("Splits: %r", splits)
+
+        for start, end in zip([0, *splits], [*splits, len(PROGRESS_OUTPUT)], strict=True):
+            parser.feed(PROGRESS_OUTPUT[start:end])
+
+        assert reports == EXPECTED
+
+
+class TestThrottled:
+    def test_coalesces_reports_within_interval(self) -> None:
+        now = 0.0
+        forwarded: list[FFmpegProgress] = []
+        update = throttled(forwarded.append, 1.0, clock=lambda: now)
+
+        for time, report in zip([0.0, 0.5, 1.0], EXPECTED, strict=True):
+            now = time
+            update(report)
+
+        assert forwarded == [EXPECTED[0], EXPECTED[2]]
+
+    def test_always_forwards_final_report(self) -> None:
+        forwarded: list[FFmpegProgress] = []
+        update = throttled(forwarded.append, 60.0, clock=lambda: 0.0)
+
+        update(EXPECTED[0])
+        update(EXPECTED[2])
+
+        assert forwarded == [EXPECTED[0], EXPECTED[2]]
@@ -0,0 +1,285 @@
+import asyncio
+import threading
+import time
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+import ffmpeg
+from BAET.Display.reporting import NullJobReporter
+from BAET.FFmpeg import runner
+from BAET.FFmpeg.jobs import AudioExtractJob, StreamRecord, with_progress_args
+from BAET.FFmpeg.metrics import ProcessUsage
+from BAET.FFmpeg.progress import FFmpegProgress
+from BAET.FFmpeg.segmenting import Segment, SegmentedStream, SegmentPlan
+from BAET.typing import FFmpegOutput, ProgressCallback, StreamIndex
+
+
+class RecordingJobReporter(NullJobReporter):
+    def __init__(self) -> None:
+        self.events: list[str] = []
+
+    def job_started(self) -> None:
+        self.events.append("started")
+
+    def streams_completed(self, streams: Sequence[StreamIndex]) -> None:
+        self.events.append("completed")
+
+    def streams_failed(self, streams: Sequence[StreamIndex], error: Exception) -> None:
+        self.events.append("failed")
+
+    def job_finished(self) -> None:
+        self.events.append("finished")
+
+
+def make_job(tmp_path: Path, name: str) -> AudioExtractJob:
+    output = ffmpeg.output(ffmpeg.input(str(tmp_path / f"{name}.mkv"))["a:0"], str(tmp_path / f"{name}.wav"))
+    return AudioExtractJob(
+        tmp_path / f"{name}.mkv",
+        [StreamRecord(1, "aac", 1_000_000)],
+        {1: with_progress_args(output)},
+    )
+
+
+class TestRunBatch:
+    def test_batch_runs_in_one_process(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        calls: list[FFmpegOutput] = []
+
+        def run_ffmpeg(output: FFmpegOutput, on_progress: ProgressCallback | None = None) -> ProcessUsage:
+            calls.append(output)
+            return ProcessUsage(wall_seconds=1.0)
+
+        monkeypatch.setattr(runner, "run_ffmpeg", run_ffmpeg)
+        reporters = [RecordingJobReporter(), RecordingJobReporter()]
+        completed: list[str] = []
+
+        runner.run_batch(
+            [make_job(tmp_path, "a"), make_job(tmp_path, "b")],
+            reporters,
+            lambda job, stream_index: completed.append(job.input_file.stem),
+        )
+
+        assert len(calls) == 1
+        assert completed == ["a", "b"]
+        assert [reporter.events for reporter in reporters] == [["started", "completed", "finished"]] * 2
+
+    def test_failed_batch_is_attributed_to_the_failing_job(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        def run_ffmpeg(output: FFmpegOutput, on_progress: ProgressCallback | None = None) -> ProcessUsage:
+            if str(tmp_path / "b.mkv") in output.get_args():
+                raise RuntimeError("FFmpeg failed")
+            return ProcessUsage(wall_seconds=1.0)
+
+        monkeypatch.setattr(runner, "run_ffmpeg", run_ffmpeg)
+        reporters = [RecordingJobReporter(), RecordingJobReporter()]
+
+        runner.run_batch([make_job(tmp_path, "a"), make_job(tmp_path, "b")], reporters)
+
+        assert [reporter.events for reporter in reporters] == [
+            ["started", "completed", "finished"],
+            ["started", "failed", "finished"],
+        ]
+
+    def test_batch_that_cannot_start_is_run_job_by_job(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        calls: list[FFmpegOutput] = []
+
+        def run_ffmpeg(output: FFmpegOutput, on_progress: ProgressCallback | None = None) -> ProcessUsage:
+            calls.append(output)
+            if len(calls) == 1:
+                raise OSError(24, "Too many open files")
+            return ProcessUsage(wall_seconds=1.0)
+
+        monkeypatch.setattr(runner, "run_ffmpeg", run_ffmpeg)
+        reporters = [RecordingJobReporter(), RecordingJobReporter()]
+
+        runner.run_batch([make_job(tmp_path, "a"), make_job(tmp_path, "b")], reporters)
+
+        assert len(calls) == 3
+        assert [reporter.events for reporter in reporters] == [["started", "completed", "finished"]] * 2
+
+
+class TestRunJob:
+    @pytest.fixture()
+    def missing_ffmpeg(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        def run_ffmpeg(output: FFmpegOutput, on_progress: ProgressCallback | None = None) -> ProcessUsage:
+            raise FileNotFoundError(2, "No such file or directory", "ffmpeg")
+
+        async def run_ffmpeg_async(output: FFmpegOutput, on_progress: ProgressCallback | None = None) -> ProcessUsage:
+            return run_ffmpeg(output, on_progress)
+
+        monkeypatch.setattr(runner, "run_ffmpeg", run_ffmpeg)
+        monkeypatch.setattr(runner, "run_ffmpeg_async", run_ffmpeg_async)
+
+    @pytest.mark.usefixtures("missing_ffmpeg")
+    def test_ffmpeg_failing_to_start_fails_the_streams(self, tmp_path: Path) -> None:
+        reporter = RecordingJobReporter()
+
+        runner.run_job(make_job(tmp_path, "a"), reporter)
+
+        assert reporter.events == ["started", "failed", "finished"]
+
+    @pytest.mark.usefixtures("missing_ffmpeg")
+    def test_ffmpeg_failing_to_start_fails_the_streams_of_async_jobs(self, tmp_path: Path) -> None:
+        reporters = [RecordingJobReporter(), RecordingJobReporter()]
+
+        asyncio.run(runner.run_batch_async([make_job(tmp_path, "a"), make_job(tmp_path, "b")], reporters))
+
+        assert [reporter.events for reporter in reporters] == [["started", "failed", "finished"]] * 2
+
+
+class ProgressRecordingJobReporter(RecordingJobReporter):
+    progress_interval = 0.0
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.progress: list[FFmpegProgress] = []
+
+    def streams_progressed(self, streams: Sequence[StreamIndex], progress: FFmpegProgress) -> None:
+        self.progress.append(progress)
+
+
+def make_segmented_job(tmp_path: Path) -> AudioExtractJob:
+    stream = SegmentedStream(1, "a:0", tmp_path / "long_track1.wav", "wav", {"acodec": "pcm_s16le"})
+    plan = SegmentPlan((Segment(0, 60), Segment(60, 120), Segment(120, None)), (stream,))
+    return AudioExtractJob(
+        tmp_path / "long.mkv",
+        [StreamRecord(1, "pcm_s16le", 180_000_000)],
+        {},
+        output_paths={1: stream.output_path},
+        segment_plan=plan,
+    )
+
+
+class TestRunSegments:
+    def test_progress_of_segments_is_summed(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        calls: list[FFmpegOutput] = []
+
+        def run_ffmpeg(output: FFmpegOutput, on_progress: ProgressCallback) -> ProcessUsage:
+            calls.append(output)
+            on_progress(FFmpegProgress(60_000_000, 2.0, 1_000, finished=True))
+            return ProcessUsage(wall_seconds=1.0, user_seconds=1.0)
+
+        monkeypatch.setattr(runner, "run_ffmpeg", run_ffmpeg)
+        reporter = ProgressRecordingJobReporter()
+        completed: list[StreamIndex] = []
+
+        runner.run_job(make_segmented_job(tmp_path), reporter, lambda job, stream_index: completed.append(stream_index))
+
+        # Three segments, then the join
+        assert len(calls) == 4
+        assert reporter.events == ["started", "completed", "finished"]
+        assert completed == [1]
+        segment_progress = reporter.progress[:3]
+        assert [progress.out_time_us for progress in segment_progress] == [60_000_000, 120_000_000, 180_000_000]
+        assert segment_progress[-1].speed == 6.0
+        assert segment_progress[-1].finished
+
+    def test_failed_segment_fails_the_streams_and_removes_pieces(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        job = make_segmented_job(tmp_path)
+        assert job.segment_plan is not None
+        stream = job.segment_plan.streams[0]
+
+        def run_ffmpeg(output: FFmpegOutput, on_progress: ProgressCallback) -> ProcessUsage:
+            args = output.get_args()
+            piece = next(Path(arg) for arg in args if arg.endswith(".mka"))
+            piece.write_bytes(b"piece")
+            if piece == stream.piece_path(1).resolve():
+                raise RuntimeError("FFmpeg failed")
+            return ProcessUsage(wall_seconds=1.0)
+
+        monkeypatch.setattr(runner, "run_ffmpeg", run_ffmpeg)
+        reporter = RecordingJobReporter()
+
+        runner.run_job(job, reporter)
+
+        assert reporter.events == ["started", "failed", "finished"]
+        assert list(tmp_path.iterdir()) == []
+
+
+class ProcessCounter:
+    """A stand-in for running FFmpeg that records how many processes run at once."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.running = 0
+        self.most_running = 0
+        self._lock = threading.Lock()
+
+    def _started(self) -> None:
+        with self._lock:
+            self.calls += 1
+            self.running += 1
+            self.most_running = max(self.most_running, self.running)
+
+    def _finished(self) -> None:
+        with self._lock:
+            self.running -= 1
+
+    def run_ffmpeg(self, output: FFmpegOutput, on_progress: ProgressCallback) -> ProcessUsage:
+        self._started()
+        time.sleep(0.02)
+        self._finished()
+        return ProcessUsage(wall_seconds=0.02)
+
+    async def run_ffmpeg_async(self, output: FFmpegOutput, on_progress: ProgressCallback) -> ProcessUsage:
+        self._started()
+        await asyncio.sleep(0.02)
+        self._finished()
+        return ProcessUsage(wall_seconds=0.02)
+
+
+class TestProcessSlots:
+    @pytest.fixture()
+    def segmented_jobs(self, tmp_path: Path) -> list[AudioExtractJob]:
+        for name in "ab":
+            (tmp_path / name).mkdir()
+        return [make_segmented_job(tmp_path / name) for name in "ab"]
+
+    def test_segments_of_concurrent_jobs_share_the_slots(
+        self, segmented_jobs: list[AudioExtractJob], monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        counter = ProcessCounter()
+        monkeypatch.setattr(runner, "run_ffmpeg", counter.run_ffmpeg)
+        process_slots = threading.Semaphore(2)
+        reporters = [RecordingJobReporter() for _ in segmented_jobs]
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            for job, reporter in zip(segmented_jobs, reporters, strict=True):
+                pool.submit(runner.run_job, job, reporter, None, None, process_slots)
+
+        # Three segments and a join for each job
+        assert counter.calls == 8
+        assert counter.most_running == 2
+        assert [reporter.events for reporter in reporters] == [["started", "completed", "finished"]] * 2
+
+    def test_segments_of_concurrent_async_jobs_share_the_slots(
+        self, segmented_jobs: list[AudioExtractJob], monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        counter = ProcessCounter()
+        monkeypatch.setattr(runner, "run_ffmpeg_async", counter.run_ffmpeg_async)
+
+        async def run_jobs() -> None:
+            process_slots = asyncio.Semaphore(2)
+            await asyncio.gather(
+                *(runner.run_job_async(job, NullJobReporter(), None, None, process_slots) for job in segmented_jobs)
+            )
+
+        asyncio.run(run_jobs())
+
+        assert counter.calls == 8
+        assert counter.most_running == 2
+
+    def test_segments_run_at_once_without_slots(
+        self, segmented_jobs: list[AudioExtractJob], monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        counter = ProcessCounter()
+        monkeypatch.setattr(runner, "run_ffmpeg", counter.run_ffmpeg)
+
+        runner.run_job(segmented_jobs[0], NullJobReporter())
+
+        assert counter.most_running == 3
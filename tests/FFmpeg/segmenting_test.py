@@ -0,0 +1,144 @@
+import asyncio
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from BAET.Display.reporting import NullJobReporter
+from BAET.FFmpeg.job_builder import build_job
+from BAET.FFmpeg.runner import run_job, run_job_async
+from BAET.FFmpeg.segmenting import (
+    Segment,
+    SegmentedStream,
+    SegmentPlan,
+    can_stitch,
+    split_timeline,
+)
+
+requires_ffmpeg = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="FFmpeg is not installed")
+
+
+def make_plan(output_dir: Path, segments: tuple[Segment, ...]) -> SegmentPlan:
+    stream = SegmentedStream(1, "a:0", output_dir / "video_track1.wav", "wav", {"acodec": "pcm_s16le"})
+    return SegmentPlan(segments, (stream,))
+
+
+def decoded_md5(file: Path) -> bytes:
+    args = ["ffmpeg", "-v", "error", "-i", str(file), "-f", "md5", "-"]
+    return subprocess.run(args, check=True, capture_output=True).stdout  # noqa: S603
+
+
+@pytest.fixture(scope="module")
+def long_file(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    file = tmp_path_factory.mktemp("segmenting") / "long.mkv"
+    args = ["ffmpeg", "-v", "error", "-f", "lavfi", "-i", "anoisesrc=duration=200:sample_rate=44100"]
+    args += ["-f", "lavfi", "-i", "sine=frequency=440:duration=200:sample_rate=48000"]
+    args += ["-map", "0:a", "-map", "1:a", "-c:a:0", "aac", "-c:a:1", "flac", str(file)]
+    subprocess.run(args, check=True)  # noqa: S603
+    return file
+
+
+class TestSplitTimeline:
+    def test_segments_cover_the_timeline_in_whole_seconds(self) -> None:
+        segments = split_timeline(3_601_500_000, 4)
+
+        assert segments == (Segment(0, 900), Segment(900, 1800), Segment(1800, 2700), Segment(2700, None))
+
+    def test_short_timeline_is_split_into_fewer_segments(self) -> None:
+        assert len(split_timeline(150_000_000, 8, min_segment_seconds=60)) == 2
+        assert split_timeline(59_000_000, 8, min_segment_seconds=60) == (Segment(0, None),)
+
+
+class TestCanStitch:
+    @pytest.mark.parametrize(
+        ("codec", "muxer", "expected"),
+        [
+            ("pcm_s16le", "wav", True),
+            ("pcm_s24le", "matroska", True),
+            ("flac", "matroska", True),
+            ("flac", "flac", False),
+            ("aac", "ipod", False),
+            ("copy", "matroska", False),
+        ],
+    )
+    def test_only_codecs_that_join_sample_for_sample(self, codec: str, muxer: str, expected: bool) -> None:
+        assert can_stitch("flac", codec, muxer) is expected
+
+    @pytest.mark.parametrize(
+        ("source_codec", "expected"),
+        [("pcm_s24le", True), ("flac", True), ("aac", False), ("mp3", False), ("opus", False), (None, False)],
+    )
+    def test_only_sources_decoded_the_same_anywhere(self, source_codec: str | None, expected: bool) -> None:
+        assert can_stitch(source_codec, "pcm_s16le", "wav") is expected
+
+
+class TestSegmentPlan:
+    def test_segments_are_trimmed_on_the_file_timeline(self, tmp_path: Path) -> None:
+        plan = make_plan(tmp_path, (Segment(0, 60), Segment(60, 120), Segment(120, None)))
+
+        first, middle, last = (" ".join(output.get_args()) for output in plan.segment_outputs(tmp_path / "in.mkv"))
+
+        assert "-copyts" in middle
+        assert "-ss" not in first
+        assert "-ss 59" in middle
+        assert "atrim=end=60" in first
+        assert "atrim=end=120:start=60" in middle
+        assert "atrim=start=120" in last
+
+    def test_join_lists_pieces_in_order(self, tmp_path: Path) -> None:
+        plan = make_plan(tmp_path / "it's", (Segment(0, 60), Segment(60, None)))
+        (tmp_path / "it's").mkdir()
+
+        (output,) = plan.join_outputs()
+        stream = plan.streams[0]
+
+        assert stream.list_path.read_text(encoding="utf-8").splitlines() == [
+            f"file '{str(stream.piece_path(segment).resolve()).replace("'", r"'\''")}'" for segment in (0, 1)
+        ]
+        assert "-f concat" in " ".join(output.get_args())
+
+        plan.remove_pieces()
+        assert not stream.list_path.exists()
+
+
+@requires_ffmpeg
+class TestSegmentedExtraction:
+    def test_stitchable_streams_are_planned_in_segments(self, long_file: Path, tmp_path: Path) -> None:
+        job = build_job(long_file, tmp_path / "long.wav", segments=4)
+
+        assert job.segment_plan is not None
+        assert len(job.segment_plan.segments) == 3
+        assert job.segment_plan.stream_indexes == [1]
+
+    def test_lossy_streams_are_extracted_whole(self, long_file: Path, tmp_path: Path) -> None:
+        job = build_job(long_file, tmp_path / "long.wav", segments=3)
+
+        assert job.segment_plan is not None
+        assert 0 not in job.segment_plan.stream_indexes
+        assert list(job.stream_indexed_outputs) == [0]
+
+    def test_short_or_unstitchable_streams_are_extracted_whole(self, long_file: Path, tmp_path: Path) -> None:
+        assert build_job(long_file, tmp_path / "long.mka", segments=4).segment_plan is None
+        assert build_job(long_file, tmp_path / "long.wav").segment_plan is None
+
+    @pytest.mark.parametrize("engine", ["thread", "asyncio"])
+    def test_segmented_extraction_matches_whole_extraction(self, long_file: Path, tmp_path: Path, engine: str) -> None:
+        whole = build_job(long_file, tmp_path / "whole" / "long.wav")
+        segmented = build_job(long_file, tmp_path / "segmented" / "long.wav", segments=3)
+        reporter = NullJobReporter()
+
+        run_job(whole, reporter)
+        if engine == "asyncio":
+            asyncio.run(run_job_async(segmented, reporter))
+        else:
+            run_job(segmented, reporter)
+
+        # Stream 0 is a lossy AAC stream, which only matches when it is not decoded in segments
+
+        for stream_index in (0, 1):
+            assert decoded_md5(segmented.output_paths[stream_index]) == decoded_md5(whole.output_paths[stream_index])
+        assert sorted(path.name for path in (tmp_path / "segmented").iterdir()) == [
+            "long_track0.wav",
+            "long_track1.wav",
+        ]
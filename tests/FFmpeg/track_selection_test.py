@@ -0,0 +1,86 @@
+import shutil
+import subprocess
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from BAET.FFmpeg.job_builder import build_job
+from BAET.FFmpeg.track_selection import TrackSelector, stream_language
+
+requires_ffmpeg = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="FFmpeg is not installed")
+
+STEREO_ENG: dict[str, Any] = {"index": 1, "codec_name": "aac", "channels": 2, "tags": {"language": "eng"}}
+SURROUND_JPN: dict[str, Any] = {"index": 2, "codec_name": "ac3", "channels": 6, "tags": {"LANGUAGE": "JPN"}}
+UNTAGGED: dict[str, Any] = {"index": 3, "codec_name": "aac", "channels": 2}
+
+
+@pytest.fixture(scope="module")
+def dubbed_file(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    file = tmp_path_factory.mktemp("track_selection") / "dubbed.mkv"
+    args = ["ffmpeg", "-v", "error", "-f", "lavfi", "-i", "sine=duration=1", "-f", "lavfi", "-i", "sine=duration=1"]
+    args += ["-map", "0:a", "-map", "1:a", "-c:a", "flac", "-ac:a:1", "6"]
+    args += ["-metadata:s:a:0", "language=eng", "-metadata:s:a:1", "language=jpn", str(file)]
+    subprocess.run(args, check=True)  # noqa: S603
+    return file
+
+
+class TestStreamLanguage:
+    def test_language_tag_is_lowercased(self) -> None:
+        assert stream_language(SURROUND_JPN) == "jpn"
+
+    def test_untagged_stream_is_undetermined(self) -> None:
+        assert stream_language(UNTAGGED) == "und"
+
+
+class TestTrackSelector:
+    def test_default_selects_every_track(self) -> None:
+        selector = TrackSelector()
+
+        assert selector.selects_all
+        assert all(map(selector.matches, (STEREO_ENG, SURROUND_JPN, UNTAGGED)))
+
+    @pytest.mark.parametrize(
+        ("selector", "expected"),
+        [
+            (TrackSelector.create(indexes=[1, 3]), [1, 3]),
+            (TrackSelector.create(languages=["ENG", "und"]), [1, 3]),
+            (TrackSelector.create(codecs=["AC3"]), [2]),
+            (TrackSelector.create(min_channels=6), [2]),
+            (TrackSelector.create(indexes=[1, 2], codecs=["aac"]), [1]),
+            (TrackSelector.create(languages=["fra"]), []),
+        ],
+    )
+    def test_tracks_pass_every_criterion(self, selector: TrackSelector, expected: list[int]) -> None:
+        selected = [stream["index"] for stream in (STEREO_ENG, SURROUND_JPN, UNTAGGED) if selector.matches(stream)]
+
+        assert not selector.selects_all
+        assert selected == expected
+
+    def test_unprobed_fields_do_not_pass(self) -> None:
+        assert not TrackSelector.create(min_channels=1).matches({"index": 1})
+        assert not TrackSelector.create(codecs=["aac"]).matches({"index": 1})
+
+
+@requires_ffmpeg
+class TestBuildJobTrackSelection:
+    def test_unselected_tracks_are_not_extracted(self, dubbed_file: Path, tmp_path: Path) -> None:
+        job = build_job(dubbed_file, tmp_path / "dubbed.flac", tracks=TrackSelector.create(languages=["jpn"]))
+
+        assert job.stream_indexes == [1]
+        assert list(job.stream_indexed_outputs) == [1]
+        assert job.merged_output is not None
+        args = job.merged_output.get_args()
+        assert "0:a:1" in args
+        assert "0:a:0" not in args
+
+    def test_selection_by_channel_count(self, dubbed_file: Path, tmp_path: Path) -> None:
+        job = build_job(dubbed_file, tmp_path / "dubbed.flac", tracks=TrackSelector.create(min_channels=6))
+
+        assert job.stream_indexes == [1]
+
+    def test_no_selected_tracks_builds_an_empty_job(self, dubbed_file: Path, tmp_path: Path) -> None:
+        job = build_job(dubbed_file, tmp_path / "dubbed.flac", tracks=TrackSelector.create(indexes=[5]))
+
+        assert not job.audio_streams
+        assert job.merged_output is None
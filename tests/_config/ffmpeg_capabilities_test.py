@@ -0,0 +1,107 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from BAET._config import ffmpeg_capabilities
+from BAET._config.ffmpeg_capabilities import load_capabilities
+
+OUTPUTS = {
+    "-version": "ffmpeg version 6.1.1 Copyright (c) 2000-2023 the FFmpeg developers\n",
+    "-encoders": (
+        "Encoders:\n"
+        " V..... = Video\n"
+        " A..... = Audio\n"
+        " ------\n"
+        " V....D libx264              libx264 H.264 / AVC / MPEG-4 AVC / MPEG-4 part 10 (codec h264)\n"
+        " A....D aac                  AAC (Advanced Audio Coding)\n"
+        " A..X.D opus                 Opus\n"
+        " A....D flac                 FLAC (Free Lossless Audio Codec)\n"
+    ),
+    "-muxers": (
+        "File formats:\n"
+        " D. = Demuxing supported\n"
+        " .E = Muxing supported\n"
+        " --\n"
+        "  E ipod            iPod H.264 MP4 (MPEG-4 Part 14)\n"
+        " DE matroska,webm   Matroska\n"
+        " D  mov,mp4,m4a     QuickTime / MOV\n"
+    ),
+    "-filters": (
+        "Filters:\n"
+        " ... atrim             A->A       Pick one continuous section from the input, drop the rest.\n"
+        " ..C aresample         A->A       Resample audio data.\n"
+    ),
+}
+
+
+@pytest.fixture()
+def ffmpeg_calls(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    calls: list[str] = []
+
+    def run_ffmpeg(ffmpeg: Path, *args: str) -> str:
+        calls.append(args[0])
+        return OUTPUTS[args[0]]
+
+    monkeypatch.setattr(ffmpeg_capabilities, "_run_ffmpeg", run_ffmpeg)
+    return calls
+
+
+@pytest.fixture()
+def ffmpeg_binary(tmp_path: Path) -> Path:
+    binary = tmp_path / "ffmpeg"
+    binary.write_bytes(b"")
+    return binary
+
+
+class TestLoadCapabilities:
+    def test_parses_ffmpeg_output(self, ffmpeg_calls: list[str], ffmpeg_binary: Path, tmp_path: Path) -> None:
+        capabilities = load_capabilities(ffmpeg_binary, tmp_path / "cache.json")
+
+        assert capabilities.version == "6.1.1"
+        assert capabilities.audio_encoders == {"aac", "opus", "flac"}
+        assert capabilities.experimental_encoders == {"opus"}
+        assert capabilities.muxers == {"ipod", "matroska", "webm"}
+        assert capabilities.filters == {"atrim", "aresample"}
+
+    def test_unchanged_binary_is_not_queried_again(
+        self, ffmpeg_calls: list[str], ffmpeg_binary: Path, tmp_path: Path
+    ) -> None:
+        first = load_capabilities(ffmpeg_binary, tmp_path / "cache.json")
+        queries = len(ffmpeg_calls)
+
+        assert load_capabilities(ffmpeg_binary, tmp_path / "cache.json") == first
+        assert len(ffmpeg_calls) == queries
+
+    def test_changed_binary_is_queried_again(
+        self, ffmpeg_calls: list[str], ffmpeg_binary: Path, tmp_path: Path
+    ) -> None:
+        load_capabilities(ffmpeg_binary, tmp_path / "cache.json")
+        queries = len(ffmpeg_calls)
+
+        ffmpeg_binary.write_bytes(b"upgraded")
+        load_capabilities(ffmpeg_binary, tmp_path / "cache.json")
+
+        assert len(ffmpeg_calls) == 2 * queries
+
+    @pytest.mark.parametrize(
+        "cache",
+        [
+            [1, 2, 3],
+            "capabilities",
+            {"version": 1, "binaries": {}},
+            {"version": 1, "binaries": [None, {}, {"binary": "ffmpeg"}, {"binary": {}}, {"capabilities": {}}]},
+        ],
+    )
+    def test_malformed_cache_is_ignored(
+        self, ffmpeg_calls: list[str], ffmpeg_binary: Path, tmp_path: Path, cache: object
+    ) -> None:
+        cache_file = tmp_path / "cache.json"
+        cache_file.write_text(json.dumps(cache), encoding="utf-8")
+
+        assert load_capabilities(ffmpeg_binary, cache_file).version == "6.1.1"
+        queries = len(ffmpeg_calls)
+        assert queries > 0
+
+        load_capabilities(ffmpeg_binary, cache_file)
+        assert len(ffmpeg_calls) == queries
@@ -0,0 +1,284 @@
+import asyncio
+import contextlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from collections.abc import Iterator, Sequence
+from contextlib import AbstractContextManager
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+import ffmpeg
+from BAET.cli.commands import extract
+from BAET.Display.reporting import JobReporter, NullBatchReporter, NullJobReporter
+from BAET.FFmpeg import runner
+from BAET.FFmpeg.jobs import AudioExtractJob, StreamRecord, with_progress_args
+from BAET.FFmpeg.metrics import ProcessUsage
+from BAET.FFmpeg.segmenting import Segment, SegmentedStream, SegmentPlan
+from BAET.typing import FFmpegOutput, ProgressCallback, StreamIndex
+
+JOBS = 50
+
+
+class JobQueue:
+    """Jobs that record how far their producer has run ahead of the jobs finishing."""
+
+    def __init__(self) -> None:
+        self.taken = 0
+        self.finished = 0
+        self.most_ahead = 0
+
+    def jobs(self) -> Iterator[AudioExtractJob]:
+        for i in range(JOBS):
+            self.taken += 1
+            self.most_ahead = max(self.most_ahead, self.taken - self.finished)
+            yield AudioExtractJob(Path(f"{i}.mkv"), [StreamRecord(1, "aac", 1_000_000)], {})
+
+    def run_batch(self, jobs: Sequence[AudioExtractJob], reporters: Sequence[JobReporter], *args: object) -> None:
+        time.sleep(0.001)
+        self.finished += len(jobs)
+
+    async def run_batch_async(
+        self, jobs: Sequence[AudioExtractJob], reporters: Sequence[JobReporter], *args: object
+    ) -> None:
+        await asyncio.sleep(0.001)
+        self.finished += len(jobs)
+
+
+class TestBackpressure:
+    def test_parallel_jobs_are_taken_as_workers_free_up(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        queue = JobQueue()
+        monkeypatch.setattr(extract, "run_batch", queue.run_batch)
+
+        extract.run_parallel(queue.jobs(), 2, NullBatchReporter())
+
+        assert queue.finished == JOBS
+        assert queue.most_ahead <= 4
+
+    def test_asyncio_jobs_are_taken_as_slots_free_up(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        queue = JobQueue()
+        monkeypatch.setattr(extract, "run_batch_async", queue.run_batch_async)
+
+        asyncio.run(extract.run_asyncio(queue.jobs(), 2, NullBatchReporter()))
+
+        assert queue.finished == JOBS
+        assert queue.most_ahead <= 2
+
+
+class RecordingJobReporter(NullJobReporter):
+    def __init__(self) -> None:
+        self.events: list[str] = []
+
+    def streams_completed(self, streams: Sequence[StreamIndex]) -> None:
+        self.events.append("completed")
+
+    def streams_failed(self, streams: Sequence[StreamIndex], error: Exception) -> None:
+        self.events.append("failed")
+
+
+class RecordingBatchReporter:
+    def __init__(self) -> None:
+        self.reporters: dict[str, RecordingJobReporter] = {}
+
+    def add(self, job: AudioExtractJob) -> JobReporter:
+        reporter = self.reporters[job.input_file.stem] = RecordingJobReporter()
+        return reporter
+
+    def live(self) -> AbstractContextManager[Any]:
+        return contextlib.nullcontext()
+
+
+def make_job(tmp_path: Path, name: str) -> AudioExtractJob:
+    output = ffmpeg.output(ffmpeg.input(str(tmp_path / f"{name}.mkv"))["a:0"], str(tmp_path / f"{name}.wav"))
+    return AudioExtractJob(
+        tmp_path / f"{name}.mkv", [StreamRecord(1, "aac", 1_000_000)], {1: with_progress_args(output)}
+    )
+
+
+def make_segmented_job(tmp_path: Path, name: str) -> AudioExtractJob:
+    output_path = tmp_path / f"{name}_track1.wav"
+    stream = SegmentedStream(1, "a:0", output_path, "wav", {"acodec": "pcm_s16le"})
+    plan = SegmentPlan(tuple(Segment(start, start + 60) for start in range(0, 240, 60)), (stream,))
+    return AudioExtractJob(
+        tmp_path / f"{name}.mkv",
+        [StreamRecord(1, "pcm_s16le", 240_000_000)],
+        {},
+        output_paths={1: output_path},
+        segment_plan=plan,
+    )
+
+
+class ConcurrencyRecorder:
+    """A stand-in for `run_batch` that records how many batches run at once."""
+
+    def __init__(self) -> None:
+        self.running = 0
+        self.most_running = 0
+        self.finished: list[str] = []
+        self._lock = threading.Lock()
+
+    def run_batch(self, jobs: Sequence[AudioExtractJob], reporters: Sequence[JobReporter], *args: object) -> None:
+        with self._lock:
+            self.running += 1
+            self.most_running = max(self.most_running, self.running)
+        time.sleep(0.01)
+        with self._lock:
+            self.running -= 1
+            self.finished.extend(job.input_file.stem for job in jobs)
+
+
+class TestRunParallel:
+    @pytest.mark.parametrize("max_jobs", [1, 3])
+    def test_at_most_max_jobs_run_at_once(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch, max_jobs: int) -> None:
+        recorder = ConcurrencyRecorder()
+        monkeypatch.setattr(extract, "run_batch", recorder.run_batch)
+
+        extract.run_parallel((make_job(tmp_path, str(i)) for i in range(12)), max_jobs, NullBatchReporter())
+
+        assert sorted(recorder.finished, key=int) == [str(i) for i in range(12)]
+        assert recorder.most_running == max_jobs
+
+    def test_jobs_are_reported_in_the_order_they_are_taken(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(extract, "run_batch", ConcurrencyRecorder().run_batch)
+        reporter = RecordingBatchReporter()
+
+        extract.run_parallel((make_job(tmp_path, str(i)) for i in range(12)), 3, reporter)
+
+        assert list(reporter.reporters) == [str(i) for i in range(12)]
+
+    def test_a_failing_job_does_not_stop_the_others(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        def run_ffmpeg(output: FFmpegOutput, on_progress: ProgressCallback | None = None) -> ProcessUsage:
+            if str(tmp_path / "2.mkv") in output.get_args():
+                raise RuntimeError("FFmpeg failed")
+            return ProcessUsage(wall_seconds=1.0)
+
+        monkeypatch.setattr(runner, "run_ffmpeg", run_ffmpeg)
+        reporter = RecordingBatchReporter()
+        completed: list[str] = []
+
+        extract.run_parallel(
+            (make_job(tmp_path, str(i)) for i in range(5)),
+            2,
+            reporter,
+            lambda job, stream_index: completed.append(job.input_file.stem),
+        )
+
+        assert sorted(completed) == ["0", "1", "3", "4"]
+        assert {name: job.events for name, job in reporter.reporters.items()} == {
+            "0": ["completed"],
+            "1": ["completed"],
+            "2": ["failed"],
+            "3": ["completed"],
+            "4": ["completed"],
+        }
+
+    def test_segments_count_towards_max_jobs(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        recorder = ConcurrencyRecorder()
+        calls: list[FFmpegOutput] = []
+
+        def run_ffmpeg(output: FFmpegOutput, on_progress: ProgressCallback | None = None) -> ProcessUsage:
+            calls.append(output)
+            recorder.run_batch([], [])
+            return ProcessUsage(wall_seconds=0.01)
+
+        monkeypatch.setattr(runner, "run_ffmpeg", run_ffmpeg)
+
+        extract.run_parallel((make_segmented_job(tmp_path, str(i)) for i in range(3)), 2, NullBatchReporter())
+
+        # Four segments and a join for each job
+        assert len(calls) == 15
+        assert recorder.most_running == 2
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="FFmpeg is not installed")
+class TestRunAsyncio:
+    def test_cancelling_the_run_terminates_every_ffmpeg_process(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        processes: list[asyncio.subprocess.Process] = []
+        create_subprocess_exec = asyncio.create_subprocess_exec
+
+        async def record(*args: Any, **kwargs: Any) -> asyncio.subprocess.Process:
+            proc = await create_subprocess_exec(*args, **kwargs)
+            processes.append(proc)
+            return proc
+
+        monkeypatch.setattr(asyncio, "create_subprocess_exec", record)
+
+        def long_job(name: str) -> AudioExtractJob:
+            # Read at its native rate, so FFmpeg runs until it is terminated
+            source = ffmpeg.input("sine=duration=600", format="lavfi", re=None)
+            output = with_progress_args(source.output(str(tmp_path / f"{name}.wav"), format="wav"))
+            return AudioExtractJob(tmp_path / f"{name}.mkv", [StreamRecord(1, "pcm_s16le", 600_000_000)], {1: output})
+
+        async def cancel_when_running() -> None:
+            task = asyncio.create_task(extract.run_asyncio((long_job(name) for name in "abc"), 2, NullBatchReporter()))
+            async with asyncio.timeout(30):
+                while len(processes) < 2:
+                    await asyncio.sleep(0.05)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(cancel_when_running())
+
+        assert len(processes) == 2
+        assert all(proc.returncode is not None for proc in processes)
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="FFmpeg is not installed")
+class TestUnprobedFiles:
+    def test_a_file_that_fails_to_probe_does_not_stop_the_others(self, tmp_path: Path) -> None:
+        inputs, outputs = tmp_path / "inputs", tmp_path / "outputs"
+        inputs.mkdir()
+        for name in ("a", "c"):
+            args = ["ffmpeg", "-v", "error", "-f", "lavfi", "-i", "sine=duration=1", str(inputs / f"{name}.mkv")]
+            subprocess.run(args, check=True)  # noqa: S603
+        (inputs / "b.mkv").write_bytes(b"not a video")
+
+        args = [sys.executable, "-m", "BAET", "extract", "--progress", "none", "--no-probe-cache", "-j", "1"]
+        args += ["dir", "-i", str(inputs), "-o", str(outputs)]
+        proc = subprocess.run(args, capture_output=True, text=True, check=False)  # noqa: S603
+
+        assert proc.returncode == 1
+        assert "Could not extract 1 files" in proc.stderr
+        assert "b.mkv" in proc.stderr
+        assert sorted(path.name for path in outputs.rglob("*.wav")) == ["a_track0.wav", "c_track0.wav"]
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="FFmpeg is not installed")
+class TestJsonlProgress:
+    def test_standard_output_only_has_events(self, tmp_path: Path) -> None:
+        inputs, outputs = tmp_path / "inputs", tmp_path / "outputs"
+        inputs.mkdir()
+        args = ["ffmpeg", "-v", "error", "-f", "lavfi", "-i", "sine=duration=1", str(inputs / "a.mkv")]
+        subprocess.run(args, check=True)  # noqa: S603
+        # The caches cannot be opened, which is logged before any job is queued
+        not_a_directory = tmp_path / "cache"
+        not_a_directory.write_bytes(b"")
+
+        args = [sys.executable, "-m", "BAET", "extract", "--progress", "jsonl"]
+        args += ["dir", "-i", str(inputs), "-o", str(outputs)]
+        env = os.environ | {"BAET_CACHE_DIR": str(not_a_directory)}
+        proc = subprocess.run(args, capture_output=True, text=True, check=False, env=env)  # noqa: S603
+
+        assert proc.returncode == 0
+        assert "WARNING" in proc.stderr
+        events = [json.loads(line) for line in proc.stdout.splitlines()]
+        assert all({"event", "time", "input"} <= event.keys() for event in events)
+        assert all(event["stream_index"] == 0 for event in events if event["event"] == "stream_progress")
+
+        # How many progress events are reported depends on how fast FFmpeg runs
+        events = [event for event in events if event["event"] != "stream_progress"]
+        assert [event["event"] for event in events] == ["job_queued", "job_started", "stream_completed", "job_finished"]
+        assert events[0]["streams"] == [0]
+        assert events[2]["output"] == str(outputs / "a" / "a_track0.wav")
+        assert events[3]["failed_streams"] == 0
@@ -0,0 +1,63 @@
+import json
+import subprocess
+import sys
+import time
+from logging import getLogger
+
+import pytest
+
+logger = getLogger("testing")
+
+# The wall time budget for `baet probe --help`, including starting the interpreter
+STARTUP_BUDGET_SECONDS = 0.75
+
+HEAVY_MODULES = [
+    "asyncio",
+    "bidict",
+    "ffmpeg",
+    "importlib.metadata",
+    "more_itertools",
+    "rich.live",
+    "rich.progress",
+    "rich.traceback",
+    "sqlite3",
+    "BAET.cli.commands.extract",
+    "BAET.cli.commands.probe",
+]
+
+
+def run_python(*args: str) -> subprocess.CompletedProcess[str]:
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, check=True)  # noqa: S603
+
+
+class TestStartup:
+    def test_startup_does_not_import_heavy_modules(self) -> None:
+        proc = run_python("-c", "import json, sys, BAET.__main__; print(json.dumps(sorted(sys.modules)))")
+        imported = set(json.loads(proc.stdout))
+
+        assert [module for module in HEAVY_MODULES if module in imported] == []
+
+    def test_subcommands_are_loaded_on_demand(self) -> None:
+        proc = run_python(
+            "-c",
+            "import json, sys\n"
+            "from BAET.cli.cli import cli\n"
+            "cli.get_command(None, 'probe')\n"
+            "print(json.dumps(sorted(sys.modules)))",
+        )
+        imported = set(json.loads(proc.stdout))
+
+        assert "BAET.cli.commands.probe" in imported
+        assert "BAET.cli.commands.extract" not in imported
+
+    @pytest.mark.parametrize("args", [["--help"], ["probe", "--help"]])
+    def test_startup_is_within_budget(self, args: list[str]) -> None:
+        timings = []
+        for _ in range(3):
+            start = time.perf_counter()
+            run_python("-m", "BAET", *args)
+            timings.append(time.perf_counter() - start)
+
+        logger.info("Startup timings for %r: %r", args, timings)
+
+        assert min(timings) < STARTUP_BUDGET_SECONDS
@@ -4,9 +4,10 @@ from string import ascii_uppercase
 
 import faker
 import pytest
+import rich_click as click
 from faker import Faker
 
-from BAET.cli.types import Merger
+from BAET.cli.types import CommaSeparatedParamType, Merger
 
 fake: Faker = faker.Faker()
 
@@ -54,3 +55,15 @@ class TestMerge:
         logger.info("Actual: %r", actual)
 
         assert expected == actual
+
+
+class TestCommaSeparated:
+    def test_items_are_split_and_converted(self) -> None:
+        param_type = CommaSeparatedParamType(click.IntRange(min=0))
+
+        assert param_type.convert("1, 3,4", None, None) == (1, 3, 4)
+
+    @pytest.mark.parametrize("value", ["1,,3", "1,-2", "eng"])
+    def test_invalid_items_fail(self, value: str) -> None:
+        with pytest.raises(click.BadParameter):
+            CommaSeparatedParamType(click.IntRange(min=0)).convert(value, None, None)
@@ -0,0 +1,122 @@
+import asyncio
+import shutil
+import subprocess
+import threading
+from pathlib import Path
+
+import pytest
+
+from BAET.extractor import ExtractOptions, Extractor, FileOutcome, StreamOutcome
+from BAET.FFmpeg import runner
+from BAET.FFmpeg.metrics import ProcessUsage
+from BAET.typing import FFmpegOutput, ProgressCallback
+
+requires_ffmpeg = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="FFmpeg is not installed")
+
+
+@pytest.fixture(scope="module")
+def two_track_file(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    file = tmp_path_factory.mktemp("extractor") / "video.mkv"
+    args = ["ffmpeg", "-v", "error", "-f", "lavfi", "-i", "sine=frequency=440:duration=1"]
+    args += ["-f", "lavfi", "-i", "sine=frequency=880:duration=1"]
+    args += ["-map", "0:a", "-map", "1:a", "-c:a", "flac", str(file)]
+    subprocess.run(args, check=True)  # noqa: S603
+    return file
+
+
+@requires_ffmpeg
+class TestExtractor:
+    def test_submit_returns_stream_outcomes(self, two_track_file: Path, tmp_path: Path) -> None:
+        seen: list[StreamOutcome] = []
+        with Extractor(max_jobs=2, use_probe_cache=False) as extractor:
+            outcome = extractor.submit(two_track_file, tmp_path, lambda _, stream: seen.append(stream)).result()
+
+        assert outcome.succeeded
+        assert [stream.index for stream in outcome.streams] == [0, 1]
+        assert all(stream.output.is_file() and stream.output.parent == tmp_path for stream in outcome.streams)
+        assert all(stream.duration_ms > 0 for stream in outcome.streams)
+        assert sorted(seen, key=lambda stream: stream.index) == list(outcome.streams)
+
+    def test_unchanged_input_is_not_extracted_again(self, two_track_file: Path, tmp_path: Path) -> None:
+        with Extractor(use_probe_cache=False) as extractor:
+            first = extractor.submit(two_track_file, tmp_path).result()
+            second = extractor.submit(two_track_file, tmp_path).result()
+
+        assert len(first.streams) == 2
+        assert second.succeeded
+        assert second.streams == ()
+
+    def test_missing_file_is_an_outcome(self, tmp_path: Path) -> None:
+        with Extractor(use_probe_cache=False) as extractor:
+            outcome = extractor.submit(tmp_path / "missing.mkv", tmp_path).result()
+
+        assert not outcome.succeeded
+        assert outcome.error
+        assert outcome.streams == ()
+
+    def test_file_that_fails_to_probe_is_an_outcome(self, two_track_file: Path, tmp_path: Path) -> None:
+        corrupt = tmp_path / "corrupt.mkv"
+        corrupt.write_bytes(b"not a video")
+        with Extractor(ExtractOptions(overwrite=True), max_jobs=2, use_probe_cache=False) as extractor:
+            outcome = extractor.submit(corrupt, tmp_path).result()
+            outcomes = {outcome.input_file: outcome for outcome in extractor.extract_all([corrupt, two_track_file])}
+
+        assert not outcome.succeeded
+        assert outcome.error
+        assert outcome.streams == ()
+        assert outcomes[corrupt].error
+        assert outcomes[two_track_file].succeeded
+
+    def test_ffmpeg_failing_to_start_is_a_stream_outcome(
+        self, two_track_file: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        def run_ffmpeg(output: FFmpegOutput, on_progress: ProgressCallback) -> ProcessUsage:
+            raise FileNotFoundError(2, "No such file or directory", "ffmpeg")
+
+        monkeypatch.setattr(runner, "run_ffmpeg", run_ffmpeg)
+        with Extractor(use_probe_cache=False) as extractor:
+            outcome = extractor.submit(two_track_file, tmp_path).result()
+
+        assert outcome.error is None
+        assert not outcome.succeeded
+        assert [stream.index for stream in outcome.streams] == [0, 1]
+        assert all(stream.error is not None and "FileNotFoundError" in stream.error for stream in outcome.streams)
+
+    def test_extract_all_yields_every_file(self, two_track_file: Path, tmp_path: Path) -> None:
+        files = [two_track_file, tmp_path / "missing.mkv"]
+        options = ExtractOptions(filetype=".flac", overwrite=True)
+        with Extractor(options, max_jobs=2, use_probe_cache=False) as extractor:
+            outcomes = list(extractor.extract_all(files, tmp_path))
+
+        assert sorted(outcome.input_file for outcome in outcomes) == sorted(files)
+        assert sum(outcome.succeeded for outcome in outcomes) == 1
+        assert {stream.output.suffix for outcome in outcomes for stream in outcome.streams} == {".flac"}
+
+    def test_extract_async_awaits_outcome(self, two_track_file: Path, tmp_path: Path) -> None:
+        with Extractor(use_probe_cache=False) as extractor:
+            outcome = asyncio.run(extractor.extract_async(two_track_file, tmp_path))
+
+        assert isinstance(outcome, FileOutcome)
+        assert outcome.succeeded
+
+    def test_extract_all_runs_on_the_shared_workers(self, two_track_file: Path, tmp_path: Path) -> None:
+        threads: set[str] = set()
+
+        def record_thread(_: Path, __: StreamOutcome) -> None:
+            threads.add(threading.current_thread().name)
+
+        with Extractor(ExtractOptions(overwrite=True), max_jobs=1, use_probe_cache=False) as extractor:
+            list(extractor.extract_all([two_track_file, two_track_file], tmp_path, record_thread))
+
+        assert threads
+        assert all(name.startswith("baet-extractor") for name in threads)
+
+
+class TestExtractorLifecycle:
+    def test_submit_after_close_raises(self) -> None:
+        extractor = Extractor(use_probe_cache=False)
+        extractor.close()
+        extractor.close()
+
+        with pytest.raises(RuntimeError, match="closed extractor"):
+            extractor.submit(Path("video.mkv"))
@@ -0,0 +1 @@
+"""Helper tests."""
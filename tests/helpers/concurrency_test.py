@@ -0,0 +1,35 @@
+import threading
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+
+from BAET.helpers.concurrency import bounded_imap_unordered
+
+
+class TestBoundedImapUnordered:
+    def test_maps_every_item(self) -> None:
+        assert sorted(bounded_imap_unordered(lambda x: x * 2, range(10), max_workers=3)) == list(range(0, 20, 2))
+
+    def test_items_are_taken_lazily(self) -> None:
+        taken: list[int] = []
+
+        def items() -> Iterator[int]:
+            for i in range(100):
+                taken.append(i)
+                yield i
+
+        results = bounded_imap_unordered(lambda x: x, items(), max_workers=2, max_pending=3)
+        next(results)
+        del results
+
+        assert len(taken) <= 4
+
+    def test_shared_executor_is_used_and_not_shut_down(self) -> None:
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="shared") as executor:
+            names = set(
+                bounded_imap_unordered(
+                    lambda _: threading.current_thread().name, range(5), max_workers=2, executor=executor
+                )
+            )
+
+            assert all(name.startswith("shared") for name in names)
+            assert executor.submit(lambda: 1).result() == 1
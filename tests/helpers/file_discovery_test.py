@@ -0,0 +1,111 @@
+import os
+import sys
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from BAET.helpers.file_discovery import scan_files
+
+requires_symlinks = pytest.mark.skipif(sys.platform == "win32", reason="Symbolic links need privileges on Windows")
+
+
+def make_files(root: Path, *names: str) -> None:
+    for name in names:
+        file = root / name
+        file.parent.mkdir(parents=True, exist_ok=True)
+        file.write_bytes(b"video")
+
+
+def scanned(root: Path, **kwargs: Any) -> list[str]:
+    return [Path(entry.path).relative_to(root).as_posix() for entry in scan_files(root, **kwargs)]
+
+
+class TestScanFiles:
+    def test_only_top_level_files_are_found_by_default(self, tmp_path: Path) -> None:
+        make_files(tmp_path, "a.mkv", "b.mkv", "sub/c.mkv")
+
+        assert sorted(scanned(tmp_path)) == ["a.mkv", "b.mkv"]
+
+    def test_subdirectories_are_searched_when_recursive(self, tmp_path: Path) -> None:
+        make_files(tmp_path, "a.mkv", "sub/b.mkv", "sub/deeper/c.mkv")
+
+        assert sorted(scanned(tmp_path, recursive=True)) == ["a.mkv", "sub/b.mkv", "sub/deeper/c.mkv"]
+
+    def test_files_of_a_directory_are_found_before_its_subdirectories_are_read(self, tmp_path: Path) -> None:
+        make_files(tmp_path, "a.mkv", "b.mkv", "sub/c.mkv", "sub/deeper/d.mkv", "other/e.mkv")
+
+        found = scanned(tmp_path, recursive=True)
+
+        assert sorted(found[:2]) == ["a.mkv", "b.mkv"]
+        assert found.index("sub/c.mkv") < found.index("sub/deeper/d.mkv")
+        assert len(found) == len(set(found)) == 5
+
+    def test_excluded_directories_are_not_read(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        make_files(tmp_path, "a.mkv", "keep/b.mkv", "skip/c.mkv", "keep/skip/d.mkv")
+        read: list[str] = []
+        scandir = os.scandir
+
+        def recording_scandir(path: str) -> "os._ScandirIterator[str]":
+            read.append(Path(path).relative_to(tmp_path).as_posix())
+            return scandir(path)
+
+        monkeypatch.setattr(os, "scandir", recording_scandir)
+
+        found = scanned(tmp_path, recursive=True, include_dir=lambda name: name != "skip")
+
+        assert sorted(found) == ["a.mkv", "keep/b.mkv"]
+        assert sorted(read) == [".", "keep"]
+
+    def test_hidden_files_and_directories_are_filtered_like_any_other(self, tmp_path: Path) -> None:
+        make_files(tmp_path, ".hidden.mkv", "visible.mkv", ".cache/a.mkv")
+
+        assert sorted(scanned(tmp_path, recursive=True)) == [".cache/a.mkv", ".hidden.mkv", "visible.mkv"]
+        assert scanned(
+            tmp_path,
+            recursive=True,
+            include_file=lambda name: not name.startswith("."),
+            include_dir=lambda name: not name.startswith("."),
+        ) == ["visible.mkv"]
+
+    def test_unreadable_directory_is_skipped(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        make_files(tmp_path, "a.mkv", "locked/b.mkv")
+        scandir = os.scandir
+
+        def failing_scandir(path: str) -> "os._ScandirIterator[str]":
+            if Path(path).name == "locked":
+                raise PermissionError(13, "Permission denied", path)
+            return scandir(path)
+
+        monkeypatch.setattr(os, "scandir", failing_scandir)
+
+        assert scanned(tmp_path, recursive=True) == ["a.mkv"]
+
+
+@requires_symlinks
+class TestSymlinks:
+    def test_symlinked_directories_are_not_followed_by_default(self, tmp_path: Path) -> None:
+        make_files(tmp_path, "real/a.mkv")
+        (tmp_path / "link").symlink_to(tmp_path / "real", target_is_directory=True)
+
+        assert scanned(tmp_path, recursive=True) == ["real/a.mkv"]
+
+    def test_symlink_cycle_is_only_followed_once(self, tmp_path: Path) -> None:
+        make_files(tmp_path, "a.mkv", "sub/b.mkv")
+        (tmp_path / "sub" / "loop").symlink_to(tmp_path, target_is_directory=True)
+
+        assert sorted(scanned(tmp_path, recursive=True, follow_symlinks=True)) == ["a.mkv", "sub/b.mkv"]
+
+    def test_directory_reached_by_two_paths_is_only_searched_once(self, tmp_path: Path) -> None:
+        make_files(tmp_path, "real/a.mkv")
+        (tmp_path / "link").symlink_to(tmp_path / "real", target_is_directory=True)
+
+        found = scanned(tmp_path, recursive=True, follow_symlinks=True)
+
+        assert [Path(name).name for name in found] == ["a.mkv"]
+
+    def test_symlinked_files_are_found(self, tmp_path: Path) -> None:
+        make_files(tmp_path, "real/a.mkv")
+        (tmp_path / "b.mkv").symlink_to(tmp_path / "real" / "a.mkv")
+
+        assert scanned(tmp_path) == ["b.mkv"]
@@ -0,0 +1,62 @@
+import re
+from logging import getLogger
+from re import Pattern
+
+import faker
+import pytest
+from faker import Faker
+
+from BAET.helpers.name_filter import NameFilter
+
+fake: Faker = faker.Faker()
+
+logger = getLogger("testing")
+
+PATTERNS = ["a", "b.*", r"\d+", "(foo|bar)", "(?P<name>x)", r"(a)\1", ".*MKV$"]
+EXTENSIONS = [("mkv", False), ("mp4", False), ("AVI", True)]
+
+
+def per_pattern_match(
+    name: str,
+    includes: list[Pattern[str]],
+    excludes: list[Pattern[str]],
+    extensions: list[tuple[str, bool]],
+) -> bool:
+    extension_patterns = [
+        re.compile(rf".*\.{re.escape(ext)}$", re.NOFLAG if case_sensitive else re.IGNORECASE)
+        for ext, case_sensitive in extensions
+    ]
+    return (
+        all(include.match(name) for include in includes)
+        and not any(exclude.match(name) for exclude in excludes)
+        and any(ext.match(name) for ext in extension_patterns)
+    )
+
+
+def random_patterns(count: int) -> list[Pattern[str]]:
+    return [
+        re.compile(fake.random_element(PATTERNS), fake.random_element([re.NOFLAG, re.IGNORECASE])) for _ in range(count)
+    ]
+
+
+class TestNameFilter:
+    @pytest.mark.repeat(100)
+    def test_matches_per_pattern_filtering(self) -> None:
+        includes = random_patterns(fake.random_int(0, 3))
+        excludes = random_patterns(fake.random_int(0, 4))
+        name_filter = NameFilter(includes, excludes, EXTENSIONS)
+
+        logger.info("Includes: %r", includes)
+        logger.info("Excludes: %r", excludes)
+
+        for _ in range(50):
+            name = fake.lexify("?" * fake.random_int(0, 8), letters="abfoxAB019") + fake.random_element(
+                [".mkv", ".MKV", ".avi", ".AVI", ".txt", "", "mkv"]
+            )
+            assert name_filter(name) == per_pattern_match(name, includes, excludes, EXTENSIONS), name
+
+    def test_accepts_any_extension_without_extensions(self) -> None:
+        name_filter = NameFilter(excludes=[re.compile("skip")])
+
+        assert name_filter("keep")
+        assert not name_filter("skip")